@@ -1,9 +1,14 @@
 from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
+    # El módulo define otra AppConfig: sin esto Django no elige ninguna y no corre ready().
+    default = True
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
     verbose_name = "Cuentas"
+
+    def ready(self):
+        from . import signals  # noqa: F401 - invalida el cache de usuarios del JWT
     
 class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
@@ -1,11 +1,8 @@
 import hashlib
 import logging
+import math
 import os
 import re
-try:
-    import requests
-except ImportError:
-    requests = None
 from rest_framework import permissions, status, views, response
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -17,34 +14,27 @@ from django.contrib.auth import get_user_model
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
-from django.core.cache import cache
 from django.conf import settings
-from accounts.utils.otp import (
-    build_otp_payload,
-    constant_time_compare,
-    generate_otp,
-    get_payload_remaining_ttl,
-    otp_hash,
-)
+from accounts.utils import otp as otp_utils
+from accounts.utils.otp import admin_otp_store, generate_otp, onboarding_otp_store
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
 from .serializers import UserSerializer
 from django.urls import reverse
 from django.utils.crypto import get_random_string
+from common import ratelimit
+from common.notifications import enqueue_email, enqueue_whatsapp
 from common.security import PublicEndpointMixin
 
 logger = logging.getLogger(__name__)
 
 GOOGLE_AUTH_AVAILABLE = False
 google_auth_exceptions = None
-google_auth_requests = None
-google_id_token = None
+google_certs = None
 try:
     from google.auth import exceptions as google_auth_exceptions
-    from google.auth.transport import requests as google_auth_requests
-    from google.oauth2 import id_token as google_id_token
+    from . import google_certs
     GOOGLE_AUTH_AVAILABLE = True
 except ImportError:
     logger.debug("google-auth extras no disponibles; deshabilitando Google Login.")
@@ -88,6 +78,11 @@ def _get_client_ip(request):
 
 
 def _build_rate_identifier(request=None, *, user=None, email=None, phone=None):
+    """
+    Devuelve (identificador del sujeto, identificador de IP): se limitan por separado
+    para que cambiar de IP no reinicie el cupo de un usuario y una IP no pueda barrer
+    muchos usuarios.
+    """
     parts = []
     if user:
         parts.append(f"uid={user.id}")
@@ -96,19 +91,31 @@ def _build_rate_identifier(request=None, *, user=None, email=None, phone=None):
     if phone:
         parts.append(f"phone={phone}")
     ip = _get_client_ip(request) if request else "unknown"
-    parts.append(f"ip={ip}")
-    joined = "|".join(parts)
-    return _normalize_rate_identifier(joined)
+    subject = _normalize_rate_identifier("|".join(parts)) if parts else None
+    return subject, _normalize_rate_identifier(f"ip={ip}")
 
 
 def _rate_limit_key(action: str, identifier: str) -> str:
-    return f"rl:{action}:{identifier}"
+    return f"{action}:{identifier}"
 
 
-def _rate_limit_check(action: str, identifier: str, limit: int, window: int):
-    key = _rate_limit_key(action, identifier)
-    attempts = _increment_rate_counter(key, window)
-    return attempts <= limit, attempts
+def _rate_limit_check(action: str, identifiers, limit: int, window: int):
+    """
+    Un intento contra el cupo del sujeto (`limit`) y el de la IP
+    (`limit * OTP_RATE_LIMIT_IP_FACTOR`) en una sola operación atómica.
+    """
+    subject, ip = identifiers
+    rules = [(_rate_limit_key(action, ip), limit * settings.OTP_RATE_LIMIT_IP_FACTOR, window)]
+    if subject:
+        rules.insert(0, (_rate_limit_key(action, subject), limit, window))
+    allowed, retry_after, _ = ratelimit.hit(rules)
+    return allowed, retry_after
+
+
+def _too_many_requests(payload, retry_after):
+    response = Response(payload, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
 
 
 def _normalize_origin(value: str) -> str:
@@ -149,7 +156,7 @@ def _derive_google_dni(sub: str):
 
 def _send_email_code(email: str, code: str):
     """
-    Envía el código 2FA por email (ingresado en login).
+    Encola el código 2FA por email (ingresado en login); lo entrega send_notifications.
     """
     if not email:
         logger.warning("No se pudo enviar código 2FA: email vacío.")
@@ -161,46 +168,24 @@ def _send_email_code(email: str, code: str):
         "Si no solicitaste este ingreso, podés ignorar este mensaje."
     )
     from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@sancayetano.com")
-    try:
-        send_mail(
-            subject,
-            message,
-            from_email,
-            [email],
-            fail_silently=False,
-        )
-        return True
-    except Exception as exc:  # pragma: no cover - side effect externo
-        logger.warning("No se pudo enviar el código por email: %s", exc)
-        return False
+    enqueue_email(
+        email,
+        subject,
+        message,
+        kind="admin_otp",
+        from_email=from_email,
+        ttl_seconds=settings.OTP_TIMEOUT_SECONDS,
+    )
+    return True
 
 
 def _send_whatsapp_code(phone: str, code: str):
     """
-    Envía (o al menos registra) el código 2FA por WhatsApp.
-    Si se configura WHATSAPP_WEBHOOK_URL, intentamos hacer POST con {to, message}.
-    Caso contrario, se loguea para entorno de pruebas.
+    Encola el código 2FA por WhatsApp (POST {to, message} a WHATSAPP_WEBHOOK_URL).
+    Sin webhook configurado sólo se loguea, para entorno de pruebas.
     """
     message = f"Tu código de acceso (admin) es: {code}. Vence en 5 minutos."
-    webhook = os.getenv("WHATSAPP_WEBHOOK_URL")
-    if webhook:
-        if not requests:
-            logger.warning(
-                "requests no instalado; no se puede enviar WhatsApp",
-                extra={"phone": phone},
-            )
-            return False
-        try:
-            requests.post(
-                webhook,
-                json={"to": phone, "message": message},
-                timeout=5,
-            )
-            return True
-        except Exception as exc:  # pragma: no cover - side effect externo
-            logger.warning("No se pudo enviar el código por WhatsApp: %s", exc)
-            return False
-    logger.info("[2FA admin] Enviar a %s: %s", phone or "(sin teléfono)", message)
+    enqueue_whatsapp(phone, message, kind="admin_otp", ttl_seconds=settings.OTP_TIMEOUT_SECONDS)
     return True
 
 
@@ -213,14 +198,13 @@ def _build_reset_link(user, request=None):
 
 def _send_onboarding(user, request=None, *, send_otp: bool = True):
     """
-    Envía link de acceso + OTP opcional por email y WhatsApp (si hay webhook).
+    Encola link de acceso + OTP opcional por email y WhatsApp (si hay webhook).
     """
     link = _build_reset_link(user, request=request)
     otp = None
     if send_otp:
         otp = generate_otp()
-        payload = build_otp_payload(otp)
-        cache.set(f"onboarding_otp:{user.id}", payload, timeout=settings.OTP_TIMEOUT_SECONDS)
+        onboarding_otp_store.issue(user.id, otp, timeout=settings.OTP_TIMEOUT_SECONDS)
 
     # Email con link + OTP
     if user.email:
@@ -230,55 +214,18 @@ def _send_onboarding(user, request=None, *, send_otp: bool = True):
         ]
         if otp:
             parts.append(f"Tu código de acceso es: {otp} (10 minutos de validez).")
-        try:
-            send_mail(
-                "Accedé a tu cuenta",
-                "\n".join(parts),
-                None,
-                [user.email],
-                fail_silently=False,
-            )
-        except Exception as exc:
-            logger.error("onboarding_email_failed", extra={"user_id": user.id, "email": user.email, "error": str(exc)})
+        enqueue_email(user.email, "Accedé a tu cuenta", "\n".join(parts), kind="onboarding")
 
     # WhatsApp opcional
     phone = getattr(user, "phone", "") or ""
-    webhook = os.getenv("WHATSAPP_WEBHOOK_URL")
-    if phone and webhook:
-        if not requests:
-            logger.warning("requests no está instalado; no se puede enviar WhatsApp.")
-            return otp
+    if phone and settings.WHATSAPP_WEBHOOK_URL:
         msg = f"Accedé a tu cuenta: {link}"
         if otp:
             msg += f" | Código: {otp}"
-        try:
-            requests.post(webhook, json={"to": phone, "message": msg}, timeout=5)
-        except Exception as exc:  # pragma: no cover
-            logger.warning("onboarding_whatsapp_failed", extra={"user_id": user.id, "phone": phone, "error": str(exc)})
+        enqueue_whatsapp(phone, msg, kind="onboarding")
     return otp
 
 
-def _increment_rate_counter(rate_key, cooldown):
-    cache.add(rate_key, 0, timeout=cooldown)
-    try:
-        return cache.incr(rate_key)
-    except (ValueError, NotImplementedError):
-        if not settings.DEBUG:
-            raise
-        current = cache.get(rate_key, 0)
-        next_value = current + 1
-        ttl = None
-        ttl_func = getattr(cache, "ttl", None)
-        if callable(ttl_func):
-            try:
-                ttl = ttl_func(rate_key)
-            except Exception:
-                ttl = None
-        timeout = ttl if ttl and ttl > 0 else cooldown
-        cache.set(rate_key, next_value, timeout=timeout)
-        return next_value
-
-
 class EmailLoginView(PublicEndpointMixin, APIView):
     """
     Endpoint de login compatible con el frontend mock (/auth/login).
@@ -296,10 +243,8 @@ class EmailLoginView(PublicEndpointMixin, APIView):
         if not email or not password:
             return Response({"detail": "Email y contraseña requeridos."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Buscamos usuario por email; si no, intentamos por DNI con el mismo valor
-        user = User.objects.filter(email__iexact=email).first()
-        if not user:
-            user = User.objects.filter(dni=email).first()
+        # Email o DNI con el mismo valor, en una sola consulta
+        user = User.objects.get_for_login(email)
         if not user:
             return Response({"detail": "Credenciales inválidas."}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -310,8 +255,6 @@ class EmailLoginView(PublicEndpointMixin, APIView):
 
         # Doble verificación para staff/admin
         if user.is_staff:
-            cache_key = f"admin_otp:{user.id}"
-            payload = cache.get(cache_key)
             rate_identifier = _build_rate_identifier(request, user=user, email=email)
             send_limit = settings.OTP_RATE_LIMIT_SEND_COUNT
             send_window = settings.OTP_RATE_LIMIT_SEND_WINDOW
@@ -321,40 +264,27 @@ class EmailLoginView(PublicEndpointMixin, APIView):
             otp_window = settings.OTP_TIMEOUT_SECONDS
 
             if otp:
-                allowed, _ = _rate_limit_check(
+                allowed, retry_after = _rate_limit_check(
                     "otp_verify",
                     rate_identifier,
                     verify_limit,
                     verify_window,
                 )
                 if not allowed:
-                    return Response(
+                    return _too_many_requests(
                         {"detail": "Demasiados intentos. Esperá unos minutos e intentá nuevamente.", "require_otp": True},
+                        retry_after,
+                    )
+                result = admin_otp_store.verify(user.id, otp, max_attempts=max_attempts)
+                if result == otp_utils.LOCKED:
+                    return Response(
+                        {
+                            "detail": "Demasiados intentos. Esperá unos minutos e intentá nuevamente.",
+                            "require_otp": True,
+                        },
                         status=status.HTTP_429_TOO_MANY_REQUESTS,
                     )
-                has_payload = bool(payload)
-                valid = False
-                if has_payload:
-                    candidate_hash = otp_hash(otp, payload["salt"])
-                    valid = constant_time_compare(payload["hash"], candidate_hash)
-                if not valid:
-                    if payload:
-                        attempts = payload.get("attempts", 0) + 1
-                        remaining_ttl = get_payload_remaining_ttl(payload)
-                        if remaining_ttl <= 0:
-                            cache.delete(cache_key)
-                        else:
-                            payload["attempts"] = attempts
-                            cache.set(cache_key, payload, timeout=max(remaining_ttl, 1))
-                        if attempts >= max_attempts:
-                            cache.delete(cache_key)
-                            return Response(
-                                {
-                                    "detail": "Demasiados intentos. Esperá unos minutos e intentá nuevamente.",
-                                    "require_otp": True,
-                                },
-                                status=status.HTTP_429_TOO_MANY_REQUESTS,
-                            )
+                if result != otp_utils.VERIFIED:
                     return Response(
                         {
                             "detail": "Código inválido o expirado.",
@@ -364,25 +294,23 @@ class EmailLoginView(PublicEndpointMixin, APIView):
                         },
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                cache.delete(cache_key)
             else:
-                allowed, _ = _rate_limit_check(
+                allowed, retry_after = _rate_limit_check(
                     "otp_send",
                     rate_identifier,
                     send_limit,
                     send_window,
                 )
                 if not allowed:
-                    return Response(
+                    return _too_many_requests(
                         {
                             "detail": "Demasiados envíos de código. Esperá unos minutos e intentá nuevamente.",
                             "require_otp": True,
                         },
-                        status=status.HTTP_429_TOO_MANY_REQUESTS,
+                        retry_after,
                     )
                 code = generate_otp()
-                payload = build_otp_payload(code)
-                cache.set(cache_key, payload, timeout=otp_window)
+                admin_otp_store.issue(user.id, code, timeout=otp_window)
                 _send_email_code(email, code)
                 return Response(
                     {
@@ -433,23 +361,14 @@ class PasswordResetRequestView(PublicEndpointMixin, views.APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        # Enviamos email con el link de reseteo (usa el backend configurado)
+        # Encolamos el email con el link de reseteo (lo entrega send_notifications)
         subject = "Recuperá tu contraseña"
         message = (
             "Solicitaste restablecer tu contraseña.\n\n"
             f"Usá este enlace para continuar: {reset_link}\n\n"
             "Si no fuiste vos, ignorá este mensaje."
         )
-        try:
-            send_mail(
-                subject,
-                message,
-                None,  # usa DEFAULT_FROM_EMAIL
-                [user.email],
-                fail_silently=False,
-            )
-        except Exception:
-            return response.Response({"detail": "No se pudo enviar el email. Revisá la configuración SMTP."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        enqueue_email(user.email, subject, message, kind="password_reset")
 
         return response.Response({"detail": "Te enviamos un correo con instrucciones."}, status=status.HTTP_200_OK)
 
@@ -615,10 +534,12 @@ class GoogleLoginView(PublicEndpointMixin, APIView):
             )
 
         try:
-            token_payload = google_id_token.verify_oauth2_token(
-                id_token,
-                google_auth_requests.Request(),
-                audience=client_id,
+            token_payload = google_certs.verify_oauth2_token(id_token, audience=client_id)
+        except google_auth_exceptions.TransportError as exc:
+            logger.warning("google_certs_unavailable", extra={"error": str(exc)})
+            return Response(
+                {"detail": "No se pudo validar el token de Google. Intentá de nuevo."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
         except (ValueError, google_auth_exceptions.GoogleAuthError) as exc:
             return Response(
@@ -729,18 +650,18 @@ class ResendOnboardingView(APIView):
             email=user.email,
             phone=(getattr(user, "phone", "") or ""),
         )
-        allowed, _ = _rate_limit_check(
+        allowed, retry_after = _rate_limit_check(
             "otp_send",
             identifier,
             settings.OTP_RATE_LIMIT_SEND_COUNT,
             settings.OTP_RATE_LIMIT_SEND_WINDOW,
         )
         if not allowed:
-            return Response(
+            return _too_many_requests(
                 {
                     "detail": "Demasiados envíos de código. Esperá unos minutos e intentá nuevamente.",
                 },
-                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                retry_after,
             )
         try:
             otp = _send_onboarding(user, request=request, send_otp=True)
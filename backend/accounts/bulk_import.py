@@ -0,0 +1,375 @@
+"""
+Importación masiva de usuarios (CSV o JSONL) para migrar la cartera de una agencia.
+
+Las filas se leen en streaming y se procesan por lotes: validación, un `bulk_create`
+por lote, un único UPDATE (CASE) para vincular pólizas y, opcionalmente, el onboarding
+encolado en el outbox. Sin `password` en la fila el usuario queda con password
+inutilizable y entra por el link de onboarding; con password, el hash (la parte cara)
+puede repartirse en un pool de procesos.
+
+Columnas: dni, email (obligatorias), first_name, last_name, phone, birth_date
+(AAAA-MM-DD), password, policy_ids y policy_numbers (separados por `;` en CSV o
+listas en JSONL).
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
+
+from common.notifications import enqueue_email_batch
+from policies.models import Policy
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 500
+USER_FIELDS = ("first_name", "last_name", "phone")
+
+
+def detect_format(name="", content_type=""):
+    name = (name or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return "csv"
+
+
+class ImportFileError(ValueError):
+    """El archivo dejó de poder leerse a mitad de camino; `report` tiene lo ya importado."""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+def _sniff_encoding(stream, block_size=64 * 1024):
+    """
+    UTF-8 (con o sin BOM) si todo el archivo decodifica así; si no, CP1252, que es lo que
+    exporta Excel en Windows. Recorre el archivo antes de importar nada y vuelve al
+    principio; si el stream no permite seek se asume UTF-8.
+    """
+    if not stream.seekable():
+        return "utf-8-sig"
+    start = stream.tell()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while True:
+            block = stream.read(block_size)
+            decoder.decode(block or b"", final=not block)
+            if not block:
+                return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1252"
+    finally:
+        stream.seek(start)
+
+
+def iter_rows(stream, fmt):
+    """
+    Itera `(número_de_fila, dict)` sobre un stream binario o de texto sin cargarlo entero.
+    Las filas que no se pueden parsear salen como `(n, None)` para reportarlas.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding=_sniff_encoding(stream), newline="")
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=2):  # la 1 es el encabezado
+            yield number, {(k or "").strip(): v for k, v in row.items()}
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def _as_list(value):
+    if value in (None, ""):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in str(value).split(";") if part.strip()]
+
+
+def _clean_row(row):
+    """
+    Devuelve (datos, errores) de una fila, sin tocar la DB.
+    """
+    errors = []
+    dni = str(row.get("dni") or "").strip()
+    email = str(row.get("email") or "").strip().lower()
+    if not dni:
+        errors.append("dni: obligatorio.")
+    elif len(dni) > User._meta.get_field("dni").max_length:
+        errors.append("dni: demasiado largo.")
+    if not email:
+        errors.append("email: obligatorio.")
+    else:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append("email: inválido.")
+
+    birth_date = None
+    raw_birth = str(row.get("birth_date") or "").strip()
+    if raw_birth:
+        try:
+            birth_date = date.fromisoformat(raw_birth)
+        except ValueError:
+            errors.append("birth_date: usar AAAA-MM-DD.")
+
+    policy_ids = []
+    for value in _as_list(row.get("policy_ids")):
+        if value.isdigit():
+            policy_ids.append(int(value))
+        else:
+            errors.append(f"policy_ids: '{value}' no es un id.")
+
+    data = {
+        "dni": dni,
+        "email": email,
+        "birth_date": birth_date,
+        "password": str(row.get("password") or "").strip(),
+        "policy_ids": policy_ids,
+        "policy_numbers": _as_list(row.get("policy_numbers")),
+    }
+    for field in USER_FIELDS:
+        data[field] = str(row.get(field) or "").strip()[: User._meta.get_field(field).max_length]
+    return data, errors
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.linked_policies = 0
+        self.onboarding_queued = 0
+        self.errors = []
+
+    def add_error(self, row, errors, data=None):
+        data = data or {}
+        self.errors.append(
+            {"row": row, "dni": data.get("dni", ""), "email": data.get("email", ""), "errors": errors}
+        )
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "linked_policies": self.linked_policies,
+            "onboarding_queued": self.onboarding_queued,
+            "errors": self.errors,
+        }
+
+
+class UserImporter:
+    def __init__(self, *, chunk_size=DEFAULT_CHUNK_SIZE, hash_workers=0, send_onboarding=True, request=None):
+        self.chunk_size = max(1, chunk_size)
+        self.hash_workers = hash_workers
+        self.send_onboarding = send_onboarding
+        self.request = request
+        self.report = ImportReport()
+        self._seen_dni = set()
+        self._seen_email = set()
+        self._executor = None
+
+    def run(self, rows):
+        rows = iter(rows)
+        try:
+            while True:
+                try:
+                    chunk = list(islice(rows, self.chunk_size))
+                except (UnicodeDecodeError, csv.Error) as exc:
+                    # Los lotes anteriores ya están commiteados: se informa cuántos.
+                    raise ImportFileError(
+                        f"No se pudo leer el archivo ({exc}). Se importaron {self.report.created} "
+                        "usuarios de las filas anteriores; corregí el archivo y reimportá el resto.",
+                        report=self.report.as_dict(),
+                    ) from exc
+                if not chunk:
+                    break
+                self._process_chunk(chunk)
+        finally:
+            if self._executor:
+                self._executor.shutdown()
+        logger.info(
+            "users_imported",
+            extra={
+                "users_created": self.report.created,
+                "rows_failed": len(self.report.errors),
+                "linked_policies": self.report.linked_policies,
+            },
+        )
+        return self.report.as_dict()
+
+    def _process_chunk(self, chunk):
+        valid = []
+        for number, row in chunk:
+            if row is None:
+                self.report.add_error(number, ["fila ilegible."])
+                continue
+            data, errors = _clean_row(row)
+            if not errors:
+                # Duplicados dentro del mismo archivo: gana la primera aparición.
+                if data["dni"] in self._seen_dni:
+                    errors.append("dni: repetido en el archivo.")
+                if data["email"] in self._seen_email:
+                    errors.append("email: repetido en el archivo.")
+            if errors:
+                self.report.add_error(number, errors, data)
+                continue
+            self._seen_dni.add(data["dni"])
+            self._seen_email.add(data["email"])
+            valid.append((number, data))
+        if not valid:
+            return
+
+        valid = self._drop_existing(valid)
+        valid = self._resolve_policies(valid)
+        if not valid:
+            return
+        users = self._build_users(valid)
+        created = self._insert(valid, users)
+        if created:
+            self._link_policies(created)
+            if self.send_onboarding:
+                self._queue_onboarding([user for _, data, user in created if not data["password"]])
+
+    def _drop_existing(self, valid):
+        dnis = [data["dni"] for _, data in valid]
+        emails = [data["email"] for _, data in valid]
+        taken_dni = set(User.objects.filter(dni__in=dnis).values_list("dni", flat=True))
+        taken_email = set(
+            User.objects.alias(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .values_list("email", flat=True)
+        )
+        taken_email = {email.lower() for email in taken_email}
+        kept = []
+        for number, data in valid:
+            errors = []
+            if data["dni"] in taken_dni:
+                errors.append("dni: ya existe un usuario.")
+            if data["email"] in taken_email:
+                errors.append("email: ya existe un usuario.")
+            if errors:
+                self.report.add_error(number, errors, data)
+            else:
+                kept.append((number, data))
+        return kept
+
+    def _resolve_policies(self, valid):
+        ids = {pk for _, data in valid for pk in data["policy_ids"]}
+        numbers = {n for _, data in valid for n in data["policy_numbers"]}
+        if not ids and not numbers:
+            return valid
+        found = Policy.objects.filter(Q(id__in=ids) | Q(number__in=numbers)).values_list("id", "number")
+        known_ids = {pk for pk, _ in found}
+        id_by_number = {number: pk for pk, number in found}
+        kept = []
+        for number, data in valid:
+            errors = [f"policy_ids: {pk} no existe." for pk in data["policy_ids"] if pk not in known_ids]
+            errors += [f"policy_numbers: {n} no existe." for n in data["policy_numbers"] if n not in id_by_number]
+            if errors:
+                self.report.add_error(number, errors, data)
+                continue
+            data["policies"] = sorted(set(data["policy_ids"]) | {id_by_number[n] for n in data["policy_numbers"]})
+            kept.append((number, data))
+        return kept
+
+    def _hash_passwords(self, passwords):
+        if not passwords:
+            return []
+        # Un proceso daemon (p. ej. un worker de `manage.py test --parallel`) no puede
+        # tener hijos: ahí se hashea en serie.
+        use_pool = self.hash_workers > 1 and not multiprocessing.current_process().daemon
+        if use_pool and len(passwords) > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.hash_workers)
+            chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+            return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+        return [make_password(password) for password in passwords]
+
+    def _build_users(self, valid):
+        with_password = [data["password"] for _, data in valid if data["password"]]
+        hashed = iter(self._hash_passwords(with_password))
+        users = []
+        for _, data in valid:
+            # Sin password: inutilizable hasta que la defina desde el link de onboarding.
+            password = next(hashed) if data["password"] else make_password(None)
+            users.append(
+                User(
+                    dni=data["dni"],
+                    email=data["email"],
+                    first_name=data["first_name"],
+                    last_name=data["last_name"],
+                    phone=data["phone"],
+                    birth_date=data["birth_date"],
+                    password=password,
+                )
+            )
+        return users
+
+    def _insert(self, valid, users):
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            created = [(number, data, user) for (number, data), user in zip(valid, users)]
+        except IntegrityError:
+            # Otro proceso creó alguno en el medio: fila por fila para reportar cuáles.
+            created = []
+            for (number, data), user in zip(valid, users):
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                except IntegrityError:
+                    user.pk = None
+                    self.report.add_error(number, ["dni o email: ya existe un usuario."], data)
+                else:
+                    created.append((number, data, user))
+        self.report.created += len(created)
+        return created
+
+    def _link_policies(self, created):
+        owner_by_policy = {pk: user.pk for _, data, user in created for pk in data.get("policies", [])}
+        if not owner_by_policy:
+            return
+        updated = Policy.objects.filter(id__in=owner_by_policy).update(
+            user_id=Case(*(When(id=pk, then=Value(uid)) for pk, uid in owner_by_policy.items()))
+        )
+        self.report.linked_policies += updated
+
+    def _queue_onboarding(self, users):
+        if not users:
+            return
+        from .auth_views import _build_reset_link
+
+        messages = []
+        for user in users:
+            link = _build_reset_link(user, request=self.request)
+            body = "\n".join(["Bienvenido/a a San Cayetano Seguros.", f"Establecé tu contraseña acá: {link}"])
+            messages.append((user.email, "Accedé a tu cuenta", body))
+        enqueue_email_batch(messages, kind="onboarding")
+        self.report.onboarding_queued += len(messages)
+
+
+def import_users(rows, **options):
+    return UserImporter(**options).run(rows)
@@ -0,0 +1,218 @@
+"""
+Verificación de id_token de Google con las claves de firma cacheadas.
+
+`google.oauth2.id_token.verify_oauth2_token` baja los certificados de Google en cada
+llamada. Acá se guardan en memoria del proceso y en el cache compartido, con la
+vigencia que indica el `Cache-Control: max-age` de la respuesta, y se renuevan en un
+thread cuando entran en el margen de refresco: en régimen el login nunca espera un
+fetch. Solo se descarga de forma sincrónica en frío (sin claves en ningún lado) o,
+como mucho una vez por minuto, cuando llega un `kid` desconocido (rotación).
+
+Acepta tanto el formato v1 (kid -> certificado PEM) como el JWKS de v3.
+"""
+
+import base64
+import json
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from google.auth import exceptions, jwt
+from google.auth.transport import requests as google_auth_requests
+
+logger = logging.getLogger(__name__)
+
+ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+CACHE_KEY = "google_certs"
+REFRESH_LOCK_KEY = "google_certs:refreshing"
+DEFAULT_MAX_AGE = 3600
+MISSING_KID_COOLDOWN = 60
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(headers):
+    for name, value in (headers or {}).items():
+        if name.lower() == "cache-control":
+            match = _MAX_AGE_RE.search(value or "")
+            if match:
+                return int(match.group(1))
+    return DEFAULT_MAX_AGE
+
+
+def _b64_int(value):
+    raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+    return int.from_bytes(raw, "big")
+
+
+def parse_certs(data):
+    """
+    Normaliza la respuesta de Google a `{kid: PEM}`, que es lo que espera `jwt.decode`.
+    """
+    if "keys" not in data:
+        return {str(kid): pem for kid, pem in data.items()}
+    import rsa  # dependencia de google-auth
+
+    certs = {}
+    for key in data["keys"]:
+        if key.get("kty") != "RSA" or not key.get("kid"):
+            continue
+        public_key = rsa.PublicKey(_b64_int(key["n"]), _b64_int(key["e"]))
+        certs[key["kid"]] = public_key.save_pkcs1().decode("ascii")
+    return certs
+
+
+def download_certs(url):
+    """
+    Descarga las claves y devuelve `(certs, max_age)`.
+    """
+    response = google_auth_requests.Request()(url, method="GET")
+    if response.status != 200:
+        raise exceptions.TransportError(f"No se pudieron obtener los certificados de Google ({response.status}).")
+    body = response.data.decode("utf-8") if isinstance(response.data, bytes) else response.data
+    return parse_certs(json.loads(body)), _max_age(response.headers)
+
+
+class CertStore:
+    """
+    Claves de Google en memoria del proceso, respaldadas por el cache compartido.
+
+    La entrada guardada es `{"certs", "expires_at", "refresh_at"}` (epoch): pasado
+    `refresh_at` se sigue sirviendo la copia vigente y se dispara un refresco en
+    background (uno por vez entre procesos); pasado `expires_at` ya no se usa.
+    """
+
+    def __init__(self, download=None, clock=time.time):
+        self._download = download or download_certs
+        self.clock = clock
+        self._entry = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_forced = 0.0
+
+    def get(self):
+        now = self.clock()
+        entry = self._entry
+        if not self._usable(entry, now):
+            entry = self._from_shared(now) or self._refresh_blocking(now, entry)
+        elif now >= entry["refresh_at"]:
+            shared = self._from_shared(now)
+            if shared and shared["refresh_at"] > now:
+                entry = shared
+            else:
+                self._refresh_in_background()
+        return entry["certs"]
+
+    def certs_for(self, token):
+        """
+        Claves para verificar `token`; si su `kid` no está (Google rotó), refresca.
+        """
+        certs = self.get()
+        kid = self._kid(token)
+        if kid is None or kid in certs:
+            return certs
+        now = self.clock()
+        with self._lock:
+            if kid in self._entry["certs"] or now - self._last_forced < MISSING_KID_COOLDOWN:
+                return self._entry["certs"]
+            self._last_forced = now
+        logger.info("google_certs_unknown_kid", extra={"kid": kid})
+        try:
+            return self.refresh()["certs"]
+        except Exception:  # noqa: BLE001 - se verifica con lo que hay y falla por kid
+            logger.exception("google_certs_refresh_failed")
+            return certs
+
+    def refresh(self):
+        """
+        Descarga y publica las claves en memoria y en el cache compartido.
+        """
+        certs, max_age = self._download(settings.GOOGLE_CERTS_URL)
+        now = self.clock()
+        margin = min(settings.GOOGLE_CERTS_REFRESH_MARGIN_SECONDS, max_age // 2)
+        entry = {"certs": certs, "expires_at": now + max_age, "refresh_at": now + max_age - margin}
+        if max_age > 0:
+            cache.set(CACHE_KEY, entry, timeout=max_age)
+        self._entry = entry
+        logger.debug("google_certs_refreshed", extra={"keys": len(certs), "max_age": max_age})
+        return entry
+
+    def clear(self):
+        self._entry = None
+        self._last_forced = 0.0
+        cache.delete_many([CACHE_KEY, REFRESH_LOCK_KEY])
+
+    def wait(self, timeout=None):
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @staticmethod
+    def _usable(entry, now):
+        return entry is not None and entry["expires_at"] > now
+
+    @staticmethod
+    def _kid(token):
+        try:
+            return jwt.decode_header(token).get("kid")
+        except (ValueError, exceptions.GoogleAuthError):
+            return None
+
+    def _from_shared(self, now):
+        entry = cache.get(CACHE_KEY)
+        if not self._usable(entry, now):
+            return None
+        self._entry = entry
+        return entry
+
+    def _refresh_blocking(self, now, stale):
+        with self._lock:
+            entry = self._entry
+            if self._usable(entry, self.clock()):
+                return entry
+            try:
+                return self.refresh()
+            except Exception:
+                # Mejor una copia recién vencida que rechazar todos los logins.
+                if stale is None:
+                    raise
+                logger.exception("google_certs_refresh_failed")
+                return stale
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not cache.add(REFRESH_LOCK_KEY, 1, timeout=MISSING_KID_COOLDOWN):
+                return  # otro proceso ya lo está renovando
+            self._thread = threading.Thread(target=self._background_refresh, name="google-certs", daemon=True)
+            self._thread.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception:  # noqa: BLE001 - se reintenta en el próximo request
+            logger.exception("google_certs_refresh_failed")
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+
+
+store = CertStore()
+
+
+def verify_oauth2_token(token, audience, *, clock_skew_in_seconds=0):
+    """
+    Equivalente a `google.oauth2.id_token.verify_oauth2_token` con claves cacheadas.
+    Levanta ValueError / GoogleAuthError como el original.
+    """
+    payload = jwt.decode(
+        token,
+        certs=store.certs_for(token),
+        audience=audience,
+        clock_skew_in_seconds=clock_skew_in_seconds,
+    )
+    if payload.get("iss") not in ISSUERS:
+        raise exceptions.GoogleAuthError(f"Wrong issuer. 'iss' should be one of the following: {list(ISSUERS)}")
+    return payload
@@ -0,0 +1,87 @@
+"""
+Hashers con costo configurable por settings y métricas del chequeo de contraseña.
+
+Los costos (`PASSWORD_PBKDF2_ITERATIONS`, `PASSWORD_ARGON2_*`, `PASSWORD_SCRYPT_WORK_FACTOR`)
+se leen en cada uso: `must_update` compara contra el hash guardado y Django re-hashea
+en el próximo login exitoso cuando cambian.
+"""
+
+import contextvars
+import logging
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+logger = logging.getLogger(__name__)
+
+# Lista mutable por request (la crea PasswordTimingMiddleware) para el header Server-Timing.
+_request_timings = contextvars.ContextVar("password_check_timings", default=None)
+
+
+def _setting(name, default):
+    value = getattr(settings, name, None)
+    return default if value is None else value
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return _setting("PASSWORD_PBKDF2_ITERATIONS", hashers.PBKDF2PasswordHasher.iterations)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return _setting("PASSWORD_ARGON2_TIME_COST", hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return _setting("PASSWORD_ARGON2_MEMORY_COST", hashers.Argon2PasswordHasher.memory_cost)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return _setting("PASSWORD_SCRYPT_WORK_FACTOR", hashers.ScryptPasswordHasher.work_factor)
+
+
+def algorithm_of(encoded):
+    if not encoded or "$" not in encoded:
+        return "unusable"
+    return encoded.split("$", 1)[0]
+
+
+def record_password_check(algorithm, seconds, *, rehashed=False):
+    duration_ms = seconds * 1000
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append(duration_ms)
+    # Cada login a DEBUG; los re-hash (cambio de algoritmo o costo) a INFO.
+    logger.log(
+        logging.INFO if rehashed else logging.DEBUG,
+        "password_check",
+        extra={"algorithm": algorithm, "duration_ms": round(duration_ms, 2), "rehashed": rehashed},
+    )
+
+
+class PasswordTimingMiddleware:
+    """
+    Agrega `Server-Timing: pwd;dur=<ms>` a las respuestas donde se verificó una
+    contraseña (login, JWT, admin), junto a las métricas del resto del request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = []
+        token = _request_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timings.reset(token)
+        if timings:
+            entry = f"pwd;dur={sum(timings):.1f}"
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = f"{existing}, {entry}" if existing else entry
+        return response
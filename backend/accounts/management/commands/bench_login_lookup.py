@@ -0,0 +1,97 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+User = get_user_model()
+BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_lookup(identifier):
+    user = User.objects.filter(email__iexact=identifier).first()
+    if not user:
+        user = User.objects.filter(dni=identifier).first()
+    return user
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la búsqueda del login (email o DNI) con N usuarios sintéticos: la versión "
+        "anterior (email__iexact + DNI, fila completa) contra get_for_login. "
+        "Los usuarios se crean dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000, help="Usuarios sintéticos a generar.")
+        parser.add_argument("--queries", type=int, default=500, help="Búsquedas por caso y variante.")
+        parser.add_argument("--logins", type=int, default=20, help="Logins completos (búsqueda + check_password).")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        total = max(1, options["users"])
+        queries = max(1, options["queries"])
+        password = "bench-Password-1"
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self._populate(total, make_password(password))
+                self.stdout.write(
+                    f"{connection.vendor}: {total} usuarios generados en {time.perf_counter() - start:.1f}s"
+                )
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE accounts_user")
+                ids = [rng.randrange(total) for _ in range(queries)]
+                cases = {
+                    "email (mayúsculas)": [f"Bench{i}@Example.com" for i in ids],
+                    "dni": [str(90_000_000 + i) for i in ids],
+                    "inexistente": [f"nadie{i}@example.com" for i in ids],
+                }
+                for label, identifiers in cases.items():
+                    legacy = self._time(_legacy_lookup, identifiers)
+                    fast = self._time(User.objects.get_for_login, identifiers)
+                    self.stdout.write(
+                        f"  {label:<20} antes {legacy:8.3f} ms  get_for_login {fast:8.3f} ms  x{legacy / fast:.1f}"
+                    )
+                self._full_login(ids[: max(1, options["logins"])], password)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _populate(self, total, password_hash):
+        batch = []
+        for i in range(total):
+            batch.append(User(dni=str(90_000_000 + i), email=f"bench{i}@example.com", password=password_hash))
+            if len(batch) >= BATCH_SIZE:
+                User.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                batch = []
+        User.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+    def _time(self, lookup, identifiers):
+        start = time.perf_counter()
+        for identifier in identifiers:
+            lookup(identifier)
+        return (time.perf_counter() - start) / len(identifiers) * 1000
+
+    def _full_login(self, ids, password):
+        lookup_ms = hash_ms = 0.0
+        for i in ids:
+            start = time.perf_counter()
+            user = User.objects.get_for_login(f"bench{i}@example.com")
+            mid = time.perf_counter()
+            user.check_password(password)
+            lookup_ms += (mid - start) * 1000
+            hash_ms += (time.perf_counter() - mid) * 1000
+        n = len(ids)
+        self.stdout.write(
+            f"  login completo       {(lookup_ms + hash_ms) / n:8.3f} ms  "
+            f"(búsqueda {lookup_ms / n:.3f} ms + check_password {hash_ms / n:.3f} ms)"
+        )
@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide en esta máquina el costo de verificar una contraseña con el hasher configurado "
+        "(PASSWORD_HASHER) y, para PBKDF2, con otras cantidades de iteraciones. "
+        "Sirve para elegir el costo según el tamaño de instancia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=10, help="Hashes por variante.")
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            nargs="*",
+            default=[],
+            help="Iteraciones PBKDF2 alternativas a comparar (p. ej. 260000 480000 720000).",
+        )
+
+    def handle(self, *args, **options):
+        samples = max(1, options["samples"])
+        hasher = get_hasher()
+        if options["iterations"] and hasher.algorithm != "pbkdf2_sha256":
+            raise CommandError("--iterations sólo aplica con PASSWORD_HASHER=pbkdf2_sha256.")
+
+        self.stdout.write(f"Hasher: {settings.PASSWORD_HASHER} ({hasher.__class__.__module__}.{hasher.__class__.__name__})")
+        salt = hasher.salt()
+        self._report("configurado", samples, lambda: hasher.encode("bench-Password-1", salt))
+        for iterations in options["iterations"]:
+            self._report(
+                f"{iterations} iteraciones",
+                samples,
+                lambda iterations=iterations: hasher.encode("bench-Password-1", salt, iterations=iterations),
+            )
+
+    def _report(self, label, samples, run):
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"  {label:<24} mediana {median:8.1f} ms  máx {max(timings):8.1f} ms  "
+            f"~{1000 / median:6.1f} logins/s por core"
+        )
@@ -0,0 +1,66 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk_import import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    ImportFileError,
+    detect_format,
+    import_users,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa usuarios desde un CSV o JSONL (migración de agencias). Valida y crea por "
+        "lotes, vincula pólizas y encola el onboarding de quienes no traen password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo CSV/JSONL.")
+        parser.add_argument("--format", choices=FORMATS, default=None, help="Por defecto según la extensión.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=0,
+            help="Procesos para hashear las passwords que vengan en el archivo (0 = en este proceso).",
+        )
+        parser.add_argument("--no-onboarding", action="store_true", help="No encolar el email de alta.")
+        parser.add_argument("--report", default="", help="Escribe los errores por fila en este JSONL.")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or detect_format(options["path"])
+        started = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as stream:
+                report = import_users(
+                    iter_rows(stream, fmt),
+                    chunk_size=options["chunk_size"],
+                    hash_workers=options["hash_workers"],
+                    send_onboarding=not options["no_onboarding"],
+                )
+        except OSError as exc:
+            raise CommandError(f"No se pudo leer {options['path']}: {exc}")
+        except ImportFileError as exc:
+            raise CommandError(str(exc))
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as out:
+                for error in report["errors"]:
+                    out.write(json.dumps(error, ensure_ascii=False) + "\n")
+        else:
+            for error in report["errors"][:20]:
+                self.stdout.write(f"  fila {error['row']}: {'; '.join(error['errors'])}")
+            if report["failed"] > 20:
+                self.stdout.write(f"  ... y {report['failed'] - 20} más (usá --report).")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Creados: {report['created']}  con error: {report['failed']}  "
+                f"pólizas vinculadas: {report['linked_policies']}  onboarding: {report['onboarding_queued']}  "
+                f"({time.perf_counter() - started:.1f}s)"
+            )
+        )
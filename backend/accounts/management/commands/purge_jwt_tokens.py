@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import purge_expired_tokens, token_table_stats, warm_revocations
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes los refresh tokens vencidos (outstanding y blacklist), informa el "
+        "tamaño de las tablas y resincroniza el conjunto de revocados en el cache. Apto para cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Tokens por DELETE.")
+        parser.add_argument("--max-batches", type=int, default=0, help="Corta tras N lotes (0 = sin límite).")
+        parser.add_argument("--stats", action="store_true", help="Sólo informa el tamaño de las tablas.")
+
+    def handle(self, *args, **options):
+        before = token_table_stats()
+        self._report("Antes" if not options["stats"] else "Tablas", before)
+        if options["stats"]:
+            return
+        deleted = purge_expired_tokens(batch_size=max(1, options["batch_size"]), max_batches=options["max_batches"])
+        loaded = warm_revocations()
+        self._report("Después", token_table_stats())
+        self.stdout.write(
+            self.style.SUCCESS(f"Borrados: {deleted}  revocados vigentes en cache: {loaded}")
+        )
+
+    def _report(self, label, stats):
+        self.stdout.write(
+            f"{label}: outstanding {stats['outstanding']} (vencidos {stats['outstanding_expired']})  "
+            f"blacklist {stats['blacklisted']}"
+        )
@@ -1,6 +1,26 @@
+import time
+
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from .hashers import algorithm_of, record_password_check
+
+# Lo que usan el login (check_password, JWT) y UserSerializer; el resto queda diferido.
+LOGIN_FIELDS = (
+    "id",
+    "password",
+    "dni",
+    "email",
+    "first_name",
+    "last_name",
+    "phone",
+    "birth_date",
+    "is_staff",
+    "is_active",
+)
+
 
 class UserManager(BaseUserManager):
     use_in_migrations = True
@@ -31,6 +51,29 @@ class UserManager(BaseUserManager):
 
         return self.create_user(dni, email, password, **extra_fields)
 
+    def login_candidates(self, identifier):
+        identifier = (identifier or "").strip()
+        return (
+            self.alias(email_lower=Lower("email"))
+            .filter(Q(email_lower=identifier.lower()) | Q(dni=identifier))
+            .only(*LOGIN_FIELDS)
+        )
+
+    def get_for_login(self, identifier):
+        """
+        Busca por email (case-insensitive, vía el índice sobre Lower("email")) o por DNI
+        en una sola consulta. Si el valor matchea el email de uno y el DNI de otro, gana
+        el email, igual que antes.
+        """
+        identifier = (identifier or "").strip()
+        if not identifier:
+            return None
+        candidates = list(self.login_candidates(identifier)[:2])
+        for user in candidates:
+            if user.email.lower() == identifier.lower():
+                return user
+        return candidates[0] if candidates else None
+
 
 class User(AbstractUser):
     # Sacamos username y usamos dni como identificador
@@ -46,5 +89,22 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower("email"), name="accounts_user_email_lower_idx"),
+        ]
+
     def __str__(self):
         return self.dni
+
+    def check_password(self, raw_password):
+        # Si los parámetros del hasher cambiaron, Django re-hashea y guarda acá mismo.
+        previous = self.password
+        started = time.perf_counter()
+        valid = super().check_password(raw_password)
+        record_password_check(
+            algorithm_of(previous),
+            time.perf_counter() - started,
+            rehashed=self.password != previous,
+        )
+        return valid
@@ -87,9 +87,8 @@ class AuthTests(APITestCase):
     def test_google_import_placeholders_present(self):
         # Asegura que, incluso si google-auth no está instalado, las variables existen.
         self.assertTrue(hasattr(auth_views, "GOOGLE_AUTH_AVAILABLE"))
-        self.assertTrue(hasattr(auth_views, "google_id_token"))
-        self.assertTrue(hasattr(auth_views, "google_auth_requests"))
         self.assertTrue(hasattr(auth_views, "google_auth_exceptions"))
+        self.assertTrue(hasattr(auth_views, "google_certs"))
 
     def test_google_login_dependencies_missing(self):
         url = reverse("auth-google")
@@ -105,7 +104,7 @@ class AuthTests(APITestCase):
         url = reverse("auth-google")
         env = {"ENABLE_GOOGLE_LOGIN": "true", "GOOGLE_CLIENT_ID": "test-client"}
         with patch.dict(os.environ, env):
-            with patch("accounts.auth_views.google_id_token.verify_oauth2_token", side_effect=ValueError("invalid")):
+            with patch("accounts.auth_views.google_certs.verify_oauth2_token", side_effect=ValueError("invalid")):
                 res = self.client.post(url, {"id_token": "bad"})
         self.assertEqual(res.status_code, 401)
         self.assertIn("detail", res.data)
@@ -129,7 +128,7 @@ class AuthTests(APITestCase):
             "picture": "https://example.com/pic.png",
         }
         with patch.dict(os.environ, env):
-            with patch("accounts.auth_views.google_id_token.verify_oauth2_token") as mock_verify:
+            with patch("accounts.auth_views.google_certs.verify_oauth2_token") as mock_verify:
                 mock_verify.return_value = base_payload
                 res = self.client.post(url, {"id_token": "ok"})
         self.assertEqual(res.status_code, 200)
@@ -145,7 +144,7 @@ class AuthTests(APITestCase):
         # Reejecutamos con nombres nuevos para verificar sync.
         updated_payload = {**base_payload, "given_name": "Googleia", "family_name": "Sync"}
         with patch.dict(os.environ, env):
-            with patch("accounts.auth_views.google_id_token.verify_oauth2_token") as mock_verify:
+            with patch("accounts.auth_views.google_certs.verify_oauth2_token") as mock_verify:
                 mock_verify.return_value = updated_payload
                 res2 = self.client.post(url, {"id_token": "ok"})
         self.assertEqual(res2.status_code, 200)
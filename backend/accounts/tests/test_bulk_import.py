@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from accounts.bulk_import import ImportFileError, UserImporter, import_users, iter_rows
+from common.models import NotificationOutbox
+from policies.models import Policy
+
+User = get_user_model()
+URL = "/api/admin/users/import"
+
+CSV = """dni,email,first_name,last_name,phone,birth_date,policy_numbers
+30000001,Uno@Example.com,Ana,Uno,221555,1990-05-01,POL-1;POL-2
+30000002,dos@example.com,Beto,Dos,,,
+30000001,otro@example.com,Repetido,,,,
+30000003,no-es-email,Mal,,,,
+30000004,cuatro@example.com,Cuatro,,,31/12/1990,
+30000005,cinco@example.com,Cinco,,,,POL-X
+99999999,existente@example.com,Existe,,,,
+"""
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class BulkImportEndpointTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(dni="1", email="admin@example.com", password="x", is_staff=True)
+        User.objects.create_user(dni="99999999", email="existente@example.com", password="x")
+        self.pol1 = Policy.objects.create(number="POL-1")
+        self.pol2 = Policy.objects.create(number="POL-2")
+
+    def _post(self, content, name="clientes.csv", **extra):
+        upload = SimpleUploadedFile(name, content.encode("utf-8"), content_type="text/csv")
+        return self.client.post(URL, {"file": upload, **extra}, format="multipart")
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.get(dni="99999999"))
+        self.assertEqual(self._post(CSV).status_code, 403)
+
+    def test_csv_import_creates_valid_rows_and_reports_the_rest(self):
+        self.client.force_authenticate(self.admin)
+        res = self._post(CSV)
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["linked_policies"], 2)
+        self.assertEqual(res.data["onboarding_queued"], 2)
+        errors = {e["row"]: e["errors"] for e in res.data["errors"]}
+        self.assertEqual(errors[4], ["dni: repetido en el archivo."])
+        self.assertEqual(errors[5], ["email: inválido."])
+        self.assertEqual(errors[6], ["birth_date: usar AAAA-MM-DD."])
+        self.assertEqual(errors[7], ["policy_numbers: POL-X no existe."])
+        self.assertEqual(errors[8], ["dni: ya existe un usuario.", "email: ya existe un usuario."])
+
+        user = User.objects.get(dni="30000001")
+        self.assertEqual(user.email, "uno@example.com")
+        self.assertEqual(user.birth_date, date(1990, 5, 1))
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(set(Policy.objects.filter(user=user).values_list("number", flat=True)), {"POL-1", "POL-2"})
+        onboarding = NotificationOutbox.objects.filter(kind="onboarding").order_by("recipient")
+        self.assertEqual([n.recipient for n in onboarding], ["dos@example.com", "uno@example.com"])
+        self.assertIn("/reset/confirm?uid=", onboarding[0].body)
+
+    def test_onboarding_can_be_skipped(self):
+        self.client.force_authenticate(self.admin)
+        res = self._post(CSV, send_onboarding="false")
+        self.assertEqual(res.data["onboarding_queued"], 0)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_cp1252_export_is_decoded(self):
+        self.client.force_authenticate(self.admin)
+        content = "dni,email,first_name,last_name\n30000010,munoz@example.com,Ñato,Muñoz\n".encode("cp1252")
+        upload = SimpleUploadedFile("clientes.csv", content, content_type="text/csv")
+        res = self.client.post(URL, {"file": upload}, format="multipart")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(User.objects.get(dni="30000010").last_name, "Muñoz")
+
+    def test_undecodable_file_answers_400(self):
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile("clientes.csv", b"dni,email\n30000011,\x81@example.com\n", content_type="text/csv")
+        res = self.client.post(URL, {"file": upload}, format="multipart")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("Se importaron 0 usuarios", res.data["detail"])
+        self.assertEqual(res.data["created"], 0)
+
+    def test_unknown_format_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self._post(CSV, format="xlsx").status_code, 400)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class BulkImportServiceTests(TestCase):
+    def test_queries_do_not_grow_with_rows(self):
+        policies = Policy.objects.bulk_create([Policy(number=f"P-{i}") for i in range(60)])
+        rows = [
+            (i, {"dni": str(40000000 + i), "email": f"u{i}@example.com", "policy_ids": [policies[i].id]})
+            for i in range(60)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            report = import_users(rows, chunk_size=30, send_onboarding=False)
+        self.assertEqual(report["created"], 60)
+        self.assertEqual(report["linked_policies"], 60)
+        # Por lote: dni tomados, emails tomados, pólizas, bulk_create, update (+ savepoints).
+        self.assertLessEqual(len(ctx.captured_queries), 2 * 8)
+        self.assertEqual(Policy.objects.get(number="P-7").user.dni, "40000007")
+
+    def test_jsonl_command_hashes_passwords_in_a_process_pool(self):
+        lines = [
+            json.dumps({"dni": "50000001", "email": "a@example.com", "password": "Clave-1"}),
+            "{roto",
+            json.dumps({"dni": "50000002", "email": "b@example.com", "password": "Clave-2"}),
+            json.dumps({"dni": "50000003", "email": "c@example.com"}),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clientes.jsonl")
+            report_path = os.path.join(tmp, "errores.jsonl")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+            out = io.StringIO()
+            call_command("import_users", path, "--hash-workers", "2", "--report", report_path, stdout=out)
+            with open(report_path, encoding="utf-8") as fh:
+                errors = [json.loads(line) for line in fh]
+        self.assertIn("Creados: 3  con error: 1", out.getvalue())
+        self.assertEqual(errors, [{"row": 2, "dni": "", "email": "", "errors": ["fila ilegible."]}])
+        self.assertTrue(User.objects.get(dni="50000001").check_password("Clave-1"))
+        self.assertTrue(User.objects.get(dni="50000002").check_password("Clave-2"))
+        self.assertFalse(User.objects.get(dni="50000003").has_usable_password())
+        self.assertEqual(NotificationOutbox.objects.filter(recipient="c@example.com").count(), 1)
+
+    def test_daemon_process_hashes_serially(self):
+        importer = UserImporter(hash_workers=2)
+        with patch("accounts.bulk_import.multiprocessing.current_process") as current:
+            current.return_value.daemon = True
+            hashed = importer._hash_passwords(["Clave-1", "Clave-2"])
+        self.assertIsNone(importer._executor)
+        self.assertEqual(len(hashed), 2)
+
+    def test_unreadable_file_reports_what_was_committed(self):
+        class Unseekable(io.BytesIO):
+            def seekable(self):
+                return False
+
+        # Sin seek no se puede detectar antes: la fila latin-1 aparece después de varios lotes.
+        valid = "".join(f"{40000000 + i},u{i}@example.com\n" for i in range(1000))
+        content = f"dni,email\n{valid}".encode() + "30000021,ñ@example.com\n".encode("latin-1")
+        with self.assertRaises(ImportFileError) as ctx:
+            import_users(iter_rows(Unseekable(content), "csv"), chunk_size=100, send_onboarding=False)
+        created = ctx.exception.report["created"]
+        self.assertGreater(created, 0)
+        self.assertIn(f"Se importaron {created} usuarios", str(ctx.exception))
+        self.assertEqual(User.objects.filter(dni__startswith="4000").count(), created)
+
+    def test_iter_rows_reads_binary_csv_with_bom(self):
+        stream = io.BytesIO("﻿dni,email\n1,a@example.com\n".encode("utf-8"))
+        self.assertEqual(list(iter_rows(stream, "csv")), [(2, {"dni": "1", "email": "a@example.com"})])
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts import auth_views
+
+GOOGLE_AUTH_AVAILABLE = getattr(auth_views, "GOOGLE_AUTH_AVAILABLE", False)
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+if GOOGLE_AUTH_AVAILABLE:
+    import base64
+
+    import rsa
+    from google.auth import crypt, jwt
+
+    from accounts import google_certs
+    from accounts.google_certs import CertStore, parse_certs
+
+    # Key set local: los tests nunca salen a buscar los certificados reales.
+    _KEYS = {kid: rsa.newkeys(1024) for kid in ("kid-1", "kid-2")}
+
+    def _public_pem(kid):
+        return _KEYS[kid][0].save_pkcs1().decode("ascii")
+
+    def _sign(kid, **claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "google-sub-1",
+            "email": "certs@example.com",
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 300,
+            **claims,
+        }
+        signer = crypt.RSASigner.from_string(_KEYS[kid][1].save_pkcs1(), key_id=kid)
+        return jwt.encode(signer, payload).decode("ascii")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDownload:
+    def __init__(self, *kids, max_age=3600):
+        self.kids = list(kids)
+        self.max_age = max_age
+        self.calls = 0
+        self.gate = None
+
+    def __call__(self, url):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {kid: _public_pem(kid) for kid in self.kids}, self.max_age
+
+
+@unittest.skipUnless(GOOGLE_AUTH_AVAILABLE, "requires google-auth")
+@override_settings(GOOGLE_CERTS_REFRESH_MARGIN_SECONDS=600)
+class CertStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.download = FakeDownload("kid-1")
+        self.store = CertStore(download=self.download, clock=self.clock)
+
+    def test_certs_are_fetched_once_and_shared_between_processes(self):
+        self.assertIn("kid-1", self.store.get())
+        self.store.get()
+        self.assertEqual(self.download.calls, 1)
+
+        other_download = FakeDownload("kid-1")
+        other = CertStore(download=other_download, clock=self.clock)
+        self.assertIn("kid-1", other.get())
+        self.assertEqual(other_download.calls, 0)
+
+    def test_refresh_runs_in_background_before_expiry(self):
+        self.store.get()
+        self.download.gate = threading.Event()
+        self.download.kids = ["kid-1", "kid-2"]
+        self.clock.now += 3600 - 300  # dentro del margen de refresco, todavía vigente
+        started = time.monotonic()
+        certs = self.store.get()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(list(certs), ["kid-1"])
+        self.download.gate.set()
+        self.store.wait(5)
+        self.assertEqual(self.download.calls, 2)
+        self.assertEqual(sorted(self.store.get()), ["kid-1", "kid-2"])
+
+    def test_expired_certs_are_fetched_synchronously(self):
+        self.store.get()
+        cache.clear()
+        self.clock.now += 3601
+        self.store.get()
+        self.assertEqual(self.download.calls, 2)
+
+    def test_max_age_sets_expiry(self):
+        self.download.max_age = 100
+        entry = self.store.refresh()
+        self.assertEqual(entry["expires_at"], self.clock.now + 100)
+        self.assertEqual(entry["refresh_at"], self.clock.now + 50)
+        self.assertEqual(google_certs._max_age({"Cache-Control": "public, max-age=21600, must-revalidate"}), 21600)
+        self.assertEqual(google_certs._max_age({}), google_certs.DEFAULT_MAX_AGE)
+
+    def test_unknown_kid_forces_a_single_refresh(self):
+        self.store.get()
+        self.download.kids = ["kid-1", "kid-2"]
+        token = _sign("kid-2")
+        self.assertIn("kid-2", self.store.certs_for(token))
+        self.assertEqual(self.download.calls, 2)
+
+        self.download.kids = ["kid-1"]
+        self.store.refresh()
+        calls = self.download.calls
+        self.store.certs_for(token)
+        self.assertEqual(self.download.calls, calls)  # cooldown: no se martilla a Google
+
+    def test_jwks_format_is_converted(self):
+        public_key = _KEYS["kid-2"][0]
+
+        def b64(number):
+            raw = number.to_bytes((number.bit_length() + 7) // 8, "big")
+            return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+        certs = parse_certs({"keys": [{"kty": "RSA", "kid": "kid-2", "n": b64(public_key.n), "e": b64(public_key.e)}]})
+        payload = jwt.decode(_sign("kid-2"), certs=certs, audience=CLIENT_ID)
+        self.assertEqual(payload["sub"], "google-sub-1")
+
+
+@unittest.skipUnless(GOOGLE_AUTH_AVAILABLE, "requires google-auth")
+class GoogleLoginWithCachedCertsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.download = FakeDownload("kid-1")
+        patcher = patch.object(google_certs, "store", CertStore(download=self.download))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env = patch.dict(os.environ, {"ENABLE_GOOGLE_LOGIN": "true", "GOOGLE_CLIENT_ID": CLIENT_ID})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_login_verifies_signature_without_refetching(self):
+        url = reverse("auth-google")
+        for _ in range(2):
+            res = self.client.post(url, {"id_token": _sign("kid-1")})
+            self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["user"]["email"], "certs@example.com")
+        self.assertEqual(self.download.calls, 1)
+
+    def test_wrong_audience_or_foreign_key_is_rejected(self):
+        url = reverse("auth-google")
+        self.assertEqual(self.client.post(url, {"id_token": _sign("kid-1", aud="otro")}).status_code, 401)
+        self.assertEqual(self.client.post(url, {"id_token": _sign("kid-2")}).status_code, 401)
+        self.assertEqual(self.client.post(url, {"id_token": _sign("kid-1", iss="evil.example.com")}).status_code, 401)
+
+    def test_cert_outage_on_cold_start_returns_503(self):
+        def failing(url):
+            raise google_certs.exceptions.TransportError("sin red")
+
+        google_certs.store._download = failing
+        res = self.client.post(reverse("auth-google"), {"id_token": _sign("kid-1")})
+        self.assertEqual(res.status_code, 503)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import user_cache
+
+User = get_user_model()
+MY_POLICIES = "/api/policies/my"
+
+
+def _user_selects(ctx):
+    return [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
+
+
+@override_settings(JWT_USER_CACHE_SECONDS=60, PASSWORD_PBKDF2_ITERATIONS=1000)
+class JWTUserCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(dni="30111444", email="cache@example.com", password="Secreta123!")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(MY_POLICIES)
+        return res, _user_selects(ctx)
+
+    def test_second_request_skips_user_query(self):
+        res, selects = self._get()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(selects), 1)
+        res, selects = self._get()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(selects, [])
+
+    def test_deactivation_is_seen_on_next_request(self):
+        self._get()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        res, selects = self._get()
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(len(selects), 1)
+
+    def test_staff_flag_change_reloads_user(self):
+        self._get()
+        User.objects.get(pk=self.user.pk).save()
+        user = user_cache.get_user(self.user.pk, lambda pk: User.objects.get(pk=pk))
+        self.assertEqual(user.pk, self.user.pk)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertTrue(user_cache.get_user(self.user.pk, lambda pk: User.objects.get(pk=pk)).is_staff)
+
+    def test_stale_load_during_invalidation_is_not_served(self):
+        stale = User.objects.get(pk=self.user.pk)
+
+        def racing_loader(pk):
+            # Otro request guarda el usuario mientras este lo estaba cargando.
+            fresh = User.objects.get(pk=pk)
+            fresh.is_active = False
+            fresh.save()
+            return stale
+
+        self.assertTrue(user_cache.get_user(self.user.pk, racing_loader).is_active)
+        self.assertFalse(user_cache.get_user(self.user.pk, lambda pk: User.objects.get(pk=pk)).is_active)
+
+    def test_deleted_user_is_rejected(self):
+        self._get()
+        self.user.delete()
+        res, _ = self._get()
+        self.assertEqual(res.status_code, 401)
+
+    @override_settings(JWT_USER_CACHE_SECONDS=0)
+    def test_disabled_cache_queries_every_time(self):
+        self._get()
+        _, selects = self._get()
+        self.assertEqual(len(selects), 1)
@@ -0,0 +1,55 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class LoginLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(dni="30111222", email="ana@example.com", password="Secreta123!")
+        # Alguien cuyo DNI coincide literalmente con el email de otro usuario.
+        cls.other = User.objects.create_user(dni="ana@example.com", email="otra@example.com", password="x")
+
+    def test_email_is_case_insensitive_and_wins_over_dni(self):
+        self.assertEqual(User.objects.get_for_login("  ANA@Example.com "), self.user)
+
+    def test_falls_back_to_dni(self):
+        self.assertEqual(User.objects.get_for_login("30111222"), self.user)
+        self.assertIsNone(User.objects.get_for_login("nadie@example.com"))
+        self.assertIsNone(User.objects.get_for_login(""))
+
+    def test_single_query_with_projection(self):
+        with CaptureQueriesContext(connection) as ctx:
+            user = User.objects.get_for_login("30111222")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(user.get_deferred_fields(), {"last_login", "is_superuser", "date_joined"})
+
+    def test_login_view_does_not_load_deferred_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(reverse("auth-login"), {"email": "Ana@example.com", "password": "Secreta123!"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["user"]["id"], self.user.id)
+        user_selects = [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
+        self.assertEqual(len(user_selects), 1)
+
+    def test_lower_email_index_exists(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, User._meta.db_table)
+        self.assertIn("accounts_user_email_lower_idx", constraints)
+
+
+@skipUnless(connection.vendor == "postgresql", "Los planes de consulta sólo se verifican en PostgreSQL.")
+class LoginLookupPlanTests(TestCase):
+    def test_lookup_uses_indexes(self):
+        User.objects.create_user(dni="30111222", email="ana@example.com", password="x")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = User.objects.login_candidates("ana@example.com").explain()
+        self.assertNotIn("Seq Scan", plan)
+        self.assertIn("accounts_user_email_lower_idx", plan)
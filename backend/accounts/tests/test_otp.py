@@ -1,9 +1,10 @@
+import threading
 from unittest.mock import patch
 
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
-from django.test import override_settings
+from django.test import SimpleTestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -64,7 +65,7 @@ class OTPTests(APITestCase):
         finally:
             self.client.force_authenticate(user=None)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        payload = cache.get(f"onboarding_otp:{self.onboard_user.id}")
+        payload = otp_utils.onboarding_otp_store.peek(self.onboard_user.id)
         self.assertIsInstance(payload, dict)
         self.assertIn("hash", payload)
         self.assertIn("salt", payload)
@@ -116,7 +117,7 @@ class OTPTests(APITestCase):
                 {"email": self.staff.email, "password": self.password, "otp": "000000"},
             )
             self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        payload = cache.get(f"admin_otp:{self.staff.id}")
+        payload = otp_utils.admin_otp_store.peek(self.staff.id)
         self.assertEqual(payload["attempts"], 4)
 
         final = self.client.post(
@@ -124,7 +125,7 @@ class OTPTests(APITestCase):
             {"email": self.staff.email, "password": self.password, "otp": "000000"},
         )
         self.assertEqual(final.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
-        self.assertIsNone(cache.get(f"admin_otp:{self.staff.id}"))
+        self.assertIsNone(otp_utils.admin_otp_store.peek(self.staff.id))
 
     @override_settings(
         OTP_PEPPER="test-pepper",
@@ -153,6 +154,7 @@ class OTPTests(APITestCase):
             self.login_url, {"email": self.staff.email, "password": self.password}
         )
         self.assertEqual(third.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(third["Retry-After"]), 0)
 
     @override_settings(DEBUG=False, FRONTEND_ORIGINS=[], FRONTEND_ORIGIN="")
     def test_reset_link_requires_frontend_origin_in_prod(self):
@@ -186,3 +188,46 @@ class OTPTests(APITestCase):
         with override_settings(OTP_PEPPER="pepper-b"):
             hash_b = otp_utils.otp_hash(otp_value, salt)
         self.assertNotEqual(hash_a, hash_b)
+
+
+@override_settings(OTP_PEPPER="test-pepper", OTP_TIMEOUT_SECONDS=600)
+class OTPStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = otp_utils.OTPStore("test_otp")
+
+    def test_verify_consumes_the_code(self):
+        self.store.issue(1, "123456")
+        self.assertEqual(self.store.verify(1, "123456", max_attempts=3), otp_utils.VERIFIED)
+        self.assertEqual(self.store.verify(1, "123456", max_attempts=3), otp_utils.MISSING)
+
+    def test_failed_attempts_keep_the_original_window(self):
+        with patch("accounts.utils.otp.time") as clock, patch.object(cache, "set", wraps=cache.set) as cache_set:
+            clock.time.return_value = 1000.0
+            self.store.issue(1, "123456", timeout=60)
+            clock.time.return_value = 1050.0
+            self.assertEqual(self.store.verify(1, "000000", max_attempts=3), otp_utils.INVALID)
+            self.assertEqual(cache_set.call_args.kwargs["timeout"], 10)
+            clock.time.return_value = 1061.0
+            self.assertEqual(self.store.verify(1, "123456", max_attempts=3), otp_utils.MISSING)
+
+    def test_concurrent_attempts_are_all_counted(self):
+        self.store.issue(1, "123456")
+        barrier = threading.Barrier(8)
+
+        def attempt():
+            barrier.wait()
+            self.store.verify(1, "000000", max_attempts=100)
+
+        threads = [threading.Thread(target=attempt) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.store.peek(1)["attempts"], 8)
+
+    def test_lock_after_max_attempts(self):
+        self.store.issue(1, "123456")
+        self.assertEqual(self.store.verify(1, "000000", max_attempts=2), otp_utils.INVALID)
+        self.assertEqual(self.store.verify(1, "000000", max_attempts=2), otp_utils.LOCKED)
+        self.assertIsNone(self.store.peek(1))
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from seguros.settings import build_password_hashers
+
+User = get_user_model()
+
+FAST_PBKDF2 = {"PASSWORD_PBKDF2_ITERATIONS": 1000}
+
+
+class BuildPasswordHashersTests(SimpleTestCase):
+    def test_preferred_hasher_goes_first_and_legacy_ones_stay(self):
+        hashers = build_password_hashers("scrypt")
+        self.assertEqual(hashers[0], "accounts.hashers.ScryptPasswordHasher")
+        self.assertIn("accounts.hashers.PBKDF2PasswordHasher", hashers)
+        self.assertIn("django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher", hashers)
+        self.assertEqual(len(hashers), len(set(hashers)))
+
+    def test_unknown_hasher_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            build_password_hashers("md5")
+
+
+@override_settings(**FAST_PBKDF2)
+class PasswordRehashOnLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(dni="30111333", email="hash@example.com", password="Secreta123!")
+
+    def test_iterations_come_from_settings(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_login_rehashes_when_cost_changes(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            res = self.client.post(reverse("auth-login"), {"email": self.user.email, "password": "Secreta123!"})
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_scrypt_migration_on_login(self):
+        with override_settings(PASSWORD_HASHERS=build_password_hashers("scrypt"), PASSWORD_SCRYPT_WORK_FACTOR=2**10):
+            with self.assertLogs("accounts.hashers", level="INFO") as logs:
+                self.assertTrue(self.user.check_password("Secreta123!"))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertTrue(logs.records[0].rehashed)
+        self.assertEqual(logs.records[0].algorithm, "pbkdf2_sha256")
+
+    def test_failed_check_does_not_rehash(self):
+        previous = self.user.password
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertFalse(self.user.check_password("incorrecta"))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, previous)
+
+    def test_login_responses_report_hash_timing(self):
+        res = self.client.post(reverse("auth-login"), {"email": self.user.email, "password": "Secreta123!"})
+        self.assertRegex(res["Server-Timing"], r"^pwd;dur=\d+\.\d$")
+        res = self.client.post(reverse("token_obtain_pair"), {"dni": self.user.dni, "password": "Secreta123!"})
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("pwd;dur=", res["Server-Timing"])
+        self.assertFalse(self.client.get("/healthz/").has_header("Server-Timing"))
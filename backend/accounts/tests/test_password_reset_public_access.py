@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from accounts.models import User
+from common.notifications import deliver_pending
 
 
 @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
@@ -22,10 +23,12 @@ class PasswordResetPublicAccessTests(APITestCase):
     def test_password_reset_request_public_without_jwt(self):
         response = self.client.post(self.url, {"email": self.user.email}, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        deliver_pending()
         self.assertEqual(len(mail.outbox), 1)
 
     def test_password_reset_request_public_with_invalid_jwt(self):
         self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid.token")
         response = self.client.post(self.url, {"email": self.user.email}, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        deliver_pending()
         self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,107 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts import tokens
+from accounts.tokens import RefreshToken, is_revoked, purge_expired_tokens
+
+User = get_user_model()
+
+
+def _blacklist_selects(ctx):
+    return [q for q in ctx.captured_queries if "token_blacklist_blacklistedtoken" in q["sql"]]
+
+
+def _revocation_lookups(ctx):
+    # El chequeo por jti (JOIN con outstanding), no el get_or_create de blacklist().
+    return [q for q in _blacklist_selects(ctx) if "INNER JOIN" in q["sql"]]
+
+
+@override_settings(JWT_REVOCATION_CACHE=True, PASSWORD_PBKDF2_ITERATIONS=1000)
+class TokenRevocationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(dni="30111555", email="rev@example.com", password="Secreta123!")
+        self.refresh_url = reverse("auth-refresh")
+
+    def test_refresh_skips_blacklist_table_once_synced(self):
+        tokens.warm_revocations()
+        refresh = str(RefreshToken.for_user(self.user))
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(self.refresh_url, {"refresh": refresh})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(_revocation_lookups(ctx), [])
+
+        with CaptureQueriesContext(connection) as ctx:
+            retry = self.client.post(self.refresh_url, {"refresh": refresh})
+        self.assertEqual(retry.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(_blacklist_selects(ctx), [])
+
+    def test_cold_cache_falls_back_to_database_and_resyncs(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        cache.clear()
+        self.assertTrue(is_revoked(token["jti"]))
+        self.assertIsNotNone(cache.get(tokens.SYNCED_KEY))
+        self.assertEqual(cache.get(tokens.REVOKED_KEY.format(token["jti"])), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertFalse(is_revoked("otro-jti"))
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_logout_revocation_is_visible_without_database(self):
+        login = self.client.post(reverse("auth-login"), {"email": self.user.email, "password": "Secreta123!"})
+        tokens.warm_revocations()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+        res = self.client.post(reverse("auth-logout"), {"refresh": login.data["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_205_RESET_CONTENT)
+        jti = RefreshToken(login.data["refresh"], verify=False)["jti"]
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(is_revoked(jti))
+        self.assertEqual(ctx.captured_queries, [])
+
+    @override_settings(JWT_REVOCATION_CACHE=False)
+    def test_cache_can_be_disabled(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(is_revoked(token["jti"]))
+        self.assertEqual(len(_blacklist_selects(ctx)), 1)
+
+
+class PurgeExpiredTokensTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(dni="30111666", email="purge@example.com", password="x")
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f"old-{i}", token="t", expires_at=now - timedelta(days=1)
+            )
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        live = OutstandingToken.objects.create(user=self.user, jti="live", token="t", expires_at=now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=live)
+
+    def test_purge_deletes_only_expired_in_batches(self):
+        self.assertEqual(purge_expired_tokens(batch_size=2, max_batches=1), 2)
+        self.assertEqual(purge_expired_tokens(batch_size=2), 3)
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["live"])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_command_reports_table_sizes(self):
+        out = io.StringIO()
+        call_command("purge_jwt_tokens", "--batch-size", "2", stdout=out)
+        output = out.getvalue()
+        self.assertIn("Antes: outstanding 6 (vencidos 5)  blacklist 4", output)
+        self.assertIn("Después: outstanding 1 (vencidos 0)  blacklist 1", output)
+        self.assertIn("revocados vigentes en cache: 1", output)
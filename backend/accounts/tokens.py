@@ -0,0 +1,152 @@
+"""
+Revocación de refresh tokens con chequeo cache-first.
+
+La blacklist de simplejwt sigue siendo la fuente de verdad, pero cada jti revocado
+también queda en el cache (`jwt_revoked:<jti>`, con TTL hasta su `exp`). Mientras
+exista el marcador `jwt_revoked:synced` el cache tiene todos los revocados vigentes y
+un jti ausente no está revocado: el refresh no toca la tabla. Sin marcador (cache
+vacío, reinicio, vencido) se consulta la DB y se vuelve a cargar el conjunto.
+
+El marcador vence cada JWT_REVOCATION_SYNC_SECONDS para acotar el impacto de un jti
+desalojado del cache; con Redis conviene una política que no desaloje claves con TTL
+antes de que venzan (p. ej. `noeviction` o memoria holgada).
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY = "jwt_revoked:{}"
+SYNCED_KEY = "jwt_revoked:synced"
+WARMING_KEY = "jwt_revoked:warming"
+WARM_BATCH_SIZE = 1000
+
+
+def _ttl_until(expires_at, now):
+    return max(1, int((expires_at - now).total_seconds()))
+
+
+def mark_revoked(jti, expires_at):
+    now = timezone.now()
+    if expires_at > now:
+        cache.set(REVOKED_KEY.format(jti), 1, timeout=_ttl_until(expires_at, now))
+
+
+def warm_revocations():
+    """
+    Carga en el cache todos los jti revocados que todavía no vencieron y marca el
+    conjunto como sincronizado. Devuelve cuántos cargó.
+    """
+    now = timezone.now()
+    loaded = 0
+    batch = {}
+    rows = (
+        BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        .values_list("token__jti", "token__expires_at")
+        .iterator(chunk_size=WARM_BATCH_SIZE)
+    )
+    for jti, expires_at in rows:
+        batch[jti] = expires_at
+        if len(batch) >= WARM_BATCH_SIZE:
+            loaded += _store_batch(batch, now)
+            batch = {}
+    loaded += _store_batch(batch, now)
+    cache.set(SYNCED_KEY, 1, timeout=settings.JWT_REVOCATION_SYNC_SECONDS)
+    return loaded
+
+
+def _store_batch(batch, now):
+    # set_many no admite TTL por clave: se agrupa por TTL (en la práctica, pocos valores).
+    by_ttl = {}
+    for jti, expires_at in batch.items():
+        by_ttl.setdefault(_ttl_until(expires_at, now), {})[REVOKED_KEY.format(jti)] = 1
+    for ttl, values in by_ttl.items():
+        cache.set_many(values, timeout=ttl)
+    return len(batch)
+
+
+def is_revoked(jti):
+    if not settings.JWT_REVOCATION_CACHE:
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    key = REVOKED_KEY.format(jti)
+    values = cache.get_many([SYNCED_KEY, key])
+    if key in values:
+        return True
+    if SYNCED_KEY in values:
+        return False
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    # Un solo request recarga el conjunto; el resto sigue consultando la DB mientras tanto.
+    if cache.add(WARMING_KEY, 1, timeout=60):
+        try:
+            warm_revocations()
+        finally:
+            cache.delete(WARMING_KEY)
+    return revoked
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken de simplejwt con el chequeo de blacklist resuelto por `is_revoked`.
+    """
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        with transaction.atomic():
+            blacklisted = super().blacklist()
+        token = blacklisted[0].token
+        mark_revoked(token.jti, token.expires_at)
+        return blacklisted
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+def token_table_stats(now=None):
+    now = now or timezone.now()
+    return {
+        "outstanding": OutstandingToken.objects.count(),
+        "outstanding_expired": OutstandingToken.objects.filter(expires_at__lte=now).count(),
+        "blacklisted": BlacklistedToken.objects.count(),
+    }
+
+
+def purge_expired_tokens(*, batch_size=5000, max_batches=0, now=None):
+    """
+    Borra tokens vencidos por lotes de ids (los BlacklistedToken caen en cascada) para
+    no bloquear la tabla con un único DELETE grande. Devuelve la cantidad borrada.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    batches = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            count, _by_model = OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += count
+        batches += 1
+        if max_batches and batches >= max_batches:
+            break
+    logger.info("jwt_tokens_purged", extra={"deleted": deleted, "batches": batches})
+    return deleted
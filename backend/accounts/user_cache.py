@@ -0,0 +1,57 @@
+"""
+Cache corto del usuario resuelto desde el JWT (JWT_USER_CACHE_SECONDS, 0 = desactivado).
+
+Cada usuario tiene una versión aleatoria en `jwt_user_version:<id>`; la entrada cacheada
+guarda la versión con la que se armó y sólo se usa si coincide. Guardar o borrar el
+usuario (password, is_active, is_staff...) rota la versión, así que una lectura
+concurrente que cachee datos viejos queda huérfana en lugar de servirse.
+Los `QuerySet.update()` sobre usuarios no disparan señales: llamar a `invalidate_user`.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "jwt_user_version:{}"
+USER_KEY = "jwt_user:{}"
+# Si la versión expira se genera otra al azar, lo que también invalida la entrada.
+VERSION_TIMEOUT = 24 * 3600
+
+
+def enabled():
+    return settings.JWT_USER_CACHE_SECONDS > 0
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_user(user_id, loader):
+    """
+    Devuelve el usuario `user_id` desde el cache o vía `loader(user_id)`.
+    `loader` puede levantar excepciones (usuario inexistente): no se cachea nada.
+    """
+    version_key = VERSION_KEY.format(user_id)
+    user_key = USER_KEY.format(user_id)
+    values = cache.get_many([version_key, user_key])
+    version = values.get(version_key)
+    cached = values.get(user_key)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    if version is None:
+        # Primera vez (o desalojada): una versión nueva descarta cualquier entrada previa.
+        cache.add(version_key, _new_version(), timeout=VERSION_TIMEOUT)
+        version = cache.get(version_key)
+    user = loader(user_id)
+    if version is not None:
+        cache.set(user_key, (version, user), timeout=settings.JWT_USER_CACHE_SECONDS)
+    return user
+
+
+def invalidate_user(user_id):
+    if not enabled():
+        return
+    cache.set(VERSION_KEY.format(user_id), _new_version(), timeout=VERSION_TIMEOUT)
+    cache.delete(USER_KEY.format(user_id))
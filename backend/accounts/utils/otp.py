@@ -1,16 +1,27 @@
 """
 Secure helpers for one-time passwords (OTP).
+
+`OTPStore` guarda hash, salt y contador de intentos de cada OTP. Con django-redis es
+un hash de Redis: verificar es un único script (HINCRBY de `attempts`, que no toca el
+TTL, y lectura de hash/salt) y el intento se cuenta aunque lleguen en paralelo. Con
+LocMem se serializa con un lock de proceso, respetando la ventana original.
 """
 
 import hashlib
 import logging
+import math
 import secrets
-from typing import Dict
+import threading
+import time
+from typing import Dict, Optional
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.utils import timezone
 
+from common.ratelimit import uses_redis
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_OTP_TIMEOUT = 600
@@ -89,3 +100,136 @@ def get_payload_remaining_ttl(payload: Dict[str, object], *, timeout: int = None
     elapsed = timezone.now().timestamp() - float(created_at)
     remaining = timeout - elapsed
     return max(int(remaining), 0)
+
+
+VERIFIED = "verified"
+INVALID = "invalid"
+LOCKED = "locked"
+MISSING = "missing"
+
+# Cuenta el intento sólo si el OTP existe (HINCRBY sobre una clave ausente crearía un
+# hash sin TTL) y devuelve lo necesario para comparar en Python.
+_LUA_VERIFY = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+local values = redis.call('HMGET', KEYS[1], 'hash', 'salt')
+return {attempts, values[1], values[2]}
+"""
+
+_lock = threading.Lock()
+_verify_script = None
+
+
+class OTPStore:
+    """
+    OTPs pendientes de un flujo (`<prefix>:<user_id>`), p. ej. `admin_otp` u `onboarding_otp`.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def key(self, user_id) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def issue(self, user_id, otp: str, *, timeout: int = None) -> Dict[str, object]:
+        """
+        Guarda un OTP nuevo (reemplaza al anterior y reinicia los intentos).
+        """
+        if timeout is None:
+            timeout = getattr(settings, "OTP_TIMEOUT_SECONDS", DEFAULT_OTP_TIMEOUT)
+        payload = build_otp_payload(otp)
+        key = self.key(user_id)
+        if uses_redis():
+            client, redis_key = _redis(key)
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(redis_key)
+            pipe.hset(redis_key, mapping=payload)
+            pipe.expire(redis_key, timeout)
+            pipe.execute()
+        else:
+            cache.set(key, {**payload, "expires_at": time.time() + timeout}, timeout=timeout)
+        return payload
+
+    def peek(self, user_id) -> Optional[Dict[str, object]]:
+        """
+        Payload vigente (`hash`, `salt`, `attempts`, `created_at`) o None. No cuenta intentos.
+        """
+        key = self.key(user_id)
+        if uses_redis():
+            client, redis_key = _redis(key)
+            raw = client.hgetall(redis_key)
+            if not raw:
+                return None
+            payload = {k.decode(): v.decode() for k, v in raw.items()}
+        else:
+            payload = cache.get(key)
+            if not payload:
+                return None
+            payload = dict(payload)
+            payload.pop("expires_at", None)
+        payload["attempts"] = int(payload.get("attempts") or 0)
+        payload["created_at"] = float(payload.get("created_at") or 0)
+        return payload
+
+    def verify(self, user_id, otp: str, *, max_attempts: int = None) -> str:
+        """
+        Cuenta el intento y compara. Devuelve VERIFIED (y consume el OTP), INVALID,
+        LOCKED (se alcanzó `max_attempts` y el OTP se descarta) o MISSING.
+        """
+        if max_attempts is None:
+            max_attempts = getattr(settings, "OTP_VERIFY_MAX_ATTEMPTS", 5)
+        key = self.key(user_id)
+        found = self._count_attempt(key)
+        if found is None:
+            return MISSING
+        attempts, stored_hash, salt = found
+        if otp and salt and constant_time_compare(stored_hash, otp_hash(otp, salt)):
+            self.discard(user_id)
+            return VERIFIED
+        if attempts >= max_attempts:
+            self.discard(user_id)
+            return LOCKED
+        return INVALID
+
+    def discard(self, user_id) -> None:
+        key = self.key(user_id)
+        if uses_redis():
+            client, redis_key = _redis(key)
+            client.delete(redis_key)
+        else:
+            cache.delete(key)
+
+    def _count_attempt(self, key):
+        if uses_redis():
+            global _verify_script
+            client, redis_key = _redis(key)
+            if _verify_script is None:
+                _verify_script = client.register_script(_LUA_VERIFY)
+            raw = _verify_script(keys=[redis_key], client=client)
+            if not raw:
+                return None
+            attempts, stored_hash, salt = raw
+            return int(attempts), (stored_hash or b"").decode(), (salt or b"").decode()
+        with _lock:
+            payload = cache.get(key)
+            if not payload:
+                return None
+            remaining = payload["expires_at"] - time.time()
+            if remaining <= 0:
+                cache.delete(key)
+                return None
+            payload["attempts"] = int(payload.get("attempts") or 0) + 1
+            cache.set(key, payload, timeout=max(1, math.ceil(remaining)))
+        return payload["attempts"], payload["hash"], payload["salt"]
+
+
+def _redis(key):
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default"), cache.make_key(key)
+
+
+admin_otp_store = OTPStore("admin_otp")
+onboarding_otp_store = OTPStore("onboarding_otp")
@@ -1,5 +1,7 @@
 # backend/accounts/views.py
 from rest_framework import viewsets, permissions, decorators, response, status
+from rest_framework.parsers import MultiPartParser
+from .bulk_import import DEFAULT_CHUNK_SIZE, FORMATS, ImportFileError, detect_format, import_users, iter_rows
 from .models import User
 from .serializers import UserSerializer
 
@@ -66,3 +68,29 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+    @decorators.action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        POST multipart con `file` (CSV o JSONL) → crea los usuarios por lotes y devuelve
+        el reporte por fila. `send_onboarding=false` omite el email de alta.
+        """
+        upload = request.FILES.get("file")
+        if not upload:
+            return response.Response({"detail": "Adjuntá el archivo en el campo 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = (request.data.get("format") or detect_format(upload.name, upload.content_type)).lower()
+        if fmt not in FORMATS:
+            return response.Response(
+                {"detail": f"Formato no soportado. Usá {' o '.join(FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        send_onboarding = str(request.data.get("send_onboarding", "true")).lower() not in ("0", "false", "no")
+        try:
+            report = import_users(
+                iter_rows(upload.file, fmt),
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                send_onboarding=send_onboarding,
+                request=request,
+            )
+        except ImportFileError as exc:
+            return response.Response({"detail": str(exc), **exc.report}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(report, status=status.HTTP_200_OK)
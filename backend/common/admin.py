@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 
-from .models import ContactInfo, AppSettings, Announcement
+from .models import ContactInfo, AppSettings, Announcement, NotificationOutbox
 
 
 @admin.register(ContactInfo)
@@ -86,3 +86,22 @@ class AnnouncementAdmin(admin.ModelAdmin):
     list_display = ("title", "is_active", "order", "created_at", "updated_at")
     list_filter = ("is_active",)
     search_fields = ("title", "message")
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "channel", "kind", "recipient", "status", "attempts", "available_at", "sent_at")
+    list_filter = ("status", "channel", "kind")
+    search_fields = ("recipient",)
+    # `body` lleva OTPs y links de reseteo en claro hasta que se envía: nunca se muestra.
+    exclude = ("body",)
+    readonly_fields = [field.name for field in NotificationOutbox._meta.fields if field.name != "body"] + [
+        "body_redacted"
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="body")
+    def body_redacted(self, obj):
+        return f"(oculto, {len(obj.body)} caracteres)" if obj.body else "-"
@@ -0,0 +1,134 @@
+"""
+Variantes async (ASGI nativas) de los GET públicos más consultados.
+
+Cada vista async cubre sólo el camino feliz del GET con el ORM async de Django y
+delega todo lo demás (otros métodos, JWT en vistas híbridas, páginas inválidas, 404)
+a la vista DRF original, así el contrato de la API no cambia. Se activan con
+ASYNC_READ_VIEWS (por defecto sólo bajo ASGI; bajo WSGI una vista async cuesta más).
+"""
+
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Announcement, ContactInfo
+from .serializers import AnnouncementSerializer, ContactInfoSerializer
+
+
+def async_read_view(async_get, sync_view, *, hybrid=False, enabled=None):
+    """
+    Combina un handler async de GET con la vista DRF original.
+    `async_get` puede devolver None para delegar el request a `sync_view`.
+    Con `hybrid=True` los requests con Authorization también van a la vista DRF,
+    que es la que sabe autenticarlos.
+    """
+    if enabled is None:
+        enabled = getattr(settings, "ASYNC_READ_VIEWS", False)
+    if not enabled:
+        return sync_view
+
+    run_sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == "GET" and not (hybrid and get_authorization_header(request)):
+            response = await async_get(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await run_sync_view(request, *args, **kwargs)
+
+    # csrf_exempt, cls, initkwargs, actions: igual que la vista DRF.
+    view.__dict__.update(sync_view.__dict__)
+    view.__name__ = getattr(sync_view, "__name__", "async_read_view")
+    return view
+
+
+def _throttle_response(view_class, request, args, kwargs, action=None):
+    """
+    Aplica los throttles de la vista DRF (mismas claves y rates) sin pasar por ella.
+    """
+    drf_request = Request(request)
+    view = view_class()
+    view.request = drf_request
+    view.args = args
+    view.kwargs = kwargs
+    view.format_kwarg = None
+    if action:
+        view.action = action
+    durations = []
+    for throttle in view.get_throttles():
+        if not throttle.allow_request(drf_request, view):
+            durations.append(throttle.wait())
+    if not durations:
+        return None
+    exc = exceptions.Throttled(max((d for d in durations if d is not None), default=None))
+    response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+    if exc.wait:
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+check_throttles = sync_to_async(_throttle_response)
+
+
+async def paginated_payload(request, queryset, to_representation):
+    """
+    Réplica async de PageNumberPagination para el caso común.
+    Devuelve None cuando la página pedida no es válida para que responda DRF (404).
+    """
+    page_size = api_settings.PAGE_SIZE
+    raw_page = request.GET.get("page") or "1"
+    try:
+        page_number = int(raw_page)
+    except (TypeError, ValueError):
+        return None
+    count = await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+    if page_number < 1 or page_number > num_pages:
+        return None
+    offset = (page_number - 1) * page_size
+    results = [to_representation(obj) async for obj in queryset[offset:offset + page_size]]
+
+    next_link = None
+    previous_link = None
+    if num_pages > 1:
+        url = request.build_absolute_uri()
+    if page_number < num_pages:
+        next_link = replace_query_param(url, "page", page_number + 1)
+    if page_number > 1:
+        if page_number - 1 == 1:
+            previous_link = remove_query_param(url, "page")
+        else:
+            previous_link = replace_query_param(url, "page", page_number - 1)
+    return {"count": count, "next": next_link, "previous": previous_link, "results": results}
+
+
+async def announcements_list(request):
+    from .views import AnnouncementViewSet
+
+    throttled = await check_throttles(AnnouncementViewSet, request, (), {}, "list")
+    if throttled:
+        return throttled
+    qs = Announcement.objects.filter(is_active=True).order_by("order", "-created_at")
+    payload = await paginated_payload(
+        request, qs, lambda obj: AnnouncementSerializer(obj).data
+    )
+    if payload is None:
+        return None
+    return JsonResponse(payload)
+
+
+async def contact_info(request):
+    from .views import ContactInfoView
+
+    throttled = await check_throttles(ContactInfoView, request, (), {})
+    if throttled:
+        return throttled
+    obj = await ContactInfo.aget_solo()
+    return JsonResponse(ContactInfoSerializer(obj).data)
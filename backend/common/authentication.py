@@ -1,14 +1,49 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework.authentication import get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
+from accounts import user_cache
 
-class StrictJWTAuthentication(JWTAuthentication):
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    Igual que JWTAuthentication pero resuelve el usuario vía accounts.user_cache
+    (si JWT_USER_CACHE_SECONDS > 0), evitando la consulta por request.
+    Las validaciones (inactivo, password cambiada) se aplican igual sobre el cacheado.
+    """
+
+    def get_user(self, validated_token):
+        if not user_cache.enabled():
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get_user(user_id, self._load_user)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def _load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+
+class StrictJWTAuthentication(CachedUserJWTAuthentication):
     """Explicit reference to the default JWT guard so intent is clear in PRIVATE endpoints."""
 
 
-class SoftJWTAuthentication(JWTAuthentication):
+class SoftJWTAuthentication(CachedUserJWTAuthentication):
     """
     Like JWTAuthentication but never raises InvalidToken/ExpiredToken for requests that
     have been marked as PUBLIC/HYBRID by the authenticator mixins.
@@ -0,0 +1,46 @@
+import logging
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+
+def connection_pooling_report():
+    """
+    Describe cómo quedó configurado el manejo de conexiones a la base (sin consultarla).
+    """
+    db = connections[DEFAULT_DB_ALIAS].settings_dict
+    return {
+        "mode": getattr(settings, "DB_CONNECTION_MODE", "none"),
+        "requested_mode": getattr(settings, "DB_POOLING_MODE", "none"),
+        "conn_max_age": db.get("CONN_MAX_AGE", 0),
+        "health_checks": bool(db.get("CONN_HEALTH_CHECKS", False)),
+        "server_side_cursors": not db.get("DISABLE_SERVER_SIDE_CURSORS", False),
+        "server_interface": getattr(settings, "SERVER_INTERFACE", "wsgi"),
+    }
+
+
+@register(Tags.database)
+def check_connection_pooling(app_configs, **kwargs):
+    report = connection_pooling_report()
+    logger.debug("db_connection_mode", extra=report)
+    warnings = []
+    if report["requested_mode"] != report["mode"]:
+        warnings.append(
+            Warning(
+                f"DB_POOLING_MODE={report['requested_mode']} no aplica bajo "
+                f"{report['server_interface'].upper()}; se usa '{report['mode']}'.",
+                hint="Bajo ASGI usá DB_POOLING_MODE=external con PgBouncer para reutilizar conexiones.",
+                id="common.W001",
+            )
+        )
+    if report["mode"] == "persistent" and not report["health_checks"]:
+        warnings.append(
+            Warning(
+                "Conexiones persistentes sin DB_CONN_HEALTH_CHECKS: una conexión caída falla el primer request que la use.",
+                id="common.W002",
+            )
+        )
+    return warnings
@@ -0,0 +1,146 @@
+"""
+Ruteo opcional de lecturas hacia una réplica de solo lectura.
+
+El router sólo manda consultas a la réplica cuando el middleware marcó el request
+actual como elegible: método seguro (GET/HEAD/OPTIONS), ruta incluida en
+`DB_REPLICA_ROUTE_NAMES` y sin escrituras recientes del mismo cliente. Todo lo que
+corre dentro de `transaction.atomic` (incluido `select_for_update`) queda en primary.
+"""
+
+import contextvars
+import hashlib
+import logging
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.authentication import get_authorization_header
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = "replica"
+DEFAULT_PIN_SECONDS = 10
+
+# Listados públicos y de clientes que toleran unos segundos de lag de replicación.
+DEFAULT_REPLICA_ROUTE_NAMES = frozenset(
+    {
+        "products-list",
+        "products-home",
+        "products-home-noslash",
+        "announcements-list",
+        "quote-share-detail",
+        "policies-list",
+        "policies-my",
+        "admin-policies-list",
+    }
+)
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in getattr(settings, "DATABASES", {})
+
+
+def replica_route_names():
+    configured = getattr(settings, "DB_REPLICA_ROUTE_NAMES", None)
+    if configured is None:
+        return DEFAULT_REPLICA_ROUTE_NAMES
+    return frozenset(configured)
+
+
+def replica_reads_enabled() -> bool:
+    return _replica_reads.get()
+
+
+def _client_identity(request) -> str:
+    """
+    Identifica al cliente para fijarlo a primary tras sus escrituras.
+    El claim del JWT se lee sin validar firma: sólo decide el ruteo, nunca autoriza.
+    """
+    header = get_authorization_header(request).split()
+    if len(header) == 2:
+        try:
+            claims = jwt.decode(header[1], options={"verify_signature": False})
+        except jwt.PyJWTError:
+            claims = {}
+        claim_name = settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id")
+        user_id = claims.get(claim_name)
+        if user_id is not None:
+            return f"uid:{user_id}"
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    ip = forwarded.split(",")[0].strip() if forwarded else request.META.get("REMOTE_ADDR")
+    return f"ip:{ip or 'unknown'}"
+
+
+def _pin_key(identity: str) -> str:
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return f"db:pin:{digest}"
+
+
+def pin_to_primary(request) -> None:
+    seconds = getattr(settings, "DB_REPLICA_PIN_SECONDS", DEFAULT_PIN_SECONDS)
+    if seconds <= 0:
+        return
+    cache.set(_pin_key(_client_identity(request)), 1, timeout=seconds)
+
+
+def is_pinned_to_primary(request) -> bool:
+    return bool(cache.get(_pin_key(_client_identity(request))))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Marca los GET elegibles para leer de la réplica y fija a primary a los clientes
+    que acaban de escribir (read-your-writes durante DB_REPLICA_PIN_SECONDS).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not replica_configured() or request.method not in SAFE_METHODS:
+            return None
+        match = getattr(request, "resolver_match", None)
+        if not match or match.url_name not in replica_route_names():
+            return None
+        if is_pinned_to_primary(request):
+            return None
+        _replica_reads.set(True)
+        return None
+
+
+class PrimaryReplicaRouter:
+    """
+    Lecturas → réplica sólo para requests marcados por ReplicaRoutingMiddleware;
+    escrituras y cualquier consulta dentro de una transacción → primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads_enabled() or not replica_configured():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primary y réplica contienen los mismos datos.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
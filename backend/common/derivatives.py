@@ -0,0 +1,128 @@
+"""
+Derivados de imágenes (variantes WebP/JPEG a anchos fijos) para servir `srcset`.
+
+Cada variante se guarda en el storage con una clave determinística al lado de la
+imagen original: `<carpeta>/derivatives/<archivo>.<ancho>w.<formato>` (p. ej.
+`quote-photos/abc123/derivatives/front.jpg.640w.webp`). Así se generan una sola vez, se
+sirven con `Cache-Control: immutable` y se borran junto con la carpeta de la imagen
+(sweep_quote_shares). Si la imagen original cambia de nombre cambian también las claves.
+
+Se generan al subir (`warm`, en el pool de Pillow: resize/encode sueltan el GIL) o, si
+faltan, en el primer request (`ensure`).
+"""
+
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_DERIVATIVE_WORKERS, thread_name_prefix="image-derivatives"
+        )
+    return _pool
+
+
+def is_supported(width, fmt):
+    return width in settings.IMAGE_DERIVATIVE_WIDTHS and fmt in settings.IMAGE_DERIVATIVE_FORMATS
+
+
+def derivative_name(name, width, fmt):
+    folder, filename = posixpath.split(name)
+    return posixpath.join(folder, "derivatives", f"{filename}.{width}w.{fmt}")
+
+
+def render(file, width, fmt):
+    """Bytes de la variante: ancho máximo `width` (nunca agranda), en `fmt`."""
+    with Image.open(file) as source:
+        source.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=settings.IMAGE_DERIVATIVE_QUALITY, method=4)
+    else:
+        image.save(buffer, "JPEG", quality=settings.IMAGE_DERIVATIVE_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def ensure(name, width, fmt, *, storage=None):
+    """Devuelve la clave de la variante, generándola si todavía no está en el storage."""
+    storage = storage or default_storage
+    key = derivative_name(name, width, fmt)
+    if storage.exists(key):
+        return key
+    with storage.open(name, "rb") as fh:
+        data = render(fh, width, fmt)
+    saved = storage.save(key, ContentFile(data))
+    if saved != key:
+        # Otro request la generó en paralelo: nos quedamos con la primera.
+        storage.delete(saved)
+    return key
+
+
+def warm(names, *, storage=None):
+    """
+    Genera todas las variantes de `names` en el pool y espera a que terminen. Una
+    imagen ilegible se loguea y se sigue (se reintentará en el primer request).
+    """
+    storage = storage or default_storage
+    jobs = [
+        get_pool().submit(ensure, name, width, fmt, storage=storage)
+        for name in names
+        for width in settings.IMAGE_DERIVATIVE_WIDTHS
+        for fmt in settings.IMAGE_DERIVATIVE_FORMATS
+    ]
+    keys = []
+    for job in jobs:
+        try:
+            keys.append(job.result())
+        except (OSError, Image.DecompressionBombError):
+            logger.warning("image_derivative_failed", exc_info=True)
+    return keys
+
+
+def srcset(url_for):
+    """
+    `{"webp": "<url> 320w, <url> 640w, ...", "jpeg": ...}` con `url_for(width, fmt)`.
+    Sin I/O: se arma también en la vista async.
+    """
+    return {
+        fmt: ", ".join(f"{url_for(width, fmt)} {width}w" for width in settings.IMAGE_DERIVATIVE_WIDTHS)
+        for fmt in settings.IMAGE_DERIVATIVE_FORMATS
+    }
+
+
+def serve(name, width, fmt, *, storage=None, expires_at=None):
+    """
+    FileResponse de la variante (generándola si falta). Sin `expires_at` se cachea como
+    inmutable; con vencimiento, sólo en el navegador (`private`) y nunca más allá de él,
+    para que la foto no siga servida desde un cache después de expirar o de borrarse.
+    """
+    storage = storage or default_storage
+    key = ensure(name, width, fmt, storage=storage)
+    response = FileResponse(storage.open(key, "rb"), content_type=CONTENT_TYPES[fmt])
+    if expires_at is None:
+        patch_cache_control(response, public=True, max_age=settings.IMAGE_DERIVATIVE_MAX_AGE, immutable=True)
+    else:
+        remaining = max(0, int((expires_at - timezone.now()).total_seconds()))
+        patch_cache_control(response, private=True, max_age=min(remaining, settings.IMAGE_DERIVATIVE_MAX_AGE))
+    return response
@@ -0,0 +1,148 @@
+"""
+Probes de readiness para /healthz/ready.
+
+Cada probe mide una dependencia real (DB, cache, storage de media, plantilla PDF de
+recibos) y se compara contra su presupuesto de latencia. El resultado se memoiza por
+proceso durante HEALTHZ_READY_CACHE_SECONDS para que el load balancer pueda consultarlo
+seguido sin generar carga (no se guarda en el cache: es una de las cosas que se prueban).
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_FAIL = "fail"
+_SEVERITY = {STATUS_OK: 0, STATUS_DEGRADED: 1, STATUS_FAIL: 2}
+
+DEFAULT_BUDGETS_MS = {
+    "database": 100,
+    "cache": 50,
+    "media_storage": 250,
+    "receipt_template": 20,
+}
+DEFAULT_READY_CACHE_SECONDS = 5
+
+_lock = threading.Lock()
+_last_report = {"expires": 0.0, "payload": None}
+
+
+def probe_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return STATUS_OK, {"vendor": connections[DEFAULT_DB_ALIAS].vendor}
+
+
+def probe_cache():
+    """
+    Round-trip set/get/delete. LocMem no se comparte entre procesos (throttles, OTP),
+    así que fuera de DEBUG se informa como degradado aunque responda.
+    """
+    key = f"healthz:{uuid.uuid4().hex}"
+    cache.set(key, "1", timeout=10)
+    value = cache.get(key)
+    cache.delete(key)
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    locmem = backend.endswith("LocMemCache")
+    info = {"backend": backend.rsplit(".", 1)[-1], "shared": not locmem}
+    if value != "1":
+        return STATUS_FAIL, info
+    if locmem and not settings.DEBUG:
+        return STATUS_DEGRADED, info
+    return STATUS_OK, info
+
+
+def probe_media_storage():
+    payload = uuid.uuid4().hex.encode("ascii")
+    name = default_storage.save(f"healthz/{payload.decode()}.txt", ContentFile(payload))
+    try:
+        with default_storage.open(name, "rb") as fh:
+            readback = fh.read()
+    finally:
+        default_storage.delete(name)
+    if readback != payload:
+        return STATUS_FAIL, {}
+    return STATUS_OK, {}
+
+
+def probe_receipt_template():
+    """Sin plantilla los recibos se generan igual, pero en blanco: degradado, no caído."""
+    from payments.utils import TEMPLATE_PDF_REL
+
+    path = os.path.join(settings.BASE_DIR, TEMPLATE_PDF_REL)
+    if os.path.isfile(path) and os.path.getsize(path) > 0:
+        return STATUS_OK, {}
+    return STATUS_DEGRADED, {"missing": TEMPLATE_PDF_REL}
+
+
+PROBES = {
+    "database": probe_database,
+    "cache": probe_cache,
+    "media_storage": probe_media_storage,
+    "receipt_template": probe_receipt_template,
+}
+
+
+def _budget_ms(name):
+    budgets = getattr(settings, "HEALTHZ_BUDGETS_MS", None) or {}
+    return budgets.get(name, DEFAULT_BUDGETS_MS[name])
+
+
+def run_probe(name, probe):
+    budget = _budget_ms(name)
+    start = time.perf_counter()
+    try:
+        status, info = probe()
+    except Exception as exc:
+        status, info = STATUS_FAIL, {"error": exc.__class__.__name__}
+        logger.warning("healthz_probe_failed", extra={"probe": name, "error": repr(exc)})
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    if status == STATUS_OK and latency_ms > budget:
+        status = STATUS_DEGRADED
+        logger.warning(
+            "healthz_probe_slow", extra={"probe": name, "latency_ms": latency_ms, "budget_ms": budget}
+        )
+    return {"status": status, "latency_ms": latency_ms, "budget_ms": budget, **info}
+
+
+def readiness_report(*, force=False):
+    """
+    Devuelve (payload, cached). Un solo hilo por proceso corre las probes; el resto
+    espera y reutiliza el resultado.
+    """
+    ttl = getattr(settings, "HEALTHZ_READY_CACHE_SECONDS", DEFAULT_READY_CACHE_SECONDS)
+    now = time.monotonic()
+    if not force and _last_report["payload"] is not None and now < _last_report["expires"]:
+        return _last_report["payload"], True
+    with _lock:
+        now = time.monotonic()
+        if not force and _last_report["payload"] is not None and now < _last_report["expires"]:
+            return _last_report["payload"], True
+        probes = {name: run_probe(name, probe) for name, probe in PROBES.items()}
+        overall = max((p["status"] for p in probes.values()), key=_SEVERITY.__getitem__)
+        payload = {
+            "status": overall,
+            "checked_at": timezone.now().isoformat(),
+            "probes": probes,
+        }
+        _last_report["payload"] = payload
+        _last_report["expires"] = time.monotonic() + max(0, ttl)
+    return payload, False
+
+
+def reset_readiness_cache():
+    _last_report["payload"] = None
+    _last_report["expires"] = 0.0
@@ -0,0 +1,70 @@
+"""
+Identificadores únicos (tokens de fichas, claim codes, códigos de producto).
+
+Los valores aleatorios tienen entropía suficiente para que una colisión sea
+excepcional: se insertan directamente y la constraint unique es la que decide.
+`create_unique` sólo reintenta si el INSERT/UPDATE falla con IntegrityError *y* el
+valor ya existe (otro IntegrityError se propaga igual). Nada de un `exists()` por
+candidato.
+
+Los códigos legibles (`AUTO-RC`, `AUTO-RC-2`, ...) salen de `next_free_code`, que
+trae en una sola consulta (LIKE por prefijo) los códigos que podrían chocar y elige el
+primer sufijo libre en memoria.
+"""
+
+import secrets
+import string
+
+from django.db import IntegrityError, transaction
+
+UNIQUE_ATTEMPTS = 5
+TOKEN_ALPHABET = string.ascii_lowercase + string.digits
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+# Lugar reservado para el sufijo al calcular el prefijo común ("-99999").
+_SUFFIX_ROOM = 6
+
+
+def random_token(length, alphabet=TOKEN_ALPHABET):
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def create_unique(action, *, model, field, generate, lookup="exact", attempts=UNIQUE_ATTEMPTS):
+    """
+    Llama `action(valor)` con `valor = generate()` dentro de un savepoint; si choca con
+    el unique de `field` reintenta con un valor nuevo. Devuelve lo que devuelva `action`.
+    """
+    attempt = 1
+    while True:
+        value = generate()
+        try:
+            with transaction.atomic():
+                return action(value)
+        except IntegrityError:
+            taken = model._default_manager.filter(**{f"{field}__{lookup}": value}).exists()
+            if not taken or attempt >= attempts:
+                raise
+        attempt += 1
+
+
+def _candidate(base, suffix, max_length):
+    if not suffix:
+        return base[:max_length]
+    tail = f"-{suffix}"
+    return f"{base[:max(1, max_length - len(tail))]}{tail}"
+
+
+def next_free_code(queryset, field, base, *, max_length):
+    """
+    Primer código libre entre `base`, `base-1`, `base-2`, ... (comparando sin
+    mayúsculas/minúsculas) con una única consulta `field__istartswith`.
+    """
+    stem = base[:max(1, max_length - _SUFFIX_ROOM)]
+    taken = {
+        value.lower()
+        for value in queryset.filter(**{f"{field}__istartswith": stem}).values_list(field, flat=True)
+    }
+    # Con N tomados, alguno de los primeros N + 1 candidatos está libre.
+    suffix = 0
+    while _candidate(base, suffix, max_length).lower() in taken:
+        suffix += 1
+    return _candidate(base, suffix, max_length)
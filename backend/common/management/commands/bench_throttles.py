@@ -0,0 +1,106 @@
+import pickle
+import statistics
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from rest_framework import throttling as drf_throttling
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common import ratelimit
+from common import throttling
+
+
+class _BenchView:
+    throttle_scope = "bench"
+
+
+def _size(value):
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el ScopedRateThrottle de DRF (historial de timestamps) contra el de "
+        "common.throttling (ventana deslizante) simulando N requests/segundo sobre una clave: "
+        "latencia por chequeo, bytes escritos al cache y bytes guardados por clave."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rps", type=int, default=1000, help="Requests por segundo simulados.")
+        parser.add_argument("--seconds", type=int, default=5, help="Duración simulada.")
+        parser.add_argument("--rate", default="", help="Rate DRF (p. ej. 1000/min). Por defecto, el del --scope.")
+        parser.add_argument("--scope", default="quotes", help="Scope de DEFAULT_THROTTLE_RATES a usar.")
+
+    def handle(self, *args, **options):
+        rps = max(1, options["rps"])
+        total = rps * max(1, options["seconds"])
+        rate = options["rate"] or settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][options["scope"]]
+        backend = "redis (Lua)" if ratelimit.uses_redis() else settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]
+        self.stdout.write(f"rate {rate}, {rps} req/s durante {total // rps}s ({total} requests), cache {backend}")
+
+        request = Request(APIRequestFactory().get("/bench/", REMOTE_ADDR="203.0.113.7"))
+        view = _BenchView()
+        for label, base in (
+            ("drf", drf_throttling.ScopedRateThrottle),
+            ("sliding", throttling.ScopedRateThrottle),
+        ):
+            throttle_class = type(f"Bench{base.__name__}", (base,), {"THROTTLE_RATES": {"bench": rate}})
+            self._report(label, self._run(throttle_class, request, view, rps, total))
+
+    def _run(self, throttle_class, request, view, rps, total):
+        start_clock = time.time()
+        clock = [start_clock]
+        written = []
+        original_set = cache.set
+
+        def counting_set(key, value, *args, **kwargs):
+            written.append(_size(value))
+            return original_set(key, value, *args, **kwargs)
+
+        cache.clear()
+        latencies = []
+        allowed = 0
+        with patch.object(cache, "set", counting_set), patch.object(
+            drf_throttling.SimpleRateThrottle, "timer", lambda self: clock[0]
+        ):
+            for i in range(total):
+                clock[0] = start_clock + i / rps
+                throttle = throttle_class()
+                began = time.perf_counter()
+                allowed += throttle.allow_request(request, view)
+                latencies.append(time.perf_counter() - began)
+
+        stored = self._stored_bytes(throttle, clock[0])
+        cache.clear()
+        latencies.sort()
+        return {
+            "allowed": allowed,
+            "total": total,
+            "mean_us": statistics.mean(latencies) * 1e6,
+            "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+            "written": sum(written),
+            "writes": len(written),
+            "stored": stored,
+        }
+
+    def _stored_bytes(self, throttle, now):
+        if isinstance(throttle, throttling.SlidingWindowThrottleMixin):
+            keys = list(ratelimit._bucket_keys(throttle.key, throttle.duration, now))
+        else:
+            keys = [throttle.key]
+        return sum(_size(value) for value in cache.get_many(keys).values())
+
+    def _report(self, label, stats):
+        written = f"{stats['written'] / 1024:.1f} KiB en {stats['writes']} sets"
+        if label == "sliding" and ratelimit.uses_redis():
+            # Con Redis los INCRBY ocurren dentro del script y no pasan por cache.set.
+            written = "INCRBY en Lua"
+        self.stdout.write(
+            f"{label:>8}: {stats['allowed']}/{stats['total']} permitidos  "
+            f"media {stats['mean_us']:.1f}µs  p99 {stats['p99_us']:.1f}µs  "
+            f"escrito {written}  guardado {stats['stored']} B/clave"
+        )
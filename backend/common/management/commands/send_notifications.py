@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.notifications import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega las notificaciones pendientes del outbox (email/WhatsApp). "
+        "Sin --loop procesa lo disponible y termina (apto para cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Notificaciones por lote.")
+        parser.add_argument("--loop", action="store_true", help="Queda escuchando el outbox.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Segundos de espera con el outbox vacío.")
+        parser.add_argument("--max-batches", type=int, default=0, help="Corta tras N lotes (0 = sin límite).")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"] or settings.NOTIFICATIONS_BATCH_SIZE
+        totals = {"sent": 0, "retried": 0, "dead": 0}
+        batches = 0
+        while True:
+            stats = deliver_pending(batch_size=batch_size)
+            batches += 1
+            for key, value in stats.items():
+                totals[key] += value
+            processed = sum(stats.values())
+            if options["max_batches"] and batches >= options["max_batches"]:
+                break
+            if processed < batch_size:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Enviadas: {totals['sent']}  reintentos: {totals['retried']}  descartadas: {totals['dead']}"
+            )
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-19 11:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0010_singleton'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('whatsapp', 'WhatsApp')], max_length=12)),
+                ('kind', models.CharField(blank=True, default='', max_length=40)),
+                ('recipient', models.CharField(max_length=254)),
+                ('subject', models.CharField(blank=True, default='', max_length=200)),
+                ('body', models.TextField(blank=True, default='')),
+                ('from_email', models.CharField(blank=True, default='', max_length=254)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('sent', 'Enviada'), ('dead', 'Descartada')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Notificación saliente',
+                'verbose_name_plural': 'Notificaciones salientes',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['available_at', 'id'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,20 @@
 from django.db import models
+from django.utils import timezone
+
+
+class MaintainedFieldsMixin:
+    """
+    Para columnas que se mantienen con UPDATEs propios (contadores, claves denormalizadas):
+    `save()` las deja fuera del UPDATE para no pisarlas con el valor leído, pero sí las
+    escribe al insertar. Se filtra en `_do_update`, así Django sigue resolviendo los
+    campos diferidos y el fallback a INSERT cuando la fila no existe.
+    """
+
+    maintained_fields = ()
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        values = [value for value in values if value[0].name not in self.maintained_fields]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
 
 
 class ContactInfo(models.Model):
@@ -31,6 +47,11 @@ class ContactInfo(models.Model):
         obj, _ = cls.objects.get_or_create(singleton=True)
         return obj
 
+    @classmethod
+    async def aget_solo(cls):
+        obj, _ = await cls.objects.aget_or_create(singleton=True)
+        return obj
+
 
 class AppSettings(models.Model):
     expiring_threshold_days = models.PositiveIntegerField(default=7)
@@ -79,3 +100,56 @@ class Announcement(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class NotificationOutbox(models.Model):
+    """
+    Notificación saliente (email/WhatsApp) pendiente de entrega.
+    Se escribe dentro del request y la entrega `manage.py send_notifications`.
+    """
+
+    CHANNEL_EMAIL = "email"
+    CHANNEL_WHATSAPP = "whatsapp"
+    CHANNEL_CHOICES = [
+        (CHANNEL_EMAIL, "Email"),
+        (CHANNEL_WHATSAPP, "WhatsApp"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendiente"),
+        (STATUS_SENT, "Enviada"),
+        (STATUS_DEAD, "Descartada"),
+    ]
+
+    channel = models.CharField(max_length=12, choices=CHANNEL_CHOICES)
+    kind = models.CharField(max_length=40, blank=True, default="")
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True, default="")
+    # Puede contener OTP/links de acceso: se vacía al entregar o descartar.
+    body = models.TextField(blank=True, default="")
+    from_email = models.CharField(max_length=254, blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["available_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                name="outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+        verbose_name = "Notificación saliente"
+        verbose_name_plural = "Notificaciones salientes"
+
+    def __str__(self):
+        return f"{self.get_channel_display()} a {self.recipient} ({self.status})"
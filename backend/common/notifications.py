@@ -0,0 +1,245 @@
+"""
+Outbox de notificaciones salientes (email y WhatsApp).
+
+Las vistas sólo escriben filas con `enqueue_email` / `enqueue_whatsapp` dentro del
+request; `deliver_pending` (vía `manage.py send_notifications`) las entrega por lotes
+reutilizando una conexión SMTP y una sesión HTTP con pool. Los fallos transitorios se
+reintentan con backoff exponencial; los permanentes o los que agotan
+NOTIFICATIONS_MAX_ATTEMPTS quedan en `dead` para revisión.
+"""
+
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import NotificationOutbox
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 3600
+
+_whatsapp_session = None
+
+
+class _Outcome:
+    SENT = "sent"
+    RETRY = "retry"
+    PERMANENT = "permanent"
+
+
+def enqueue_email(recipient, subject, body, *, kind="", from_email=None, ttl_seconds=None):
+    expires_at = timezone.now() + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+    return NotificationOutbox.objects.create(
+        channel=NotificationOutbox.CHANNEL_EMAIL,
+        kind=kind,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        from_email=from_email or "",
+        expires_at=expires_at,
+    )
+
+
+def enqueue_email_batch(messages, *, kind="", from_email=None, ttl_seconds=None):
+    """
+    Encola varios `(recipient, subject, body)` con un solo INSERT (importaciones masivas).
+    """
+    expires_at = timezone.now() + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+    return NotificationOutbox.objects.bulk_create(
+        [
+            NotificationOutbox(
+                channel=NotificationOutbox.CHANNEL_EMAIL,
+                kind=kind,
+                recipient=recipient,
+                subject=subject,
+                body=body,
+                from_email=from_email or "",
+                expires_at=expires_at,
+            )
+            for recipient, subject, body in messages
+        ],
+        batch_size=500,
+    )
+
+
+def enqueue_whatsapp(phone, message, *, kind="", ttl_seconds=None):
+    """
+    Sin WHATSAPP_WEBHOOK_URL no hay a quién entregar: sólo se loguea (entorno de pruebas).
+    """
+    if not settings.WHATSAPP_WEBHOOK_URL:
+        logger.info("[whatsapp] Enviar a %s: %s", phone or "(sin teléfono)", message)
+        return None
+    expires_at = timezone.now() + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+    return NotificationOutbox.objects.create(
+        channel=NotificationOutbox.CHANNEL_WHATSAPP,
+        kind=kind,
+        recipient=phone,
+        body=message,
+        expires_at=expires_at,
+    )
+
+
+def claim_batch(batch_size, *, now=None):
+    """
+    Reserva hasta `batch_size` notificaciones vencidas corriendo su `available_at` por
+    NOTIFICATIONS_LEASE_SECONDS, así otro worker no las toma mientras se envían.
+    """
+    now = now or timezone.now()
+    lease_until = now + timedelta(seconds=settings.NOTIFICATIONS_LEASE_SECONDS)
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationOutbox.STATUS_PENDING, available_at__lte=now)
+            .order_by("available_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if ids:
+            NotificationOutbox.objects.filter(id__in=ids).update(
+                available_at=lease_until, attempts=F("attempts") + 1
+            )
+    return list(NotificationOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def deliver_pending(*, batch_size=None, now=None):
+    """
+    Entrega un lote y devuelve contadores {sent, retried, dead}.
+    """
+    now = now or timezone.now()
+    batch = claim_batch(batch_size or settings.NOTIFICATIONS_BATCH_SIZE, now=now)
+    outcomes = {}
+    live = []
+    for notification in batch:
+        if notification.expires_at and notification.expires_at <= now:
+            outcomes[notification.id] = (_Outcome.PERMANENT, "expired")
+        else:
+            live.append(notification)
+
+    _deliver_emails([n for n in live if n.channel == NotificationOutbox.CHANNEL_EMAIL], outcomes)
+    _deliver_whatsapp([n for n in live if n.channel == NotificationOutbox.CHANNEL_WHATSAPP], outcomes)
+
+    stats = {"sent": 0, "retried": 0, "dead": 0}
+    for notification in batch:
+        result, error = outcomes.get(notification.id, (_Outcome.PERMANENT, "unknown channel"))
+        stats[_record(notification, result, error, now)] += 1
+    return stats
+
+
+def _deliver_emails(notifications, outcomes):
+    if not notifications:
+        return
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for notification in notifications:
+            outcomes[notification.id] = (_Outcome.RETRY, f"smtp open: {exc}")
+        return
+    try:
+        for notification in notifications:
+            message = EmailMessage(
+                notification.subject,
+                notification.body,
+                notification.from_email or None,
+                [notification.recipient],
+                connection=connection,
+            )
+            try:
+                sent = connection.send_messages([message])
+            except smtplib.SMTPRecipientsRefused as exc:
+                outcomes[notification.id] = (_Outcome.PERMANENT, f"smtp refused: {exc}")
+            except Exception as exc:
+                outcomes[notification.id] = (_Outcome.RETRY, f"smtp: {exc}")
+            else:
+                outcomes[notification.id] = (_Outcome.SENT, "") if sent else (_Outcome.RETRY, "smtp: not sent")
+    finally:
+        connection.close()
+
+
+def get_whatsapp_session():
+    global _whatsapp_session
+    if _whatsapp_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.NOTIFICATIONS_BATCH_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _whatsapp_session = session
+    return _whatsapp_session
+
+
+def _deliver_whatsapp(notifications, outcomes):
+    if not notifications:
+        return
+    webhook = settings.WHATSAPP_WEBHOOK_URL
+    if not webhook or requests is None:
+        reason = "requests no instalado" if webhook else "WHATSAPP_WEBHOOK_URL no configurado"
+        for notification in notifications:
+            outcomes[notification.id] = (_Outcome.PERMANENT, reason)
+        return
+    session = get_whatsapp_session()
+    for notification in notifications:
+        try:
+            resp = session.post(
+                webhook,
+                json={"to": notification.recipient, "message": notification.body},
+                timeout=settings.WHATSAPP_TIMEOUT_SECONDS,
+            )
+        except requests.RequestException as exc:
+            outcomes[notification.id] = (_Outcome.RETRY, f"http: {exc.__class__.__name__}")
+            continue
+        if resp.status_code < 400:
+            outcomes[notification.id] = (_Outcome.SENT, "")
+        elif resp.status_code == 429 or resp.status_code >= 500:
+            outcomes[notification.id] = (_Outcome.RETRY, f"http {resp.status_code}")
+        else:
+            outcomes[notification.id] = (_Outcome.PERMANENT, f"http {resp.status_code}")
+
+
+def _record(notification, result, error, now):
+    fields = ["status", "available_at", "last_error", "body"]
+    notification.last_error = (error or "")[:255]
+    if result == _Outcome.SENT:
+        notification.status = NotificationOutbox.STATUS_SENT
+        notification.sent_at = now
+        notification.available_at = now
+        notification.body = ""
+        fields.append("sent_at")
+        outcome = "sent"
+    elif result == _Outcome.RETRY and notification.attempts < settings.NOTIFICATIONS_MAX_ATTEMPTS:
+        delay = settings.NOTIFICATIONS_RETRY_BASE_SECONDS * 2 ** max(0, notification.attempts - 1)
+        notification.status = NotificationOutbox.STATUS_PENDING
+        notification.available_at = now + timedelta(seconds=min(delay, MAX_RETRY_DELAY_SECONDS))
+        fields.remove("body")
+        outcome = "retried"
+        logger.warning(
+            "notification_retry",
+            extra={"notification_id": notification.id, "kind": notification.kind, "error": notification.last_error},
+        )
+    else:
+        notification.status = NotificationOutbox.STATUS_DEAD
+        notification.available_at = now
+        notification.body = ""
+        outcome = "dead"
+        logger.error(
+            "notification_dead_lettered",
+            extra={
+                "notification_id": notification.id,
+                "kind": notification.kind,
+                "channel": notification.channel,
+                "attempts": notification.attempts,
+                "error": notification.last_error,
+            },
+        )
+    notification.save(update_fields=fields)
+    return outcome
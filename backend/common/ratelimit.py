@@ -0,0 +1,155 @@
+"""
+Rate limiter de ventana deslizante (sliding window counter) sobre el cache default.
+
+Cada regla `(key, limit, window)` usa dos contadores: el bucket actual y el anterior
+(`floor(now / window)`). El uso estimado es `prev * (1 - transcurrido / window) + curr`,
+así la memoria por clave es O(1) y no hay saltos al cambiar de ventana fija.
+
+Con django-redis todas las reglas se evalúan e incrementan en un único script Lua
+(atómico, un round trip). Con LocMem (u otros backends) se usa un lock de proceso:
+LocMem ya es por proceso, así que el resultado es equivalente.
+"""
+
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+_LUA_SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local count_rejected = tonumber(ARGV[3])
+local rules = #KEYS / 2
+local allowed = 1
+local out = {}
+for i = 1, rules do
+    local limit = tonumber(ARGV[2 + 2 * i])
+    local window = tonumber(ARGV[3 + 2 * i])
+    local curr = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local prev = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local elapsed = now - math.floor(now / window) * window
+    if prev * ((window - elapsed) / window) + curr + cost > limit then
+        allowed = 0
+    end
+    out[2 * i - 1] = curr
+    out[2 * i] = prev
+end
+if allowed == 1 or count_rejected == 1 then
+    for i = 1, rules do
+        local window = tonumber(ARGV[3 + 2 * i])
+        redis.call('INCRBY', KEYS[2 * i - 1], cost)
+        redis.call('EXPIRE', KEYS[2 * i - 1], window * 2)
+    end
+end
+table.insert(out, 1, allowed)
+return out
+"""
+
+_lock = threading.Lock()
+_script = None
+
+
+def uses_redis():
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend.startswith("django_redis.")
+
+
+def _bucket_keys(key, window, now):
+    bucket = math.floor(now / window)
+    return f"rl:{key}:{bucket}", f"rl:{key}:{bucket - 1}"
+
+
+def _estimate(prev, curr, window, now):
+    elapsed = now - math.floor(now / window) * window
+    return prev * ((window - elapsed) / window) + curr
+
+
+def _retry_after(prev, curr, limit, window, now, cost):
+    """
+    Segundos hasta que la estimación deje lugar para `cost` más (sin nuevos hits).
+    """
+    elapsed = now - math.floor(now / window) * window
+    room = limit - curr - cost
+    if room >= 0 and prev > 0:
+        # Alcanza con que el bucket anterior pierda peso dentro de esta ventana.
+        return max(0.0, window * (1 - room / prev) - elapsed)
+    # Hay que esperar a la próxima ventana, donde `curr` pasa a ser el anterior.
+    wait = window - elapsed
+    room = limit - cost
+    if curr > 0 and room >= 0:
+        wait += window * (1 - room / curr)
+    elif room < 0:
+        wait += window
+    return max(0.0, wait)
+
+
+def _run_redis(rules, now, cost, count_rejected):
+    from django_redis import get_redis_connection
+
+    global _script
+    client = get_redis_connection("default")
+    if _script is None:
+        # EVALSHA con fallback a EVAL; se reutiliza con cualquier conexión del pool.
+        _script = client.register_script(_LUA_SLIDING_WINDOW)
+    keys = []
+    args = [repr(now), cost, 1 if count_rejected else 0]
+    for key, limit, window in rules:
+        keys.extend(cache.make_key(name) for name in _bucket_keys(key, window, now))
+        args.extend([limit, window])
+    raw = _script(keys=keys, args=args, client=client)
+    allowed = bool(int(raw[0]))
+    counts = [(int(raw[2 * i + 2]), int(raw[2 * i + 1])) for i in range(len(rules))]
+    return allowed, counts
+
+
+def _run_locked(rules, now, cost, count_rejected):
+    bucket_keys = [_bucket_keys(key, window, now) for key, _, window in rules]
+    with _lock:
+        values = cache.get_many([name for pair in bucket_keys for name in pair])
+        counts = []
+        allowed = True
+        for (curr_key, prev_key), (_, limit, window) in zip(bucket_keys, rules):
+            prev = int(values.get(prev_key) or 0)
+            curr = int(values.get(curr_key) or 0)
+            if _estimate(prev, curr, window, now) + cost > limit:
+                allowed = False
+            counts.append((prev, curr))
+        if allowed or count_rejected:
+            for (curr_key, _), (_, curr), (_, _, window) in zip(bucket_keys, counts, rules):
+                cache.set(curr_key, curr + cost, timeout=window * 2)
+    return allowed, counts
+
+
+def hit(rules, *, cost=1, count_rejected=True, now=None):
+    """
+    Registra un intento contra todas las reglas `(key, limit, window)` a la vez.
+
+    Devuelve `(allowed, retry_after, usage)`: `allowed` es False si alguna regla se
+    excede, `retry_after` son los segundos hasta que la más restrictiva vuelva a
+    permitir, y `usage` el uso estimado de cada regla (mismo orden) tras este intento.
+    Con `count_rejected=False` los intentos rechazados no consumen cupo (como DRF);
+    con True (default) un cliente que insiste sigue bloqueado.
+    """
+    rules = [(key, int(limit), int(window)) for key, limit, window in rules]
+    if not rules:
+        return True, 0.0, []
+    now = time.time() if now is None else now
+    runner = _run_redis if uses_redis() else _run_locked
+    allowed, counts = runner(rules, now, cost, count_rejected)
+    recorded = allowed or count_rejected
+
+    usage = []
+    retry_after = 0.0
+    for (prev, before), (_, limit, window) in zip(counts, rules):
+        after = before + cost if recorded else before
+        usage.append(_estimate(prev, after, window, now))
+        if not allowed and _estimate(prev, before, window, now) + cost > limit:
+            retry_after = max(retry_after, _retry_after(prev, after, limit, window, now, cost))
+    return allowed, retry_after, usage
+
+
+def reset(key, window, *, now=None):
+    now = time.time() if now is None else now
+    cache.delete_many(list(_bucket_keys(key, window, now)))
@@ -0,0 +1,158 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+
+from common import async_views
+from common.async_views import async_read_view
+from common.models import Announcement
+from common.views import AnnouncementViewSet, ContactInfoView
+from products.async_views import home_products_list
+from products.models import Product
+from products.views import HomeProductsListView
+from quotes.async_views import quote_share_detail
+from quotes.models import QuoteShare
+from quotes.views import QuoteShareDetailView
+
+
+def _body(response):
+    return json.loads(response.content)
+
+
+class AsyncReadViewTests(TestCase):
+    """
+    Las variantes async deben responder exactamente lo mismo que las vistas DRF
+    (las URLs de los tests corren bajo WSGI, o sea con la vista DRF).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    def _view(self, async_get, sync_view, **kwargs):
+        return async_read_view(async_get, sync_view, enabled=True, **kwargs)
+
+    def test_disabled_returns_the_drf_view(self):
+        sync_view = HomeProductsListView.as_view()
+        self.assertIs(async_read_view(home_products_list, sync_view, enabled=False), sync_view)
+
+    async def test_home_products_match_drf_pagination(self):
+        await Product.objects.abulk_create(
+            [
+                Product(
+                    code=f"P{i:02d}",
+                    name=f"Plan {i:02d}",
+                    vehicle_type="AUTO",
+                    plan_type="TR",
+                    base_price=Decimal("1000.00"),
+                    bullets=["Grúa", "Cristales"],
+                    coverages="- Robo\n- Incendio",
+                    published_home=i != 3,
+                )
+                for i in range(14)
+            ]
+        )
+        view = self._view(home_products_list, HomeProductsListView.as_view())
+        for query in ("", "?page=2"):
+            response = await view(self.factory.get(f"/api/products/home{query}"))
+            expected = await self.async_client.get(f"/api/products/home{query}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(_body(response), expected.json())
+
+    async def test_invalid_page_falls_back_to_drf(self):
+        view = self._view(home_products_list, HomeProductsListView.as_view())
+        response = await view(self.factory.get("/api/products/home?page=9"))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_announcements_and_contact_info_match_drf(self):
+        await Announcement.objects.acreate(title="Visible", order=1)
+        await Announcement.objects.acreate(title="Oculto", is_active=False)
+        cases = (
+            (
+                "/api/common/announcements/",
+                self._view(
+                    async_views.announcements_list,
+                    AnnouncementViewSet.as_view({"get": "list"}),
+                    hybrid=True,
+                ),
+            ),
+            (
+                "/api/common/contact-info/",
+                self._view(async_views.contact_info, ContactInfoView.as_view(), hybrid=True),
+            ),
+        )
+        for path, view in cases:
+            response = await view(self.factory.get(path))
+            expected = await self.async_client.get(path)
+            self.assertEqual(_body(response), expected.json())
+
+    async def test_hybrid_views_send_authenticated_requests_to_drf(self):
+        async_get = AsyncMock()
+        view = self._view(async_get, ContactInfoView.as_view(), hybrid=True)
+        response = await view(
+            self.factory.get("/api/common/contact-info/", headers={"Authorization": "Bearer invalid"})
+        )
+        async_get.assert_not_awaited()
+        self.assertEqual(response.status_code, 200)
+
+    async def test_quote_share_detail_matches_drf(self):
+        photos = {
+            f"photo_{side}": f"quote-photos/x/{side}.jpg" for side in ("front", "back", "right", "left")
+        }
+        share = await QuoteShare.objects.acreate(
+            phone="2215550000",
+            make="Ford",
+            model="Ka",
+            version="SE",
+            year=2019,
+            city="La Plata",
+            has_garage=True,
+            is_zero_km=False,
+            usage="privado",
+            has_gnc=False,
+            **photos,
+        )
+        expired = await QuoteShare.objects.acreate(
+            phone="2215550001",
+            make="Fiat",
+            model="Uno",
+            version="Way",
+            year=2015,
+            city="Berisso",
+            has_garage=False,
+            is_zero_km=False,
+            usage="privado",
+            has_gnc=False,
+            expires_at=timezone.now() - timedelta(days=1),
+            **photos,
+        )
+        view = self._view(quote_share_detail, QuoteShareDetailView.as_view())
+        for token, status_code in ((share.token, 200), (expired.token, 410), ("missing", 404)):
+            path = f"/api/quotes/share/{token}"
+            response = await view(self.factory.get(path), token=token)
+            expected = await self.async_client.get(path)
+            self.assertEqual(response.status_code, status_code)
+            self.assertEqual(expected.status_code, status_code)
+            if status_code != 404:
+                self.assertEqual(_body(response), expected.json())
+
+    async def test_throttling_matches_drf(self):
+        view = self._view(async_views.contact_info, ContactInfoView.as_view(), hybrid=True)
+        # Reloj fijo: Retry-After depende del instante dentro de la ventana.
+        with patch.object(AnonRateThrottle, "get_rate", return_value="1/min"), patch.object(
+            SimpleRateThrottle, "timer", lambda self: 6_000_030.0
+        ):
+            first = await view(self.factory.get("/api/common/contact-info/"))
+            second = await view(self.factory.get("/api/common/contact-info/"))
+            await cache.aclear()
+            await self.async_client.get("/api/common/contact-info/")
+            expected = await self.async_client.get("/api/common/contact-info/")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(_body(second), expected.json())
+        self.assertEqual(second["Retry-After"], expected["Retry-After"])
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from common import db_routing
+from common.db_routing import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+
+
+def _with_replica():
+    return patch.object(db_routing, "replica_configured", return_value=True)
+
+
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_stay_on_primary_when_not_marked(self):
+        with _with_replica():
+            self.assertIsNone(self.router.db_for_read(User))
+
+    def test_marked_reads_go_to_replica_outside_transactions(self):
+        token = db_routing._replica_reads.set(True)
+        try:
+            with _with_replica():
+                # TestCase envuelve cada test en atomic; simulamos estar fuera.
+                with self._outside_atomic():
+                    self.assertEqual(self.router.db_for_read(User), "replica")
+                with transaction.atomic():
+                    self.assertEqual(self.router.db_for_read(User), "default")
+        finally:
+            db_routing._replica_reads.reset(token)
+
+    def test_writes_always_go_to_primary(self):
+        token = db_routing._replica_reads.set(True)
+        try:
+            with _with_replica():
+                self.assertEqual(self.router.db_for_write(User), "default")
+        finally:
+            db_routing._replica_reads.reset(token)
+
+    def _outside_atomic(self):
+        return patch.object(connections["default"], "in_atomic_block", False)
+
+
+@override_settings(DB_REPLICA_PIN_SECONDS=30)
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def _middleware(self, status=200):
+        def get_response(request):
+            self.seen.append(db_routing.replica_reads_enabled())
+            return HttpResponse(status=status)
+
+        return ReplicaRoutingMiddleware(get_response)
+
+    def _dispatch(self, middleware, request):
+        def response_after_view(req):
+            req.resolver_match = resolve(req.path)
+            middleware.process_view(req, None, (), {})
+            return original(req)
+
+        original = middleware.get_response
+        middleware.get_response = response_after_view
+        try:
+            return middleware(request)
+        finally:
+            middleware.get_response = original
+
+    def test_allowlisted_get_is_marked_for_replica(self):
+        with _with_replica():
+            self._dispatch(self._middleware(), self.factory.get("/api/products/home"))
+        self.assertEqual(self.seen, [True])
+        self.assertFalse(db_routing.replica_reads_enabled())
+
+    def test_other_routes_stay_on_primary(self):
+        with _with_replica():
+            self._dispatch(self._middleware(), self.factory.get("/api/common/contact-info/"))
+        self.assertEqual(self.seen, [False])
+
+    def test_without_replica_nothing_is_marked(self):
+        with patch.object(db_routing, "replica_configured", return_value=False):
+            self._dispatch(self._middleware(), self.factory.get("/api/products/home"))
+        self.assertEqual(self.seen, [False])
+
+    def test_reads_after_a_write_are_pinned_to_primary(self):
+        token = str(AccessToken.for_user(User(id=41, dni="41", email="pin@example.com")))
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        with _with_replica():
+            middleware = self._middleware()
+            middleware(self.factory.post("/api/policies/claim", **auth))
+            self._dispatch(middleware, self.factory.get("/api/policies/my", **auth))
+            # Otro cliente sigue leyendo de la réplica.
+            self._dispatch(middleware, self.factory.get("/api/policies/my"))
+        self.assertEqual(self.seen, [False, False, True])
+
+    def test_failed_writes_do_not_pin(self):
+        with _with_replica():
+            middleware = self._middleware(status=400)
+            middleware(self.factory.post("/api/quotes/"))
+            middleware.get_response = self._middleware().get_response
+            self._dispatch(middleware, self.factory.get("/api/products/"))
+        self.assertEqual(self.seen, [False, True])
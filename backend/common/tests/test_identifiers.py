@@ -0,0 +1,108 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from common import identifiers
+from policies.models import Policy
+from products.models import Product
+from quotes.models import QuoteShare
+
+PRODUCT = {
+    "vehicle_type": "AUTO",
+    "plan_type": "RC",
+    "base_price": Decimal("100.00"),
+    "coverages": "-",
+}
+
+
+def _selects(ctx):
+    return [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+
+
+class NextFreeCodeTests(TestCase):
+    def test_picks_first_free_suffix_with_one_query(self):
+        created = [Product.objects.create(name="Plan Test", **PRODUCT) for _ in range(4)]
+        self.assertEqual([p.code for p in created], ["PLANTEST", "PLANTEST-1", "PLANTEST-2", "PLANTEST-3"])
+        Product.objects.create(code="plantestx", name="x", **PRODUCT)
+        created[2].delete()
+        with CaptureQueriesContext(connection) as ctx:
+            code = Product.generate_unique_code("Plan Test")
+        self.assertEqual(code, "PLANTEST-2")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn("LIKE", ctx.captured_queries[0]["sql"].upper())
+
+    def test_trims_base_to_fit_the_suffix(self):
+        base = "A" * 40
+        codes = [Product.objects.create(name=base, **PRODUCT).code for _ in range(3)]
+        self.assertEqual(codes, ["A" * 30, "A" * 28 + "-1", "A" * 28 + "-2"])
+
+    def test_exclude_pk_keeps_own_code(self):
+        product = Product.objects.create(name="Plan Propio", **PRODUCT)
+        self.assertEqual(Product.generate_unique_code("Plan Propio", exclude_pk=product.pk), product.code)
+
+    def test_concurrent_pick_retries_on_integrity_error(self):
+        Product.objects.create(code="PLANCARRERA", name="otro", **PRODUCT)
+        stale = iter(["PLANCARRERA"])
+        real = Product.generate_unique_code
+
+        def generate(base, *, exclude_pk=None):
+            # El primer candidato simula otra alta que eligió el mismo código.
+            return next(stale, None) or real(base, exclude_pk=exclude_pk)
+
+        with patch.object(Product, "generate_unique_code", side_effect=generate):
+            product = Product.objects.create(name="Plan Carrera", **PRODUCT)
+        self.assertEqual(product.code, "PLANCARRERA-1")
+
+
+class CreateUniqueTests(TestCase):
+    def test_quote_share_token_needs_no_existence_query(self):
+        share = QuoteShare(
+            phone="1", make="VW", model="Gol", version="1.6", year=2020, city="LP",
+            has_garage=True, is_zero_km=False, usage="privado", has_gnc=False,
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            share.save()
+        self.assertEqual(_selects(ctx), [])
+        self.assertEqual(len(share.token), 10)
+
+    def test_collision_is_retried_with_a_new_value(self):
+        Policy.objects.create(number="SC-1", claim_code="SC-TAKEN")
+        values = iter(["SC-TAKEN", "SC-FREE"])
+        policy = identifiers.create_unique(
+            lambda code: Policy.objects.create(number="SC-2", claim_code=code),
+            model=Policy,
+            field="claim_code",
+            generate=lambda: next(values),
+        )
+        self.assertEqual(policy.claim_code, "SC-FREE")
+
+    def test_other_integrity_errors_are_not_retried(self):
+        Policy.objects.create(number="SC-1")
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return f"SC-{len(calls)}X"
+
+        with self.assertRaises(IntegrityError):
+            identifiers.create_unique(
+                lambda code: Policy.objects.create(number="SC-1", claim_code=code),
+                model=Policy,
+                field="claim_code",
+                generate=generate,
+            )
+        self.assertEqual(len(calls), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        Policy.objects.create(number="SC-1", claim_code="SC-TAKEN")
+        with self.assertRaises(IntegrityError):
+            identifiers.create_unique(
+                lambda code: Policy.objects.create(number="SC-2", claim_code=code),
+                model=Policy,
+                field="claim_code",
+                generate=lambda: "SC-TAKEN",
+                attempts=3,
+            )
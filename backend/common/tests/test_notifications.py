@@ -0,0 +1,136 @@
+import io
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from common import notifications
+from common.models import NotificationOutbox
+from common.notifications import deliver_pending, enqueue_email, enqueue_whatsapp
+
+
+class _WhatsAppStub(BaseHTTPRequestHandler):
+    statuses = []
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.received.append(json.loads(self.rfile.read(length)))
+        code = self.statuses.pop(0) if self.statuses else 200
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    NOTIFICATIONS_MAX_ATTEMPTS=3,
+    NOTIFICATIONS_RETRY_BASE_SECONDS=30,
+)
+class NotificationOutboxTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), _WhatsAppStub)
+        cls.webhook = f"http://127.0.0.1:{cls.server.server_port}/send"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        mail.outbox.clear()
+        _WhatsAppStub.statuses = []
+        _WhatsAppStub.received = []
+
+    def test_emails_are_sent_in_batch_over_one_connection(self):
+        for i in range(3):
+            enqueue_email(f"user{i}@example.com", "Hola", f"Cuerpo {i}", kind="test")
+        self.assertEqual(len(mail.outbox), 0)
+        with patch.object(notifications, "get_connection", wraps=notifications.get_connection) as conn:
+            stats = deliver_pending()
+        self.assertEqual(conn.call_count, 1)
+        self.assertEqual(stats, {"sent": 3, "retried": 0, "dead": 0})
+        self.assertEqual([m.to for m in mail.outbox], [[f"user{i}@example.com"] for i in range(3)])
+        sent = NotificationOutbox.objects.filter(status=NotificationOutbox.STATUS_SENT)
+        self.assertEqual(sent.count(), 3)
+        self.assertFalse(sent.exclude(body="").exists())
+
+    def test_whatsapp_goes_through_webhook(self):
+        with override_settings(WHATSAPP_WEBHOOK_URL=self.webhook):
+            enqueue_whatsapp("+5492215550000", "Tu código", kind="test")
+            stats = deliver_pending()
+        self.assertEqual(stats["sent"], 1)
+        self.assertEqual(_WhatsAppStub.received, [{"to": "+5492215550000", "message": "Tu código"}])
+
+    def test_whatsapp_without_webhook_is_only_logged(self):
+        with override_settings(WHATSAPP_WEBHOOK_URL=""):
+            self.assertIsNone(enqueue_whatsapp("+5492215550000", "Tu código"))
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_transient_errors_are_retried_with_backoff_then_dead_lettered(self):
+        _WhatsAppStub.statuses = [503, 503, 503]
+        with override_settings(WHATSAPP_WEBHOOK_URL=self.webhook):
+            notification = enqueue_whatsapp("+5492215550000", "Tu código")
+            now = timezone.now()
+            self.assertEqual(deliver_pending(now=now)["retried"], 1)
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, NotificationOutbox.STATUS_PENDING)
+            self.assertEqual(notification.available_at, now + timedelta(seconds=30))
+            self.assertEqual(notification.last_error, "http 503")
+            # Todavía no vence el backoff: nada que entregar.
+            self.assertEqual(deliver_pending(now=now + timedelta(seconds=10)), {"sent": 0, "retried": 0, "dead": 0})
+            self.assertEqual(deliver_pending(now=now + timedelta(seconds=31))["retried"], 1)
+            self.assertEqual(deliver_pending(now=now + timedelta(seconds=200))["dead"], 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, NotificationOutbox.STATUS_DEAD)
+        self.assertEqual(notification.attempts, 3)
+        self.assertEqual(notification.body, "")
+
+    def test_client_errors_are_dead_lettered_immediately(self):
+        _WhatsAppStub.statuses = [400]
+        with override_settings(WHATSAPP_WEBHOOK_URL=self.webhook):
+            enqueue_whatsapp("+5492215550000", "Tu código")
+            self.assertEqual(deliver_pending()["dead"], 1)
+
+    def test_smtp_failure_is_retried(self):
+        enqueue_email("user@example.com", "Hola", "Cuerpo")
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("down")):
+            self.assertEqual(deliver_pending()["retried"], 1)
+        self.assertEqual(deliver_pending(now=timezone.now() + timedelta(minutes=5))["sent"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_notifications_are_not_sent(self):
+        enqueue_email("admin@example.com", "Código", "123456", ttl_seconds=60)
+        stats = deliver_pending(now=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(stats["dead"], 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_command_drains_outbox(self):
+        for i in range(5):
+            enqueue_email(f"user{i}@example.com", "Hola", "Cuerpo")
+        call_command("send_notifications", "--batch-size", "2", stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_admin_never_shows_pending_body(self):
+        admin = get_user_model().objects.create_superuser(dni="900", email="root@example.com", password="Admin123")
+        self.client.force_login(admin)
+        row = enqueue_email("user@example.com", "Restablecer", "https://app/reset/secreto-123")
+        page = self.client.get(reverse("admin:common_notificationoutbox_change", args=[row.pk]))
+        self.assertEqual(page.status_code, 200)
+        self.assertNotContains(page, "secreto-123")
+        self.assertContains(page, "oculto")
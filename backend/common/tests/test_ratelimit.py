@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from common import ratelimit
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ratelimit-tests"}}
+REDIS = {"default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": "redis://127.0.0.1:6379/1"}}
+
+# Inicio exacto de una ventana de 60s, para controlar el peso del bucket anterior.
+T0 = 6_000_000.0
+
+
+@override_settings(CACHES=LOCMEM)
+class SlidingWindowLocMemTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_allows_up_to_limit_then_blocks(self):
+        rules = [("login:a", 3, 60)]
+        results = [ratelimit.hit(rules, now=T0 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        rules = [("login:a", 4, 60)]
+        for i in range(4):
+            ratelimit.hit(rules, now=T0 + i)
+        # A mitad de la ventana siguiente el bucket anterior pesa 50%: 4 * 0.5 = 2.
+        allowed, _, usage = ratelimit.hit(rules, now=T0 + 90)
+        self.assertTrue(allowed)
+        self.assertAlmostEqual(usage[0], 3.0)
+        self.assertTrue(ratelimit.hit(rules, now=T0 + 90)[0])
+        self.assertFalse(ratelimit.hit(rules, now=T0 + 90)[0])
+
+    def test_all_rules_are_checked_together(self):
+        subject = ("otp:user", 2, 60)
+        ip = ("otp:ip", 3, 60)
+        self.assertTrue(ratelimit.hit([subject, ip], now=T0)[0])
+        self.assertTrue(ratelimit.hit([subject, ip], now=T0)[0])
+        # El sujeto ya agotó su cupo aunque la IP todavía tenga lugar.
+        self.assertFalse(ratelimit.hit([subject, ip], now=T0)[0])
+        # Otro usuario desde la misma IP: ahora la que corta es la regla de IP.
+        other = ("otp:other", 2, 60)
+        self.assertFalse(ratelimit.hit([other, ip], now=T0)[0])
+
+    def test_rejected_hits_are_not_counted_when_requested(self):
+        rules = [("api:a", 2, 60)]
+        for _ in range(2):
+            ratelimit.hit(rules, count_rejected=False, now=T0)
+        for _ in range(5):
+            self.assertFalse(ratelimit.hit(rules, count_rejected=False, now=T0)[0])
+        # Sólo los 2 aceptados pesan en la ventana siguiente (50% de 2 = 1).
+        self.assertTrue(ratelimit.hit(rules, count_rejected=False, now=T0 + 90)[0])
+
+    def test_retry_after_points_to_when_capacity_returns(self):
+        rules = [("login:a", 2, 60)]
+        ratelimit.hit(rules, now=T0)
+        ratelimit.hit(rules, now=T0)
+        allowed, retry_after, _ = ratelimit.hit(rules, count_rejected=False, now=T0 + 30)
+        self.assertFalse(allowed)
+        # En la próxima ventana (t=60) el bucket anterior vale 2 y tiene que bajar a 1: t=90.
+        self.assertAlmostEqual(retry_after, 60.0)
+        self.assertFalse(ratelimit.hit(rules, count_rejected=False, now=T0 + 89)[0])
+        self.assertTrue(ratelimit.hit(rules, count_rejected=False, now=T0 + 90)[0])
+
+    def test_reset_clears_counters(self):
+        rules = [("login:a", 1, 60)]
+        ratelimit.hit(rules, now=T0)
+        self.assertFalse(ratelimit.hit(rules, now=T0)[0])
+        ratelimit.reset("login:a", 60, now=T0)
+        self.assertTrue(ratelimit.hit(rules, now=T0)[0])
+
+
+@override_settings(CACHES=REDIS)
+class SlidingWindowRedisTests(SimpleTestCase):
+    def setUp(self):
+        ratelimit._script = None
+        self.addCleanup(setattr, ratelimit, "_script", None)
+
+    def test_rules_are_evaluated_in_a_single_script_call(self):
+        script = MagicMock(return_value=[1, 0, 4, 2, 0])
+        client = MagicMock()
+        client.register_script.return_value = script
+        with patch("django_redis.get_redis_connection", return_value=client):
+            allowed, retry_after, usage = ratelimit.hit([("a", 10, 60), ("b", 5, 60)], now=T0 + 30)
+            ratelimit.hit([("a", 10, 60)], now=T0 + 30)
+
+        self.assertTrue(allowed)
+        self.assertEqual(retry_after, 0.0)
+        self.assertEqual(usage, [3.0, 3.0])
+        client.register_script.assert_called_once_with(ratelimit._LUA_SLIDING_WINDOW)
+        self.assertEqual(script.call_count, 2)
+        kwargs = script.call_args_list[0].kwargs
+        self.assertEqual(len(kwargs["keys"]), 4)
+        self.assertTrue(kwargs["keys"][0].endswith("rl:a:100000"))
+        self.assertTrue(kwargs["keys"][1].endswith("rl:a:99999"))
+        self.assertEqual(kwargs["args"][1:], [1, 1, 10, 60, 5, 60])
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+
+from common import throttling
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "throttling-tests"}}
+T0 = 6_000_000.0
+
+
+class _View:
+    throttle_scope = "bench"
+
+
+class _UnscopedView:
+    pass
+
+
+class _Scoped(throttling.ScopedRateThrottle):
+    THROTTLE_RATES = {"bench": "3/min"}
+
+
+@override_settings(CACHES=LOCMEM)
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = [T0]
+        timer = patch.object(SimpleRateThrottle, "timer", lambda _self: self.clock[0])
+        timer.start()
+        self.addCleanup(timer.stop)
+        self.factory = APIRequestFactory()
+
+    def _request(self, ip="203.0.113.7"):
+        return Request(self.factory.get("/x/", REMOTE_ADDR=ip))
+
+    def _allow(self, view=None, ip="203.0.113.7"):
+        throttle = _Scoped()
+        return throttle.allow_request(self._request(ip), view or _View()), throttle
+
+    def test_scope_rate_is_enforced_per_client(self):
+        results = [self._allow()[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertTrue(self._allow(ip="198.51.100.1")[0])
+
+    def test_rejected_requests_do_not_extend_the_block(self):
+        for _ in range(3):
+            self._allow()
+        for _ in range(50):
+            allowed, throttle = self._allow()
+        self.assertFalse(allowed)
+        wait = throttle.wait()
+        self.assertGreater(wait, 0)
+        self.clock[0] += wait
+        self.assertTrue(self._allow()[0])
+
+    def test_views_without_scope_are_not_throttled(self):
+        for _ in range(10):
+            self.assertTrue(self._allow(view=_UnscopedView())[0])
+
+    def test_memory_per_key_is_constant(self):
+        for i in range(3):
+            self.clock[0] = T0 + i
+            self._allow()
+        # Sólo contadores, nunca el historial de timestamps.
+        self.assertEqual(cache.get("rl:throttle_bench_203.0.113.7:100000"), 3)
+        self.assertIsNone(cache.get("throttle_bench_203.0.113.7"))
@@ -0,0 +1,68 @@
+"""
+Throttles de DRF sobre `common.ratelimit` (ventana deslizante con dos contadores).
+
+Los de DRF guardan la lista completa de timestamps por clave y la reescriben en cada
+request aceptado: con rates altos o mucho tráfico de bots eso es O(rate) de memoria y
+de bytes por request. Estos mantienen las mismas claves, scopes y rates
+(`DEFAULT_THROTTLE_RATES`) pero con O(1) por clave y un único round trip al cache.
+"""
+
+from rest_framework import throttling
+
+from . import ratelimit
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Reemplaza el historial de SimpleRateThrottle. Los requests rechazados no consumen
+    cupo, igual que en DRF.
+    """
+
+    _wait = None
+
+    def _allow_sliding(self, request, view, cost=1):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, retry_after, _ = ratelimit.hit(
+            [(self.key, self.num_requests, self.duration)],
+            cost=cost,
+            count_rejected=False,
+            now=self.timer(),
+        )
+        self._wait = None if allowed else retry_after
+        return allowed
+
+    def allow_request(self, request, view):
+        return self._allow_sliding(request, view)
+
+    def wait(self):
+        return self._wait
+
+
+class AnonRateThrottle(SlidingWindowThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowThrottleMixin, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(SlidingWindowThrottleMixin, throttling.ScopedRateThrottle):
+    """
+    Si la vista define `get_throttle_cost(request)`, cada request consume ese cupo del
+    scope (p. ej. un batch cuenta por ítem); los throttles anon/user siguen contando 1.
+    """
+
+    def allow_request(self, request, view):
+        # Igual que DRF: el scope sale de la vista y sin scope no se limita.
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        get_cost = getattr(view, "get_throttle_cost", None)
+        cost = max(1, int(get_cost(request))) if get_cost else 1
+        return self._allow_sliding(request, view, cost=cost)
@@ -1,20 +1,31 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .async_views import async_read_view
 from .views import ContactInfoView, AppSettingsView, AnnouncementViewSet
 
 # Router con trailing slash para ser compatible con /announcements/
 router = DefaultRouter()
 router.register(r"announcements", AnnouncementViewSet, basename="announcements")
 
+contact_info_view = async_read_view(async_views.contact_info, ContactInfoView.as_view(), hybrid=True)
+announcements_list_view = async_read_view(
+    async_views.announcements_list,
+    AnnouncementViewSet.as_view({"get": "list", "post": "create"}),
+    hybrid=True,
+)
+
 urlpatterns = [
-    path("contact-info/", ContactInfoView.as_view(), name="contact-info"),
-    path("contact-info", ContactInfoView.as_view(), name="contact-info-no-slash"),  # alias for trailing slash compatibility
+    path("contact-info/", contact_info_view, name="contact-info"),
+    path("contact-info", contact_info_view, name="contact-info-no-slash"),  # alias for trailing slash compatibility
     path("admin/settings", AppSettingsView.as_view(), name="app-settings"),
     path(
         "admin/settings/",
         AppSettingsView.as_view(),
         name="app-settings-trailing-slash",
     ),  # alias for trailing slash compatibility
+    # Misma ruta que el router; va primero para servir el GET público por el camino async.
+    path("announcements/", announcements_list_view, name="announcements-list"),
 ]
 
 urlpatterns += router.urls
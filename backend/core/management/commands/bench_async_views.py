@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory
+
+from common import async_views as common_async
+from common.async_views import async_read_view
+from common.views import AnnouncementViewSet, ContactInfoView
+from products.async_views import home_products_list
+from products.views import HomeProductsListView
+from quotes.async_views import quote_share_detail
+from quotes.views import QuoteShareDetailView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara latencia y throughput de los GET públicos servidos por la vista DRF "
+        "(sync_to_async, como corre bajo ASGI) contra la variante async."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests por endpoint y variante.")
+        parser.add_argument("--concurrency", type=int, default=20, help="Requests concurrentes.")
+        parser.add_argument("--token", default="", help="Token de QuoteShare para medir /api/quotes/share/<token>.")
+
+    def handle(self, *args, **options):
+        total = max(1, options["requests"])
+        concurrency = max(1, options["concurrency"])
+        if concurrency > total:
+            raise CommandError("--concurrency no puede superar a --requests.")
+
+        endpoints = [
+            ("/api/products/home", home_products_list, HomeProductsListView.as_view(), False, {}),
+            (
+                "/api/common/announcements/",
+                common_async.announcements_list,
+                AnnouncementViewSet.as_view({"get": "list"}),
+                True,
+                {},
+            ),
+            ("/api/common/contact-info", common_async.contact_info, ContactInfoView.as_view(), True, {}),
+        ]
+        if options["token"]:
+            token = options["token"]
+            endpoints.append(
+                (
+                    f"/api/quotes/share/{token}",
+                    quote_share_detail,
+                    QuoteShareDetailView.as_view(),
+                    False,
+                    {"token": token},
+                )
+            )
+
+        self.stdout.write(f"{total} requests por variante, concurrencia {concurrency}")
+        for path, async_get, sync_view, hybrid, kwargs in endpoints:
+            variants = (
+                ("sync", sync_to_async(sync_view)),
+                ("async", async_read_view(async_get, sync_view, hybrid=hybrid, enabled=True)),
+            )
+            self.stdout.write(path)
+            for label, view in variants:
+                elapsed, statuses = asyncio.run(self._run(view, path, kwargs, total, concurrency))
+                rps = total / elapsed if elapsed else 0
+                per_request_ms = elapsed / total * 1000
+                self.stdout.write(
+                    f"  {label:<6} {per_request_ms:8.3f} ms/request  {rps:9.1f} req/s  status: {statuses}"
+                )
+
+    async def _run(self, view, path, kwargs, total, concurrency):
+        factory = AsyncRequestFactory()
+        host = next((h for h in settings.ALLOWED_HOSTS if h and h[0] not in ".*"), "localhost")
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = {}
+
+        async def one(index):
+            # Una IP distinta por request para no chocar con el throttle anónimo.
+            request = factory.get(path)
+            request.META["HTTP_HOST"] = host
+            request.META["REMOTE_ADDR"] = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+            async with semaphore:
+                response = await view(request, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, statuses
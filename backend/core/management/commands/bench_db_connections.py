@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de conexión por request simulando el ciclo request_started/"
+        "request_finished con y sin conexiones persistentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests simulados por modo.")
+        parser.add_argument("--conn-max-age", type=int, default=60, help="CONN_MAX_AGE para el modo persistente.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        total = max(1, options["requests"])
+        connection = connections[alias]
+        original_max_age = connection.settings_dict.get("CONN_MAX_AGE", 0)
+
+        results = {}
+        try:
+            for label, max_age in (("per-request", 0), ("persistent", options["conn_max_age"])):
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                results[label] = self._run(connection, total)
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = original_max_age
+
+        self.stdout.write(f"DB: {connection.vendor} ({alias}), {total} requests por modo")
+        for label, (elapsed, connects) in results.items():
+            per_request_ms = elapsed / total * 1000
+            self.stdout.write(
+                f"  {label:<12} {per_request_ms:8.3f} ms/request  conexiones abiertas: {connects}"
+            )
+        base = results["per-request"][0]
+        persistent = results["persistent"][0]
+        overhead_ms = (base - persistent) / total * 1000
+        self.stdout.write(self.style.SUCCESS(f"Overhead de conexión por request: {overhead_ms:.3f} ms"))
+
+    def _run(self, connection, total):
+        connects = 0
+        start = time.perf_counter()
+        for _ in range(total):
+            request_started.send(sender=self.__class__)
+            if connection.connection is None:
+                connects += 1
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+        return time.perf_counter() - start, connects
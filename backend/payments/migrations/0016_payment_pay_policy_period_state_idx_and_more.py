@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0015_remove_payment_installment_requires_policy'),
+        ('policies', '0010_policyinstallment_pol_inst_policy_period_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['policy', 'period', 'state', 'mp_payment_id'], name='pay_policy_period_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['policy', 'method', 'auth_code'], name='receipt_policy_method_idx'),
+        ),
+    ]
@@ -109,7 +109,14 @@ class Payment(models.Model):
     class Meta:
         # The equality between policy and installment.policy can only be guaranteed
         # at the application layer via Payment.clean.
-        pass
+        # `installment` ya tiene índice único por ser OneToOne.
+        indexes = [
+            # manual_payment: pago manual aprobado del período.
+            models.Index(
+                fields=["policy", "period", "state", "mp_payment_id"],
+                name="pay_policy_period_state_idx",
+            ),
+        ]
 
 
 
@@ -143,6 +150,10 @@ class Receipt(models.Model):
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            # Webhook de MP (idempotencia por auth_code) y reintentos de pago manual.
+            models.Index(fields=["policy", "method", "auth_code"], name="receipt_policy_method_idx"),
+        ]
         verbose_name = "Recibo"
         verbose_name_plural = "Recibos"
 
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class PoliciesConfig(AppConfig):
+    name = "policies"
+    verbose_name = "Pólizas"
+
+    def ready(self):
+        from . import signals  # noqa: F401 - índice de patentes
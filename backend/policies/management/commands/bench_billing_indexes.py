@@ -0,0 +1,152 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from payments.models import Payment, Receipt
+from policies.models import Policy, PolicyInstallment
+
+INSTALLMENTS_PER_POLICY = 12
+BATCH_SIZE = 5000
+BENCH_INDEXES = (
+    "pol_inst_policy_period_idx",
+    "pol_inst_policy_status_idx",
+    "pol_inst_unpaid_window_idx",
+    "pay_policy_period_state_idx",
+    "receipt_policy_method_idx",
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara las consultas calientes de cobranza con y sin los índices compuestos. "
+        "Genera datos sintéticos dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--installments", type=int, default=1_000_000, help="Cuotas sintéticas a generar.")
+        parser.add_argument("--queries", type=int, default=200, help="Consultas por caso y variante.")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        total_policies = max(1, options["installments"] // INSTALLMENTS_PER_POLICY)
+        queries = max(1, options["queries"])
+        results = {}
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                policy_ids = self._populate(total_policies, rng)
+                self.stdout.write(
+                    f"{connection.vendor}: {total_policies * INSTALLMENTS_PER_POLICY} cuotas, "
+                    f"{total_policies} pólizas generadas en {time.perf_counter() - start:.1f}s"
+                )
+                sample = [rng.choice(policy_ids) for _ in range(queries)]
+                self._analyze()
+                results["con índices"] = self._measure(sample)
+                with connection.cursor() as cursor:
+                    for name in BENCH_INDEXES:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                self._analyze()
+                results["sin índices"] = self._measure(sample)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        for case in results["con índices"]:
+            with_idx = results["con índices"][case]
+            without_idx = results["sin índices"][case]
+            speedup = without_idx / with_idx if with_idx else 0
+            self.stdout.write(
+                f"  {case:<28} con índices {with_idx:8.3f} ms  sin índices {without_idx:8.3f} ms  x{speedup:.1f}"
+            )
+
+    def _populate(self, total_policies, rng):
+        today = date.today()
+        first = today - timedelta(days=30 * INSTALLMENTS_PER_POLICY // 2)
+        self.period = f"{first.year}{first.month:02d}"
+        policies = Policy.objects.bulk_create(
+            [
+                Policy(number=f"BENCH-IDX-{i}", premium=Decimal("1000.00"), start_date=first)
+                for i in range(total_policies)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        installments = []
+        payments = []
+        receipts = []
+        for policy in policies:
+            for seq in range(1, INSTALLMENTS_PER_POLICY + 1):
+                period_start = first + timedelta(days=30 * (seq - 1))
+                window_end = period_start + timedelta(days=5)
+                if window_end < today:
+                    status = PolicyInstallment.Status.PAID if rng.random() < 0.9 else PolicyInstallment.Status.EXPIRED
+                else:
+                    status = PolicyInstallment.Status.PENDING
+                installments.append(
+                    PolicyInstallment(
+                        policy=policy,
+                        sequence=seq,
+                        period_start_date=period_start,
+                        period_end_date=period_start + timedelta(days=29),
+                        payment_window_start=period_start,
+                        payment_window_end=window_end,
+                        due_date_display=window_end - timedelta(days=2),
+                        due_date_real=window_end,
+                        amount=Decimal("1000.00"),
+                        status=status,
+                    )
+                )
+            payments.append(
+                Payment(policy=policy, period=self.period, amount=Decimal("1000.00"), state="APR", mp_payment_id="manual")
+            )
+            receipts.append(Receipt(policy=policy, method="mercadopago", auth_code=str(policy.id)))
+            if len(installments) >= BATCH_SIZE:
+                PolicyInstallment.objects.bulk_create(installments, batch_size=BATCH_SIZE)
+                installments = []
+        PolicyInstallment.objects.bulk_create(installments, batch_size=BATCH_SIZE)
+        # bulk_create evita Payment.save(): sin cuota asociada no hay nada que sincronizar.
+        Payment.objects.bulk_create(payments, batch_size=BATCH_SIZE)
+        Receipt.objects.bulk_create(receipts, batch_size=BATCH_SIZE)
+        return [policy.id for policy in policies]
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _measure(self, sample):
+        today = date.today()
+        unpaid = [PolicyInstallment.Status.PENDING, PolicyInstallment.Status.NEAR_DUE]
+        cases = {
+            "cuota del ciclo vigente": lambda pid: PolicyInstallment.objects.filter(
+                policy_id=pid, period_start_date=today
+            ).order_by("sequence").first(),
+            "primera cuota impaga": lambda pid: PolicyInstallment.objects.filter(
+                policy_id=pid, status__in=unpaid
+            ).order_by("sequence").first(),
+            "vencidas por ventana": lambda pid: PolicyInstallment.objects.filter(
+                status=PolicyInstallment.Status.EXPIRED,
+                # El corte varía por consulta para no medir siempre el mismo rango.
+                payment_window_end__range=(today - timedelta(days=pid % 90 + 7), today - timedelta(days=pid % 90)),
+            ).count(),
+            "pago manual del período": lambda pid: Payment.objects.filter(
+                policy_id=pid, period=self.period, state="APR", mp_payment_id="manual"
+            ).order_by("-id").first(),
+            "recibo del webhook": lambda pid: Receipt.objects.filter(
+                policy_id=pid, method="mercadopago", auth_code=str(pid)
+            ).exists(),
+        }
+        timings = {}
+        for label, run in cases.items():
+            start = time.perf_counter()
+            for pid in sample:
+                run(pid)
+            timings[label] = (time.perf_counter() - start) / len(sample) * 1000
+        return timings
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policies', '0009_policy_vehicle_fk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='policyinstallment',
+            index=models.Index(fields=['policy', 'period_start_date'], name='pol_inst_policy_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policyinstallment',
+            index=models.Index(fields=['policy', 'status', 'sequence'], name='pol_inst_policy_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policyinstallment',
+            index=models.Index(condition=models.Q(('status', 'paid'), _negated=True), fields=['status', 'payment_window_end', 'payment_window_start'], name='pol_inst_unpaid_window_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Replace, Upper
+
+
+def _normalized(expression):
+    return Upper(Replace(Replace(expression, Value(" "), Value("")), Value("-"), Value("")))
+
+
+def backfill_plate_key(apps, schema_editor):
+    Policy = apps.get_model("policies", "Policy")
+    PolicyVehicle = apps.get_model("policies", "PolicyVehicle")
+    Vehicle = apps.get_model("vehicles", "Vehicle")
+    vehicle_plate = Vehicle.objects.filter(pk=OuterRef("vehicle_id")).values("license_plate")[:1]
+    legacy_plate = PolicyVehicle.objects.filter(policy_id=OuterRef("pk")).values("plate")[:1]
+    Policy.objects.update(
+        plate_key=Coalesce(
+            _normalized(Subquery(vehicle_plate)),
+            _normalized(Subquery(legacy_plate)),
+            Value(""),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("policies", "0010_policyinstallment_pol_inst_policy_period_idx_and_more"),
+        ("vehicles", "0004_alter_vehicle_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="policy",
+            name="plate_key",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_plate_key, migrations.RunPython.noop),
+    ]
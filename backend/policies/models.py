@@ -1,11 +1,19 @@
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from accounts.models import User
 from products.models import Product
 from django.utils import timezone
 
+from common import identifiers
+from common.models import MaintainedFieldsMixin
 
-class Policy(models.Model):
+
+def generate_claim_code(length=8):
+    # ~41 bits: se inserta directo y la constraint unique resuelve las colisiones.
+    return "SC-" + identifiers.random_token(length, identifiers.CODE_ALPHABET)
+
+
+class Policy(MaintainedFieldsMixin, models.Model):
     STATUS = [
         ("active", "Activa"),
         ("no_coverage", "Sin cobertura"),
@@ -45,6 +53,9 @@ class Policy(models.Model):
         on_delete=models.PROTECT,
         related_name="policies",
     )
+    # Patente normalizada de vehicle (o de la legacy) para la búsqueda; policies/plate_index.py.
+    plate_key = models.CharField(max_length=10, blank=True, default="", db_index=True, editable=False)
+    maintained_fields = ("plate_key",)
 
     class Meta:
         ordering = ["-created_at"]
@@ -59,6 +70,11 @@ class Policy(models.Model):
     def is_active(self):
         return self.status == "active"
 
+    def save(self, *args, **kwargs):
+        # Product.policy_count se ajusta en post_save (products/signals.py): mismo commit.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def clean(self):
         super().clean()
         if self.vehicle_id and self.user_id:
@@ -125,6 +141,18 @@ class PolicyInstallment(models.Model):
     class Meta:
         ordering = ["policy_id", "sequence"]
         unique_together = ["policy", "sequence"]
+        indexes = [
+            # mark_installment_paid_from_payment: cuota del ciclo vigente.
+            models.Index(fields=["policy", "period_start_date"], name="pol_inst_policy_period_idx"),
+            # Primera cuota pendiente/vencida de la póliza (ordenada por sequence).
+            models.Index(fields=["policy", "status", "sequence"], name="pol_inst_policy_status_idx"),
+            # Barridos de cuotas impagas por ventana de pago; las pagadas (la mayoría) no entran.
+            models.Index(
+                fields=["status", "payment_window_end", "payment_window_start"],
+                name="pol_inst_unpaid_window_idx",
+                condition=~models.Q(status="paid"),
+            ),
+        ]
         verbose_name = "Cuota de póliza"
         verbose_name_plural = "Cuotas de póliza"
 
@@ -0,0 +1,73 @@
+"""
+Búsqueda de pólizas por patente.
+
+Las patentes viven en dos tablas: `Vehicle.license_plate` (póliza.vehicle) y
+`PolicyVehicle.plate` (datos legacy, texto libre). `Policy.plate_key` guarda la patente
+de la póliza normalizada (sin espacios ni guiones, en mayúsculas; manda `vehicle` y si
+no hay, la legacy) con su propio índice, así una búsqueda exacta o por prefijo es un
+solo SELECT sobre `policies_policy` sin joins contra las dos tablas de vehículos.
+
+`refresh()` recalcula la columna en SQL; lo llaman las señales de policies/signals.py
+cuando cambia el vehículo de la póliza o la patente de alguno de los dos modelos.
+`QuerySet.update()` sobre patentes no dispara señales: después de algo así correr
+`refresh(Policy.objects.all())`.
+"""
+
+import re
+
+from django.db.models import Case, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Replace, Upper
+
+MIN_PREFIX_LENGTH = 3
+MAX_RESULTS = 20
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+
+
+def normalize(value):
+    """'ab 123-cd' -> 'AB123CD'. Misma regla que `_normalized()` en SQL."""
+    return _SEPARATORS.sub("", value or "").upper()
+
+
+def _normalized(expression):
+    stripped = Replace(Replace(expression, Value(" "), Value("")), Value("-"), Value(""))
+    return Upper(stripped)
+
+
+def key_expression():
+    """Expresión de `plate_key` para un UPDATE sobre Policy."""
+    from vehicles.models import Vehicle
+
+    from .models import PolicyVehicle
+
+    vehicle_plate = Vehicle.objects.filter(pk=OuterRef("vehicle_id")).values("license_plate")[:1]
+    legacy_plate = PolicyVehicle.objects.filter(policy_id=OuterRef("pk")).values("plate")[:1]
+    return Coalesce(
+        _normalized(Subquery(vehicle_plate)),
+        _normalized(Subquery(legacy_plate)),
+        Value(""),
+    )
+
+
+def refresh(queryset):
+    """Recalcula `plate_key` de las pólizas de `queryset`. Devuelve cuántas tocó."""
+    return queryset.order_by().update(plate_key=key_expression())
+
+
+def search(raw, *, prefix=True, limit=MAX_RESULTS):
+    """
+    Pólizas cuya patente coincide con `raw` (se normaliza), con titular, producto y
+    vehículo (el actual o el legacy) en el mismo SELECT. Con `prefix` también trae las
+    que empiezan así (patente leída a medias); las coincidencias exactas van primero.
+    Sin patente, o con un prefijo de menos de MIN_PREFIX_LENGTH caracteres, no trae nada.
+    """
+    from .models import Policy
+
+    key = normalize(raw)
+    qs = Policy.objects.select_related("user", "product", "vehicle__owner", "legacy_vehicle")
+    if not key or (prefix and len(key) < MIN_PREFIX_LENGTH):
+        return qs.none()
+    if not prefix:
+        return qs.filter(plate_key=key).order_by("-id")[:limit]
+    exact_first = Case(When(plate_key=key, then=Value(0)), default=Value(1), output_field=IntegerField())
+    return qs.filter(plate_key__startswith=key).order_by(exact_first, "plate_key", "-id")[:limit]
@@ -1,5 +1,4 @@
 # backend/policies/serializers.py
-import secrets
 from datetime import date
 from django.utils import timezone
 
@@ -7,10 +6,11 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from accounts.models import User
+from common import identifiers
 from payments.models import Payment
 from products.models import Product
 from vehicles.models import Vehicle
-from .models import Policy, PolicyVehicle, PolicyInstallment
+from .models import Policy, PolicyVehicle, PolicyInstallment, generate_claim_code
 from .billing import (
     compute_installment_status,
     derive_policy_billing_status,
@@ -58,6 +58,41 @@ class UserMinimalSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "first_name", "last_name"]
 
 
+class PolicyPlateMatchSerializer(serializers.ModelSerializer):
+    """Resultado de la búsqueda por patente (admin): póliza, titular y vehículo."""
+
+    plate = serializers.CharField(source="plate_key", read_only=True)
+    product = serializers.CharField(source="product.name", default=None, read_only=True)
+    owner = serializers.SerializerMethodField()
+    vehicle = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Policy
+        fields = ["id", "number", "status", "plate", "product", "start_date", "end_date", "owner", "vehicle"]
+
+    def get_owner(self, obj):
+        owner = obj.user or getattr(obj.vehicle, "owner", None)
+        if owner is None:
+            return None
+        return {
+            "id": owner.id,
+            "dni": owner.dni,
+            "first_name": owner.first_name,
+            "last_name": owner.last_name,
+            "email": owner.email,
+            "phone": owner.phone,
+        }
+
+    def get_vehicle(self, obj):
+        if obj.vehicle:
+            return {"make": obj.vehicle.brand, "model": obj.vehicle.model, "year": obj.vehicle.year}
+        try:
+            legacy = obj.legacy_vehicle
+        except PolicyVehicle.DoesNotExist:
+            return None
+        return {"make": legacy.make, "model": legacy.model, "year": legacy.year}
+
+
 class PolicyInstallmentSerializer(serializers.ModelSerializer):
     effective_status = serializers.SerializerMethodField()
     payment = serializers.SerializerMethodField()
@@ -266,11 +301,10 @@ class PolicySerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data = self._ensure_number(validated_data)
-        validated_data = self._ensure_claim_code(validated_data)
         vehicle_payload = validated_data.pop("vehicle", None)
         vehicle_ref = validated_data.pop("vehicle_id", None)
         vehicle_data = self._clean_vehicle_data(vehicle_payload)
-        policy = super().create(validated_data)
+        policy = self._save_with_claim_code(super().create, validated_data)
         self._assign_vehicle(policy, vehicle_ref, vehicle_data)
         ensure_policy_end_date(policy)
         regenerate_installments(policy)
@@ -278,11 +312,12 @@ class PolicySerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data = self._ensure_number(validated_data, allow_keep=True, instance=instance)
-        validated_data = self._ensure_claim_code(validated_data, instance=instance)
         vehicle_payload = validated_data.pop("vehicle", None)
         vehicle_ref = validated_data.pop("vehicle_id", None)
         vehicle_data = self._clean_vehicle_data(vehicle_payload)
-        policy = super().update(instance, validated_data)
+        policy = self._save_with_claim_code(
+            lambda data: super(PolicySerializer, self).update(instance, data), validated_data, instance=instance
+        )
         # Si cambia vigencia o precio mensual regeneramos cuotas
         ensure_policy_end_date(policy)
         regenerate_installments(policy)
@@ -382,26 +417,23 @@ class PolicySerializer(serializers.ModelSerializer):
             return validated_data
         raise ValidationError({"number": "Indicá el número de póliza (ej: SC-1234)."})
 
-    def _ensure_claim_code(self, validated_data, instance=None):
+    def _save_with_claim_code(self, save, validated_data, instance=None):
         """
         Genera claim_code si no existe para evitar pólizas sin código de asociación.
+        El código generado se guarda directo; si choca con otro se reintenta el save.
         """
-        code = validated_data.get("claim_code", None)
-        if code:
-            return validated_data
-        current = getattr(instance, "claim_code", None)
-        if current:
+        if validated_data.get("claim_code"):
+            return save(validated_data)
+        if getattr(instance, "claim_code", None):
             validated_data.pop("claim_code", None)
-            return validated_data
-        validated_data["claim_code"] = self._generate_claim_code()
-        return validated_data
-
-    def _generate_claim_code(self):
-        for _ in range(5):
-            candidate = f"SC-{secrets.token_hex(3).upper()}"
-            if not Policy.objects.filter(claim_code__iexact=candidate).exists():
-                return candidate
-        return f"SC-{secrets.token_hex(4).upper()}"
+            return save(validated_data)
+        return identifiers.create_unique(
+            lambda code: save({**validated_data, "claim_code": code}),
+            model=Policy,
+            field="claim_code",
+            generate=generate_claim_code,
+            lookup="iexact",
+        )
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
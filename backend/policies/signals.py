@@ -0,0 +1,39 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from vehicles.models import Vehicle
+
+from . import plate_index
+from .models import Policy, PolicyVehicle
+
+
+@receiver(post_init, sender=Policy)
+def remember_policy_vehicle(sender, instance, **kwargs):
+    instance._indexed_vehicle_id = instance.__dict__.get("vehicle_id", DEFERRED)
+
+
+@receiver(post_save, sender=Policy)
+def index_policy_plate(sender, instance, created, raw, update_fields, **kwargs):
+    if raw or (update_fields is not None and "vehicle" not in update_fields):
+        return
+    previous = None if created else instance._indexed_vehicle_id
+    if previous is not DEFERRED and previous != instance.vehicle_id:
+        plate_index.refresh(Policy.objects.filter(pk=instance.pk))
+    instance._indexed_vehicle_id = instance.vehicle_id
+
+
+@receiver(post_save, sender=Vehicle)
+def index_vehicle_plate(sender, instance, created, raw, update_fields, **kwargs):
+    # Un vehículo recién creado todavía no tiene pólizas.
+    if raw or created or (update_fields is not None and "license_plate" not in update_fields):
+        return
+    plate_index.refresh(Policy.objects.filter(vehicle_id=instance.pk))
+
+
+@receiver(post_save, sender=PolicyVehicle)
+@receiver(post_delete, sender=PolicyVehicle)
+def index_legacy_plate(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "plate" not in update_fields):
+        return
+    plate_index.refresh(Policy.objects.filter(pk=instance.policy_id))
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from payments.models import Payment, Receipt
+from policies.billing import regenerate_installments
+from policies.models import Policy, PolicyInstallment
+from products.models import Product
+
+
+BILLING_INDEXES = {
+    PolicyInstallment: {
+        "pol_inst_policy_period_idx",
+        "pol_inst_policy_status_idx",
+        "pol_inst_unpaid_window_idx",
+    },
+    Payment: {"pay_policy_period_state_idx"},
+    Receipt: {"receipt_policy_method_idx"},
+}
+
+
+class BillingIndexesTests(TestCase):
+    def test_indexes_exist_in_database(self):
+        with connection.cursor() as cursor:
+            for model, names in BILLING_INDEXES.items():
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                self.assertTrue(names <= set(constraints), (model.__name__, names - set(constraints)))
+
+
+@skipUnless(connection.vendor == "postgresql", "Los planes de consulta sólo se verifican en PostgreSQL.")
+class BillingQueryPlanTests(TestCase):
+    """
+    Con pocas filas el planner prefiere seq scan; se deshabilita para verificar que
+    cada consulta caliente tiene un índice utilizable.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        product = Product.objects.create(
+            code="IDXPLAN",
+            name="Index Plan",
+            vehicle_type="AUTO",
+            plan_type="RC",
+            base_price=1000,
+            coverages="",
+        )
+        cls.policy = Policy.objects.create(
+            number="IDX-1",
+            product=product,
+            premium=1000,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=90),
+        )
+        regenerate_installments(cls.policy)
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_installment_of_current_cycle(self):
+        qs = self.policy.installments.filter(period_start_date=date.today()).order_by("sequence")
+        self.assertUsesIndex(qs, "pol_inst_policy_period_idx")
+
+    def test_first_unpaid_installment(self):
+        qs = self.policy.installments.filter(
+            status__in=[PolicyInstallment.Status.PENDING, PolicyInstallment.Status.NEAR_DUE]
+        ).order_by("sequence")
+        self.assertUsesIndex(qs, "pol_inst_policy_status_idx")
+
+    def test_unpaid_installments_by_window(self):
+        qs = PolicyInstallment.objects.filter(
+            status=PolicyInstallment.Status.PENDING,
+            payment_window_end__lt=date.today(),
+        )
+        self.assertUsesIndex(qs, "pol_inst_unpaid_window_idx")
+
+    def test_manual_payment_lookup(self):
+        qs = Payment.objects.filter(
+            policy=self.policy, period="202401", state="APR", mp_payment_id="manual"
+        ).order_by("-id")
+        self.assertUsesIndex(qs, "pay_policy_period_state_idx")
+
+    def test_webhook_receipt_lookup(self):
+        qs = Receipt.objects.filter(policy=self.policy, method="mercadopago", auth_code="123")
+        self.assertUsesIndex(qs, "receipt_policy_method_idx")
@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from policies import plate_index
+from policies.models import Policy, PolicyVehicle
+from vehicles.models import Vehicle
+
+URL = "/api/admin/policies/plates"
+
+
+class PlateSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(dni="900", email="admin@ex.com", password="Admin123")
+        self.owner = User.objects.create_user(
+            dni="30111222", email="titular@ex.com", password="Pass1234", first_name="Ana", phone="221555"
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.owner, license_plate="ab 123 cd", vtype="AUTO", brand="Fiat", model="Cronos", year=2022
+        )
+        self.policy = Policy.objects.create(number="SC-1", user=self.owner, vehicle=self.vehicle)
+        self.legacy = Policy.objects.create(number="SC-2")
+        PolicyVehicle.objects.create(policy=self.legacy, plate="ab-123-ce", make="VW", model="Gol", year=2015)
+        Policy.objects.create(number="SC-3")
+        self.client.force_authenticate(self.admin)
+
+    def _keys(self):
+        return dict(Policy.objects.values_list("number", "plate_key"))
+
+    def test_plate_key_follows_both_sources(self):
+        self.assertEqual(self._keys(), {"SC-1": "AB123CD", "SC-2": "AB123CE", "SC-3": ""})
+
+        self.vehicle.license_plate = "AA 000 BB"
+        self.vehicle.save()
+        legacy = self.legacy.legacy_vehicle
+        legacy.plate = "zz-999"
+        legacy.save()
+        self.assertEqual(self._keys(), {"SC-1": "AA000BB", "SC-2": "ZZ999", "SC-3": ""})
+
+        self.policy.vehicle = None
+        self.policy.save(update_fields=["vehicle"])
+        legacy.delete()
+        self.assertEqual(self._keys(), {"SC-1": "", "SC-2": "", "SC-3": ""})
+
+    def test_unrelated_saves_do_not_touch_the_index(self):
+        policy = Policy.objects.get(pk=self.policy.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            policy.premium = 10
+            policy.save()
+        self.assertFalse([q for q in ctx.captured_queries if "plate_key" in q["sql"]])
+
+    def test_deferred_policy_save_is_a_single_update(self):
+        policy = Policy.objects.only("id", "number").get(pk=self.policy.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            policy.number = "SC-1B"
+            policy.save()
+        statements = [q["sql"] for q in ctx.captured_queries if q["sql"].split()[0] not in ("SAVEPOINT", "RELEASE")]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith("UPDATE"))
+        self.assertNotIn("plate_key", statements[0])
+
+    def test_save_inserts_again_when_row_is_missing(self):
+        policy = Policy.objects.get(number="SC-3")
+        Policy.objects.filter(pk=policy.pk).delete()
+        policy.save()
+        self.assertTrue(Policy.objects.filter(pk=policy.pk).exists())
+
+    def test_refresh_recomputes_after_bulk_updates(self):
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(license_plate="XX-111")  # sin señales
+        self.assertEqual(plate_index.refresh(Policy.objects.all()), 3)
+        self.assertEqual(self._keys()["SC-1"], "XX111")
+
+    def test_prefix_search_normalizes_input_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(URL, {"q": "ab-12 3"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len([q for q in ctx.captured_queries if "policies_policy" in q["sql"]]), 1)
+        self.assertEqual(res.data["query"], "AB123")
+        self.assertEqual([r["number"] for r in res.data["results"]], ["SC-1", "SC-2"])
+        first = res.data["results"][0]
+        self.assertEqual((first["plate"], first["owner"]["dni"], first["owner"]["phone"]), ("AB123CD", "30111222", "221555"))
+        self.assertEqual(first["vehicle"], {"make": "Fiat", "model": "Cronos", "year": 2022})
+        self.assertIsNone(res.data["results"][1]["owner"])
+        self.assertEqual(res.data["results"][1]["vehicle"]["make"], "VW")
+
+    def test_exact_matches_come_first_and_exact_mode(self):
+        longer = Vehicle.objects.create(
+            owner=self.owner, license_plate="AB123CDE", vtype="AUTO", brand="Fiat", model="Uno", year=2010
+        )
+        Policy.objects.create(number="SC-4", user=self.owner, vehicle=longer)
+        res = self.client.get(URL, {"q": "ab123cd"})
+        self.assertEqual([r["number"] for r in res.data["results"]], ["SC-1", "SC-4"])
+        res = self.client.get(URL, {"q": "AB 123 CD", "exact": "1"})
+        self.assertEqual([r["number"] for r in res.data["results"]], ["SC-1"])
+
+    def test_short_or_empty_query_is_rejected(self):
+        self.assertEqual(self.client.get(URL, {"q": "a-b"}).status_code, 400)
+        self.assertEqual(self.client.get(URL).status_code, 400)
+
+    def test_admin_list_search_uses_plate_key(self):
+        res = self.client.get("/api/admin/policies", {"search": "123-ce"})
+        rows = res.data["results"] if isinstance(res.data, dict) else res.data
+        self.assertEqual([r["number"] for r in rows], ["SC-2"])
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get(URL, {"q": "AB123"}).status_code, 403)
@@ -3,13 +3,16 @@ from django.db.models import Prefetch, Q
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Policy, PolicyVehicle
+from . import plate_index
+from .models import Policy, PolicyVehicle, generate_claim_code
 from .serializers import (
     PolicySerializer,
     PolicyClientListSerializer,
     PolicyClientDetailSerializer,
+    PolicyPlateMatchSerializer,
     PolicyVehicleSerializer,
 )
+from common import identifiers
 from common.models import AppSettings
 from payments.serializers import ReceiptSerializer
 from payments.models import Receipt
@@ -21,17 +24,10 @@ from .billing import (
     update_policy_status_from_installments,
 )
 import os
-import secrets
-import string
 from datetime import date
 from calendar import monthrange
 
 
-def _gen_claim_code(length=8):
-    alphabet = string.ascii_uppercase + string.digits
-    return "SC-" + "".join(secrets.choice(alphabet) for _ in range(length))
-
-
 def _env_bool(val):
     return str(val).strip().lower() in ("1", "true", "t", "yes", "y", "on") if val is not None else False
 
@@ -137,11 +133,11 @@ class PolicyBaseViewSet(viewsets.ModelViewSet):
         # filtros admin: search por number o plate, solo sin usuario
         q = (request.query_params.get("search") or "").strip()
         if q:
-            qs = qs.filter(
-                Q(number__icontains=q)
-                | Q(vehicle__license_plate__icontains=q)
-                | Q(legacy_vehicle__plate__icontains=q)
-            )
+            plate = plate_index.normalize(q)
+            match = Q(number__icontains=q)
+            if plate:
+                match |= Q(plate_key__contains=plate)
+            qs = qs.filter(match)
         only_unassigned = (request.query_params.get("only_unassigned") or "").lower() in ("1", "true", "yes")
         if only_unassigned:
             qs = qs.filter(user__isnull=True)
@@ -315,8 +311,14 @@ class PolicyBaseViewSet(viewsets.ModelViewSet):
         self.check_object_permissions(request, policy)
         if not request.user.is_staff:
             return Response({"detail": "Solo admins."}, status=403)
-        policy.claim_code = _gen_claim_code()
-        policy.save(update_fields=["claim_code", "updated_at"])
+
+        def assign(code):
+            policy.claim_code = code
+            policy.save(update_fields=["claim_code", "updated_at"])
+
+        identifiers.create_unique(
+            assign, model=Policy, field="claim_code", generate=generate_claim_code, lookup="iexact"
+        )
         return Response({"claim_code": policy.claim_code})
 
     def perform_create(self, serializer):
@@ -360,3 +362,20 @@ class PolicyViewSet(PolicyBaseViewSet):
 class AdminPolicyViewSet(PolicyBaseViewSet):
     def get_permissions(self):
         return [permissions.IsAdminUser()]
+
+    @action(detail=False, methods=["get"], url_path="plates")
+    def plates(self, request):
+        """
+        Admin: búsqueda por patente para atención de siniestros.
+        ?q= se normaliza (sin espacios ni guiones, mayúsculas) y busca por prefijo;
+        ?exact=1 sólo trae coincidencias exactas.
+        """
+        exact = (request.query_params.get("exact") or "").lower() in ("1", "true", "yes")
+        key = plate_index.normalize(request.query_params.get("q"))
+        if not key or (not exact and len(key) < plate_index.MIN_PREFIX_LENGTH):
+            return Response(
+                {"detail": f"Ingresá al menos {plate_index.MIN_PREFIX_LENGTH} caracteres de la patente."},
+                status=400,
+            )
+        policies = plate_index.search(key, prefix=not exact)
+        return Response({"query": key, "results": PolicyPlateMatchSerializer(policies, many=True).data})
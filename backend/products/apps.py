@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ProductsConfig(AppConfig):
+    name = "products"
+    verbose_name = "Productos"
+
+    def ready(self):
+        from . import signals  # noqa: F401 - payload del Home y contador de pólizas
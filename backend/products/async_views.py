@@ -0,0 +1,19 @@
+from asgiref.sync import sync_to_async
+
+from common.async_views import check_throttles
+from . import home_payload
+
+render_home = sync_to_async(home_payload.render)
+
+
+async def home_products_list(request):
+    """
+    GET /api/products/home desde el payload precalculado (products/home_payload.py).
+    Las páginas inválidas las sigue resolviendo la vista DRF (404).
+    """
+    from .views import HomeProductsListView
+
+    throttled = await check_throttles(HomeProductsListView, request, (), {})
+    if throttled:
+        return throttled
+    return await render_home(request)
@@ -0,0 +1,218 @@
+"""
+Desasociación de pólizas de un producto en background.
+
+Desactivar o borrar un producto desde el admin sólo crea un ProductDetachJob (`start`);
+`manage.py detach_product_policies` lo procesa por rangos de id: cada lote es una
+transacción corta que pone `product=NULL` en hasta PRODUCT_DETACH_BATCH_SIZE pólizas,
+descuenta `Product.policy_count` y avanza `last_policy_id`. Así nunca se bloquean
+decenas de miles de filas en un solo UPDATE y el progreso (`detached`/`total`) se puede
+consultar desde el admin.
+
+Después de cada lote commiteado se emite `policies_detached` (product_id, policy_ids)
+para quien tenga que recalcular algo de esas pólizas (refacturación, avisos).
+
+El worker toma el trabajo con un lease (LEASE_SECONDS) que renueva en cada lote: si se
+cae, otro worker lo retoma desde `last_policy_id`.
+
+Reactivar el producto cancela el trabajo (`cancel`) salvo que sea un borrado; además
+cada lote vuelve a mirar, con las filas bloqueadas, que el trabajo siga activo y el
+producto siga desactivado antes de tocar pólizas.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import policy_counts
+from .models import Product, ProductDetachJob
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+
+# Hook: se envía con sender=ProductDetachJob, job, product_id y policy_ids.
+policies_detached = Signal()
+
+
+def start(product, *, delete_product=False):
+    """
+    Encola (o reutiliza, si ya hay uno activo) el trabajo que desasocia las pólizas de
+    `product`. Con `delete_product` el producto se borra al terminar.
+    """
+    with transaction.atomic():
+        job = (
+            ProductDetachJob.objects.select_for_update()
+            .filter(product_ref=product.pk, status__in=ProductDetachJob.ACTIVE_STATUSES)
+            .first()
+        )
+        if job is None:
+            job = ProductDetachJob.objects.create(
+                product=product,
+                product_ref=product.pk,
+                product_name=product.name,
+                delete_product=delete_product,
+                total=product.policy_count,
+            )
+        elif delete_product and not job.delete_product:
+            job.delete_product = True
+            job.save(update_fields=["delete_product"])
+    return job
+
+
+def cancel(product):
+    """Cancela la desasociación en curso de `product` (no los borrados). Devuelve cuántos."""
+    return ProductDetachJob.objects.filter(
+        product_ref=product.pk, status__in=ProductDetachJob.ACTIVE_STATUSES, delete_product=False
+    ).update(status=ProductDetachJob.STATUS_CANCELLED, finished_at=timezone.now(), lease_until=None)
+
+
+def latest_for(product):
+    return ProductDetachJob.objects.filter(product_ref=product.pk).order_by("-id").first()
+
+
+def claim_job(*, now=None):
+    """Toma un trabajo pendiente (o con el lease vencido) y lo marca en curso."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        job = (
+            ProductDetachJob.objects.select_for_update(skip_locked=True)
+            .filter(status__in=ProductDetachJob.ACTIVE_STATUSES)
+            .filter(Q(lease_until__isnull=True) | Q(lease_until__lte=now))
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ProductDetachJob.STATUS_RUNNING
+        job.lease_until = now + timedelta(seconds=LEASE_SECONDS)
+        job.started_at = job.started_at or now
+        job.save(update_fields=["status", "lease_until", "started_at"])
+    return job
+
+
+def _still_wanted(job):
+    """
+    Con el trabajo y el producto bloqueados: ¿sigue activo y corresponde desasociar?
+    Si no (cancelado o producto reactivado), lo marca cancelado. Va dentro de un atomic.
+    """
+    current = (
+        ProductDetachJob.objects.select_for_update()
+        .filter(pk=job.pk)
+        .values("status", "delete_product")
+        .first()
+    )
+    if current is None or current["status"] not in ProductDetachJob.ACTIVE_STATUSES:
+        job.status = ProductDetachJob.STATUS_CANCELLED
+        return False
+    job.delete_product = current["delete_product"]
+    if job.delete_product:
+        return True
+    reactivated = Product.objects.select_for_update().filter(pk=job.product_ref, is_active=True).exists()
+    if reactivated:
+        job.status = ProductDetachJob.STATUS_CANCELLED
+        job.finished_at = timezone.now()
+        job.lease_until = None
+        job.save(update_fields=["status", "finished_at", "lease_until"])
+        return False
+    return True
+
+
+def run_chunk(job, *, batch_size):
+    """
+    Desasocia el próximo rango de pólizas. Devuelve cuántas desasoció (0 = no quedan o
+    el trabajo se canceló: mirar `job.status`).
+    """
+    from policies.models import Policy
+
+    with transaction.atomic():
+        if not _still_wanted(job):
+            return 0
+        ids = list(
+            Policy.objects.filter(product_id=job.product_ref, id__gt=job.last_policy_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        detached = Policy.objects.filter(
+            product_id=job.product_ref, id__gt=job.last_policy_id, id__lte=ids[-1]
+        ).update(product=None)
+        policy_counts.adjust(job.product_ref, -detached)
+        ProductDetachJob.objects.filter(pk=job.pk).update(
+            detached=F("detached") + detached,
+            last_policy_id=ids[-1],
+            lease_until=timezone.now() + timedelta(seconds=LEASE_SECONDS),
+        )
+        transaction.on_commit(
+            lambda: policies_detached.send(
+                sender=ProductDetachJob, job=job, product_id=job.product_ref, policy_ids=ids
+            )
+        )
+    job.detached += detached
+    job.last_policy_id = ids[-1]
+    return detached
+
+
+def _finish(job):
+    from policies.models import Policy
+
+    with transaction.atomic():
+        if not _still_wanted(job):
+            return True
+        # Pólizas asociadas por detrás del cursor mientras corría: otra vuelta desde 0.
+        if Policy.objects.filter(product_id=job.product_ref).exists():
+            job.last_policy_id = 0
+            job.save(update_fields=["last_policy_id"])
+            return False
+        if job.delete_product:
+            Product.objects.filter(pk=job.product_ref).delete()
+        job.status = ProductDetachJob.STATUS_DONE
+        job.finished_at = timezone.now()
+        job.lease_until = None
+        job.save(update_fields=["status", "finished_at", "lease_until"])
+    return True
+
+
+def run(job, *, batch_size=None):
+    """Procesa `job` hasta terminarlo. Devuelve cuántas pólizas desasoció."""
+    batch_size = batch_size or settings.PRODUCT_DETACH_BATCH_SIZE
+    total = 0
+    try:
+        while True:
+            detached = run_chunk(job, batch_size=batch_size)
+            total += detached
+            if detached:
+                continue
+            if job.status == ProductDetachJob.STATUS_CANCELLED or _finish(job):
+                break
+    except Exception as exc:
+        logger.exception("product_detach_failed", extra={"job_id": job.pk, "product_id": job.product_ref})
+        ProductDetachJob.objects.filter(pk=job.pk).update(
+            status=ProductDetachJob.STATUS_FAILED,
+            last_error=str(exc)[:255],
+            finished_at=timezone.now(),
+            lease_until=None,
+        )
+        return total
+    if job.status == ProductDetachJob.STATUS_CANCELLED:
+        logger.info("product_detach_cancelled", extra={"job_id": job.pk, "product_id": job.product_ref})
+        return total
+    logger.info("product_detach_done", extra={"job_id": job.pk, "product_id": job.product_ref, "detached": total})
+    return total
+
+
+def process_pending(*, batch_size=None, max_jobs=0):
+    """Procesa trabajos hasta vaciar la cola. Devuelve `{"jobs": N, "policies": M}`."""
+    totals = {"jobs": 0, "policies": 0}
+    while not max_jobs or totals["jobs"] < max_jobs:
+        job = claim_job()
+        if job is None:
+            break
+        totals["policies"] += run(job, batch_size=batch_size)
+        totals["jobs"] += 1
+    return totals
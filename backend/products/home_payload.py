@@ -0,0 +1,106 @@
+"""
+Payload precalculado de `/api/products/home` (carrusel del Home).
+
+Los productos publicados se serializan una sola vez con HomeProductSerializer (parseo
+de coberturas y limpieza de bullets incluidos) y cada página de `results` queda en el
+cache como bytes JSON junto con el total y un ETag. Un GET sólo arma el sobre de
+paginación (`count`/`next`/`previous`) alrededor de esos bytes: cero consultas a la DB.
+
+Guardar o borrar un Product descarta la entrada y la reconstruye al commitear
+(products/signals.py). `QuerySet.update()`/`bulk_create` no disparan señales: llamar a
+`rebuild()`; igual la entrada vence cada HOME_PRODUCTS_CACHE_SECONDS.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Product
+from .serializers import HomeProductSerializer
+
+CACHE_KEY = "products_home_payload"
+
+
+def home_queryset():
+    # Filas completas: subtitle, bullets, coverages y code se usan al serializar.
+    return Product.objects.filter(is_active=True, published_home=True).order_by("name", "id")
+
+
+def _dumps(value):
+    # Mismo formato que el JSONRenderer de DRF.
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build():
+    items = [HomeProductSerializer(obj).data for obj in home_queryset()]
+    page_size = api_settings.PAGE_SIZE
+    pages = [_dumps(items[start:start + page_size]) for start in range(0, len(items), page_size)] or [b"[]"]
+    digest = hashlib.sha256(b"\n".join(pages)).hexdigest()[:20]
+    return {"count": len(items), "page_size": page_size, "pages": pages, "etag": digest}
+
+
+def get_payload():
+    payload = cache.get(CACHE_KEY)
+    if payload is None or payload["page_size"] != api_settings.PAGE_SIZE:
+        payload = build()
+        # add: si justo se reconstruyó tras un commit, no pisar esa versión con esta.
+        cache.add(CACHE_KEY, payload, timeout=settings.HOME_PRODUCTS_CACHE_SECONDS)
+    return payload
+
+
+def rebuild():
+    payload = build()
+    cache.set(CACHE_KEY, payload, timeout=settings.HOME_PRODUCTS_CACHE_SECONDS)
+    return payload
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def _page_links(request, page_number, num_pages):
+    next_link = previous_link = None
+    if num_pages > 1:
+        url = request.build_absolute_uri()
+        if page_number < num_pages:
+            next_link = replace_query_param(url, "page", page_number + 1)
+        if page_number > 1:
+            if page_number - 1 == 1:
+                previous_link = remove_query_param(url, "page")
+            else:
+                previous_link = replace_query_param(url, "page", page_number - 1)
+    return next_link, previous_link
+
+
+def render(request):
+    """
+    Respuesta paginada (igual a la de DRF) con ETag y Cache-Control, o 304.
+    Devuelve None si la página no es válida, para que responda la vista DRF (404).
+    """
+    raw_page = request.GET.get("page") or "1"
+    try:
+        page_number = int(raw_page)
+    except (TypeError, ValueError):
+        return None
+    payload = get_payload()
+    pages = payload["pages"]
+    if page_number < 1 or page_number > len(pages):
+        return None
+
+    etag = f'"{payload["etag"]}-{page_number}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        next_link, previous_link = _page_links(request, page_number, len(pages))
+        head = _dumps({"count": payload["count"], "next": next_link, "previous": previous_link})
+        body = head[:-1] + b',"results":' + pages[page_number - 1] + b"}"
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=settings.HOME_PRODUCTS_MAX_AGE)
+    return response
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.detach import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa los trabajos pendientes que desasocian pólizas de productos desactivados "
+        "o borrados, por lotes cortos. Sin --loop procesa lo disponible y termina (apto para cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Pólizas por transacción.")
+        parser.add_argument("--loop", action="store_true", help="Queda esperando trabajos nuevos.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Segundos de espera sin trabajos.")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Corta tras N trabajos (0 = sin límite).")
+
+    def handle(self, *args, **options):
+        totals = {"jobs": 0, "policies": 0}
+        while True:
+            remaining = options["max_jobs"] - totals["jobs"] if options["max_jobs"] else 0
+            stats = process_pending(batch_size=options["batch_size"], max_jobs=remaining)
+            totals["jobs"] += stats["jobs"]
+            totals["policies"] += stats["policies"]
+            if options["max_jobs"] and totals["jobs"] >= options["max_jobs"]:
+                break
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Trabajos: {totals['jobs']}  pólizas desasociadas: {totals['policies']}")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from products.policy_counts import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara Product.policy_count con las pólizas asociadas y corrige los desfasajes "
+        "(p. ej. tras un QuerySet.update sobre pólizas). Apto para cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Sólo informa, no corrige.")
+
+    def handle(self, *args, **options):
+        drift = reconcile(dry_run=options["dry_run"])
+        for product_id, stored, actual in drift:
+            self.stdout.write(f"Producto {product_id}: guardado {stored}  real {actual}")
+        verb = "encontrados" if options["dry_run"] else "corregidos"
+        self.stdout.write(self.style.SUCCESS(f"Contadores {verb}: {len(drift)}"))
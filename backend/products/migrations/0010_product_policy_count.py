@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_policy_count(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Policy = apps.get_model("policies", "Policy")
+    counts = (
+        Policy.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Product.objects.update(policy_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0009_product_code_ci_constraint"),
+        ("policies", "0010_policyinstallment_pol_inst_policy_period_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="policy_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_policy_count, migrations.RunPython.noop),
+    ]
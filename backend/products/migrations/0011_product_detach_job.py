@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_policy_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDetachJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_ref', models.BigIntegerField(db_index=True)),
+                ('product_name', models.CharField(blank=True, default='', max_length=120)),
+                ('delete_product', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('done', 'Terminado'), ('failed', 'Falló')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('detached', models.PositiveIntegerField(default=0)),
+                ('last_policy_id', models.BigIntegerField(default=0)),
+                ('lease_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='detach_jobs', to='products.product')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='prod_detach_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_detach_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productdetachjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('done', 'Terminado'), ('failed', 'Falló'), ('cancelled', 'Cancelado')], default='pending', max_length=10),
+        ),
+    ]
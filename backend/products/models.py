@@ -1,6 +1,9 @@
 from django.db import models
 from django.db.models.functions import Lower
 
+from common import identifiers
+from common.models import MaintainedFieldsMixin
+
 
 def _normalize_code_value(value: str) -> str:
     cleaned = "".join(ch for ch in (value or "").upper() if ch.isalnum())
@@ -10,7 +13,7 @@ def _normalize_code_value(value: str) -> str:
 def _base_code_from_name(name: str) -> str:
     return _normalize_code_value(name) or "PRODUCT"
 
-class Product(models.Model):
+class Product(MaintainedFieldsMixin, models.Model):
     VEHICLE_TYPES = (('AUTO','Auto'), ('MOTO','Moto'), ('COM','Comercial'))
     PLAN_TYPES = (('RC','Responsabilidad Civil'), ('TC','Terceros Completo'), ('TR','Todo Riesgo'))
 
@@ -27,6 +30,9 @@ class Product(models.Model):
     coverages = models.TextField(help_text='Lista de coberturas en markdown')
     published_home = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
+    # Pólizas asociadas; lo mantienen products/policy_counts.py y las señales de Policy.
+    policy_count = models.PositiveIntegerField(default=0, editable=False)
+    maintained_fields = ("policy_count",)
 
     class Meta:
         constraints = [
@@ -40,28 +46,76 @@ class Product(models.Model):
     @classmethod
     def generate_unique_code(cls, base: str, *, exclude_pk=None) -> str:
         normalized = _normalize_code_value(base) or "PRODUCT"
-        max_length = cls._meta.get_field("code").max_length
-        candidate = normalized[:max_length]
-        suffix = 0
-        while True:
-            conflict = cls.objects.filter(code__iexact=candidate)
-            if exclude_pk is not None:
-                conflict = conflict.exclude(pk=exclude_pk)
-            if not conflict.exists():
-                return candidate
-            suffix += 1
-            suffix_str = f"-{suffix}"
-            trim_len = max(1, max_length - len(suffix_str))
-            trimmed_base = normalized[:trim_len]
-            candidate = f"{trimmed_base}{suffix_str}"
+        queryset = cls.objects.all()
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return identifiers.next_free_code(
+            queryset, "code", normalized, max_length=cls._meta.get_field("code").max_length
+        )
 
     def save(self, *args, **kwargs):
-        if not self.code:
-            base = _base_code_from_name(self.name)
-            self.code = self.generate_unique_code(base)
-        else:
+        if self.code:
             self.code = self.normalize_code(self.code)
-        super().save(*args, **kwargs)
+            return super().save(*args, **kwargs)
+        base = _base_code_from_name(self.name)
+
+        def insert(code):
+            self.code = code
+            super(Product, self).save(*args, **kwargs)
+
+        # Dos altas simultáneas pueden elegir el mismo sufijo: la constraint decide.
+        identifiers.create_unique(
+            insert,
+            model=Product,
+            field="code",
+            generate=lambda: self.generate_unique_code(base, exclude_pk=self.pk),
+            lookup="iexact",
+        )
 
     def __str__(self):
         return f"{self.name} ({self.get_plan_type_display()})"
+
+
+class ProductDetachJob(models.Model):
+    """
+    Desasociación de las pólizas de un producto (al desactivarlo o borrarlo), por lotes
+    en background: la procesa `manage.py detach_product_policies` (products/detach.py).
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendiente"),
+        (STATUS_RUNNING, "En curso"),
+        (STATUS_DONE, "Terminado"),
+        (STATUS_FAILED, "Falló"),
+        (STATUS_CANCELLED, "Cancelado"),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    # Se guarda el id aparte: con delete_product el producto ya no existe al terminar.
+    product = models.ForeignKey(
+        Product, null=True, blank=True, on_delete=models.SET_NULL, related_name="detach_jobs"
+    )
+    product_ref = models.BigIntegerField(db_index=True)
+    product_name = models.CharField(max_length=120, blank=True, default="")
+    delete_product = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.PositiveIntegerField(default=0)
+    detached = models.PositiveIntegerField(default=0)
+    last_policy_id = models.BigIntegerField(default=0)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [models.Index(fields=["status", "id"], name="prod_detach_status_idx")]
+
+    def __str__(self):
+        return f"Desasociar pólizas de {self.product_name or self.product_ref} ({self.get_status_display()})"
@@ -0,0 +1,64 @@
+"""
+Contador `Product.policy_count` (columna del listado admin de productos).
+
+Se mantiene con UPDATEs relativos (`F() + delta`) dentro de la misma transacción que
+cambia la póliza: alta, baja o cambio de `Policy.product` (products/signals.py; el
+`Policy.save()` es atómico) y cada lote de la desasociación en background
+(products/detach.py).
+`QuerySet.update()`/`bulk_create` sobre pólizas no disparan señales: después de algo así
+(o si se sospecha drift) correr `reconcile_policy_counts`.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+
+def adjust(product_id, delta):
+    if product_id is None or not delta:
+        return
+    Product.objects.filter(pk=product_id).update(policy_count=Greatest(F("policy_count") + delta, 0))
+
+
+def _actual_count():
+    from policies.models import Policy
+
+    return Coalesce(
+        Subquery(
+            Policy.objects.filter(product=OuterRef("pk"))
+            .order_by()
+            .values("product")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def find_drift():
+    """`[(product_id, guardado, real), ...]` de los productos con el contador desfasado."""
+    return list(
+        Product.objects.annotate(actual=Count("policies"))
+        .filter(~Q(policy_count=F("actual")))
+        .order_by("id")
+        .values_list("id", "policy_count", "actual")
+    )
+
+
+def reconcile(*, dry_run=False):
+    """
+    Corrige los contadores desfasados. El valor se recalcula en el mismo UPDATE (no el
+    leído en `find_drift`) para no pisar altas concurrentes. Devuelve el drift encontrado.
+    """
+    drift = find_drift()
+    if drift and not dry_run:
+        with transaction.atomic():
+            Product.objects.filter(pk__in=[row[0] for row in drift]).update(policy_count=_actual_count())
+    logger.info("policy_counts_reconciled", extra={"drifted": len(drift), "dry_run": dry_run})
+    return drift
@@ -1,6 +1,6 @@
 # backend/products/serializers.py
 from rest_framework import serializers
-from .models import Product
+from .models import Product, ProductDetachJob
 from .utils import parse_coverages_markdown
 
 # Mapeos de presentación para el Home (tolerante a distintos plan_type)
@@ -24,7 +24,23 @@ PLAN_TAG = {
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = "__all__"
+        # Sin policy_count: es dato interno (sólo lo ve el panel admin).
+        fields = (
+            "id",
+            "code",
+            "name",
+            "subtitle",
+            "bullets",
+            "vehicle_type",
+            "plan_type",
+            "min_year",
+            "max_year",
+            "base_price",
+            "franchise",
+            "coverages",
+            "published_home",
+            "is_active",
+        )
 
 
 class AdminProductSerializer(ProductSerializer):
@@ -94,6 +110,36 @@ class AdminProductSerializer(ProductSerializer):
         return super().update(instance, self._apply_defaults(validated_data, instance))
 
 
+class ProductDetachJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductDetachJob
+        fields = (
+            "id",
+            "product_ref",
+            "product_name",
+            "delete_product",
+            "status",
+            "total",
+            "detached",
+            "progress",
+            "last_error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        # Porcentaje aproximado: `total` es el policy_count al encolar.
+        if obj.status == ProductDetachJob.STATUS_DONE:
+            return 100
+        if not obj.total:
+            return 0
+        return min(99, obj.detached * 100 // obj.total)
+
+
 # 🔹 Serializer liviano para el Home (shape que espera el front)
 class HomeProductSerializer(serializers.ModelSerializer):
     subtitle = serializers.CharField(read_only=True, allow_blank=True)
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from policies.models import Policy
+
+from . import home_payload, policy_counts
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_home_payload(sender, instance, **kwargs):
+    home_payload.invalidate()
+    transaction.on_commit(home_payload.rebuild)
+
+
+@receiver(post_init, sender=Policy)
+def remember_policy_product(sender, instance, **kwargs):
+    # Producto con el que se leyó/guardó la póliza (sin consultar si el campo está diferido).
+    instance._counted_product_id = instance.__dict__.get("product_id", DEFERRED)
+
+
+@receiver(post_save, sender=Policy)
+def count_policy_product(sender, instance, created, raw, update_fields, **kwargs):
+    if raw or (update_fields is not None and "product" not in update_fields):
+        return
+    previous = None if created else instance._counted_product_id
+    if previous is not DEFERRED and previous != instance.product_id:
+        policy_counts.adjust(previous, -1)
+        policy_counts.adjust(instance.product_id, 1)
+    instance._counted_product_id = instance.product_id
+
+
+@receiver(pre_delete, sender=Policy)
+def uncount_policy_product(sender, instance, **kwargs):
+    # pre_delete corre dentro de la transacción del borrado y la fila todavía existe
+    # (si product está diferido se puede leer).
+    previous = instance._counted_product_id
+    policy_counts.adjust(instance.product_id if previous is DEFERRED else previous, -1)
@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from products import home_payload
+from products.models import Product
+
+URL = "/api/products/home"
+
+
+def _product(name, **extra):
+    data = {
+        "name": name,
+        "vehicle_type": "AUTO",
+        "plan_type": "TR",
+        "base_price": Decimal("1000.00"),
+        "coverages": "- Robo\n  - detalle\n* Incendio",
+        "bullets": ["Grúa", " ", "Cristales"],
+        **extra,
+    }
+    return Product.objects.create(**data)
+
+
+@override_settings(HOME_PRODUCTS_MAX_AGE=60)
+class HomePayloadTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = _product("Plan A", subtitle="Completo")
+        _product("Plan B", published_home=False)
+
+    def test_steady_state_costs_no_queries(self):
+        first = self.client.get(URL)
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(URL)
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(second.content, first.content)
+        item = second.json()["results"][0]
+        self.assertEqual(item["code"], self.product.code)
+        self.assertEqual(item["subtitle"], "Completo")
+        self.assertEqual(item["tag"], "Premium")
+        self.assertEqual(item["features"], ["Grúa", "Cristales"])
+        self.assertEqual(item["coverages_lite"], ["Robo", "Incendio"])
+        self.assertEqual(second.json()["count"], 1)
+
+    def test_etag_and_cache_control(self):
+        res = self.client.get(URL)
+        self.assertIn("max-age=60", res["Cache-Control"])
+        self.assertIn("public", res["Cache-Control"])
+        etag = res["ETag"]
+        not_modified = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], etag)
+
+    def test_product_changes_rebuild_the_payload(self):
+        etag = self.client.get(URL)["ETag"]
+        self.product.name = "Plan Renombrado"
+        self.product.save()
+        res = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["results"][0]["name"], "Plan Renombrado")
+        self.product.delete()
+        self.assertEqual(self.client.get(URL).json()["results"], [])
+
+    def test_rebuild_on_commit(self):
+        self.client.get(URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            _product("Plan C")
+        self.assertEqual(cache.get(home_payload.CACHE_KEY)["count"], 2)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "PAGE_SIZE": 2})
+    def test_pages_match_drf_pagination(self):
+        for i in range(3):
+            _product(f"Plan Z{i}")
+        first = self.client.get(URL).json()
+        self.assertEqual(first["count"], 4)
+        self.assertIsNone(first["previous"])
+        self.assertTrue(first["next"].endswith("?page=2"))
+        second = self.client.get(URL, {"page": 2}).json()
+        self.assertTrue(second["previous"].endswith(URL))
+        self.assertEqual([p["name"] for p in second["results"]], ["Plan Z1", "Plan Z2"])
+        self.assertEqual(self.client.get(URL, {"page": 3}).status_code, 404)
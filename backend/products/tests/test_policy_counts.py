@@ -0,0 +1,122 @@
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from policies.models import Policy
+from products.models import Product
+
+User = get_user_model()
+
+
+def _product(code):
+    return Product.objects.create(
+        code=code,
+        name=code,
+        vehicle_type="AUTO",
+        plan_type="RC",
+        base_price=Decimal("100.00"),
+        coverages="-",
+    )
+
+
+class PolicyCountTests(APITestCase):
+    def setUp(self):
+        self.a = _product("PLANA")
+        self.b = _product("PLANB")
+
+    def _counts(self):
+        return {p.code: p.policy_count for p in Product.objects.all()}
+
+    def test_counter_follows_create_move_and_delete(self):
+        p1 = Policy.objects.create(number="SC-1", product=self.a)
+        Policy.objects.create(number="SC-2", product=self.a)
+        Policy.objects.create(number="SC-3")
+        self.assertEqual(self._counts(), {"PLANA": 2, "PLANB": 0})
+
+        p1.product = self.b
+        p1.save()
+        self.assertEqual(self._counts(), {"PLANA": 1, "PLANB": 1})
+        p1.premium = Decimal("5")
+        p1.save(update_fields=["premium"])
+        Policy.objects.get(pk=p1.pk).save()
+        self.assertEqual(self._counts(), {"PLANA": 1, "PLANB": 1})
+
+        p1.product = None
+        p1.save(update_fields=["product", "updated_at"])
+        self.assertEqual(self._counts(), {"PLANA": 1, "PLANB": 0})
+        Policy.objects.filter(number="SC-2").delete()
+        self.assertEqual(self._counts(), {"PLANA": 0, "PLANB": 0})
+
+    def test_deferred_product_does_not_query_or_miscount(self):
+        Policy.objects.create(number="SC-1", product=self.a)
+        with CaptureQueriesContext(connection) as ctx:
+            policy = Policy.objects.only("id", "number").get(number="SC-1")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        policy.number = "SC-1B"
+        policy.save()
+        policy.delete()
+        self.assertEqual(self._counts(), {"PLANA": 0, "PLANB": 0})
+
+    def test_product_save_does_not_overwrite_counter(self):
+        stale = Product.objects.get(pk=self.a.pk)
+        Policy.objects.create(number="SC-1", product=self.a)
+        stale.name = "Renombrado"
+        stale.save()
+        self.assertEqual(Product.objects.get(pk=self.a.pk).policy_count, 1)
+
+    def test_deferred_product_save_is_a_single_update(self):
+        product = Product.objects.only("id", "code", "name").get(pk=self.a.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            product.name = "Renombrado"
+            product.save()
+        self.assertEqual([q["sql"].split()[0] for q in ctx.captured_queries], ["UPDATE"])
+        self.assertNotIn("policy_count", ctx.captured_queries[0]["sql"])
+
+    def test_save_inserts_again_when_row_is_missing(self):
+        product = Product.objects.get(pk=self.a.pk)
+        Product.objects.filter(pk=self.a.pk).delete()
+        product.save()
+        self.assertTrue(Product.objects.filter(pk=self.a.pk).exists())
+
+    def test_admin_list_and_detach_use_the_counter(self):
+        admin = User.objects.create_superuser(dni="900", email="admin@ex.com", password="Admin123")
+        self.client.force_authenticate(admin)
+        Policy.objects.create(number="SC-1", product=self.a)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/admin/insurance-types")
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if "policies_policy" in q["sql"]])
+        rows = res.data["results"] if isinstance(res.data, dict) else res.data
+        self.assertEqual({r["code"]: r["policy_count"] for r in rows}, {"PLANA": 1, "PLANB": 0})
+
+        res = self.client.patch(f"/api/admin/insurance-types/{self.a.pk}", {"is_active": False}, format="json")
+        self.assertEqual(res.status_code, 200)
+        call_command("detach_product_policies", stdout=io.StringIO())
+        self.assertEqual(Product.objects.get(pk=self.a.pk).policy_count, 0)
+        self.assertIsNone(Policy.objects.get(number="SC-1").product_id)
+
+    def test_public_serializer_hides_counter(self):
+        res = self.client.get(f"/api/products/{self.a.pk}/")
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("policy_count", res.data)
+
+    def test_reconcile_fixes_drift(self):
+        Policy.objects.create(number="SC-1", product=self.a)
+        Policy.objects.filter(number="SC-1").update(product=self.b)  # sin señales
+        out = io.StringIO()
+        call_command("reconcile_policy_counts", "--dry-run", stdout=out)
+        self.assertIn("Contadores encontrados: 2", out.getvalue())
+        self.assertEqual(self._counts(), {"PLANA": 1, "PLANB": 0})
+
+        out = io.StringIO()
+        call_command("reconcile_policy_counts", stdout=out)
+        self.assertIn(f"Producto {self.a.pk}: guardado 1  real 0", out.getvalue())
+        self.assertEqual(self._counts(), {"PLANA": 0, "PLANB": 1})
+        out = io.StringIO()
+        call_command("reconcile_policy_counts", stdout=out)
+        self.assertIn("Contadores corregidos: 0", out.getvalue())
@@ -0,0 +1,154 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from policies.models import Policy
+from products import detach
+from products.models import Product, ProductDetachJob
+
+User = get_user_model()
+URL = "/api/admin/insurance-types"
+
+
+@override_settings(PRODUCT_DETACH_BATCH_SIZE=3)
+class ProductDetachTests(APITestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(dni="900", email="admin@ex.com", password="Admin123")
+        self.client.force_authenticate(admin)
+        self.product = Product.objects.create(
+            code="PLANA",
+            name="Plan A",
+            vehicle_type="AUTO",
+            plan_type="RC",
+            base_price=Decimal("100.00"),
+            coverages="-",
+        )
+        self.other = Product.objects.create(
+            code="PLANB",
+            name="Plan B",
+            vehicle_type="AUTO",
+            plan_type="RC",
+            base_price=Decimal("100.00"),
+            coverages="-",
+        )
+        for i in range(7):
+            Policy.objects.create(number=f"SC-{i}", product=self.product)
+        Policy.objects.create(number="SC-OTRA", product=self.other)
+
+    def _start(self, **kwargs):
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        return detach.start(self.product, **kwargs)
+
+    def _run(self):
+        out = io.StringIO()
+        call_command("detach_product_policies", stdout=out)
+        return out.getvalue()
+
+    def test_deactivation_enqueues_job_and_worker_detaches_in_chunks(self):
+        res = self.client.patch(f"{URL}/{self.product.pk}", {"is_active": False}, format="json")
+        self.assertEqual(res.status_code, 200)
+        # El request no toca las pólizas.
+        self.assertEqual(Policy.objects.filter(product=self.product).count(), 7)
+        progress = self.client.get(f"{URL}/{self.product.pk}/detach-job").data
+        self.assertEqual((progress["status"], progress["total"], progress["progress"]), ("pending", 7, 0))
+
+        chunks = []
+
+        def rebill(sender, policy_ids, **kwargs):
+            chunks.append(policy_ids)
+
+        detach.policies_detached.connect(rebill)
+        self.addCleanup(detach.policies_detached.disconnect, rebill)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIn("Trabajos: 1  pólizas desasociadas: 7", self._run())
+        self.assertEqual([len(ids) for ids in chunks], [3, 3, 1])
+
+        self.assertFalse(Policy.objects.filter(product=self.product).exists())
+        self.assertEqual(Policy.objects.get(number="SC-OTRA").product, self.other)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.policy_count, 0)
+        progress = self.client.get(f"{URL}/{self.product.pk}/detach-job").data
+        self.assertEqual((progress["status"], progress["detached"], progress["progress"]), ("done", 7, 100))
+
+    def test_delete_with_policies_is_deferred_to_the_job(self):
+        res = self.client.delete(f"{URL}/{self.product.pk}")
+        self.assertEqual(res.status_code, 202)
+        job_id = res.data["id"]
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.is_active)
+        self._run()
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+        status = self.client.get(f"{URL}/detach-jobs/{job_id}").data
+        self.assertEqual((status["status"], status["product_name"], status["delete_product"]), ("done", "Plan A", True))
+
+    def test_delete_without_policies_is_immediate(self):
+        Policy.objects.filter(product=self.other).delete()
+        self.assertEqual(self.client.delete(f"{URL}/{self.other.pk}").status_code, 204)
+        self.assertFalse(ProductDetachJob.objects.exists())
+
+    def test_reactivation_cancels_the_pending_job(self):
+        self.client.patch(f"{URL}/{self.product.pk}", {"is_active": False}, format="json")
+        res = self.client.patch(f"{URL}/{self.product.pk}", {"is_active": True}, format="json")
+        self.assertEqual(res.status_code, 200)
+        Policy.objects.create(number="SC-NUEVA", product=self.product)
+        self.assertEqual(detach.process_pending(), {"jobs": 0, "policies": 0})
+        self.assertEqual(Policy.objects.filter(product=self.product).count(), 8)
+        self.assertEqual(ProductDetachJob.objects.get().status, ProductDetachJob.STATUS_CANCELLED)
+
+    def test_worker_stops_when_product_is_reactivated_mid_job(self):
+        self._start()
+        job = detach.claim_job()
+        self.assertEqual(detach.run_chunk(job, batch_size=3), 3)
+        Product.objects.filter(pk=self.product.pk).update(is_active=True)  # sin pasar por la vista
+        self.assertEqual(detach.run(job, batch_size=3), 0)
+        self.assertEqual(Policy.objects.filter(product=self.product).count(), 4)
+        self.assertEqual(ProductDetachJob.objects.get().status, ProductDetachJob.STATUS_CANCELLED)
+
+    def test_reactivation_does_not_cancel_a_delete(self):
+        self.client.delete(f"{URL}/{self.product.pk}")
+        detach.cancel(self.product)
+        Product.objects.filter(pk=self.product.pk).update(is_active=True)
+        self._run()
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+
+    def test_repeated_requests_reuse_the_active_job(self):
+        first = self._start()
+        second = self._start(delete_product=True)
+        self.assertEqual(first.pk, second.pk)
+        self.assertTrue(ProductDetachJob.objects.get(pk=first.pk).delete_product)
+
+    def test_expired_lease_is_resumed_from_cursor(self):
+        job = self._start()
+        claimed = detach.claim_job()
+        detach.run_chunk(claimed, batch_size=3)
+        self.assertIsNone(detach.claim_job())  # lease vigente
+
+        ProductDetachJob.objects.filter(pk=job.pk).update(lease_until=timezone.now() - timedelta(seconds=1))
+        resumed = detach.claim_job()
+        self.assertEqual((resumed.pk, resumed.detached), (job.pk, 3))
+        self.assertEqual(detach.run(resumed), 4)
+
+    def test_policy_added_behind_cursor_is_picked_up(self):
+        self._start()
+        job = detach.claim_job()
+        self.assertEqual(detach.run_chunk(job, batch_size=10), 7)
+        behind = Policy.objects.get(number="SC-0")
+        behind.product = self.product
+        behind.save()
+        self.assertEqual(detach.run(job), 1)
+        self.assertFalse(Policy.objects.filter(product=self.product).exists())
+
+    def test_failure_marks_job_failed(self):
+        self._start()
+        with patch.object(detach.policy_counts, "adjust", side_effect=RuntimeError("db down")):
+            self._run()
+        job = ProductDetachJob.objects.get()
+        self.assertEqual((job.status, job.last_error), ("failed", "db down"))
+        self.assertEqual(Policy.objects.filter(product=self.product).count(), 7)
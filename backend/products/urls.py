@@ -1,6 +1,8 @@
 # backend/products/urls.py
 from django.urls import path
 from rest_framework.routers import DefaultRouter
+from common.async_views import async_read_view
+from .async_views import home_products_list
 from .views import ProductViewSet, HomeProductsListView, ProductAdminViewSet
 
 # Router para el admin (insurances)
@@ -10,13 +12,14 @@ admin_router.register(r"insurance-types", ProductAdminViewSet, basename="admin-i
 # URLs públicas
 list_view = ProductViewSet.as_view({"get": "list"})
 detail_view = ProductViewSet.as_view({"get": "retrieve"})
+home_view = async_read_view(home_products_list, HomeProductsListView.as_view())
 
 urlpatterns = [
     path("", list_view, name="products-list"),
     path("<int:pk>/", detail_view, name="products-detail"),
     path("<int:pk>", detail_view, name="products-detail-noslash"),
-    path("home/", HomeProductsListView.as_view(), name="products-home"),
-    path("home", HomeProductsListView.as_view(), name="products-home-noslash"),
+    path("home/", home_view, name="products-home"),
+    path("home", home_view, name="products-home-noslash"),
 ]
 
 urlpatterns += admin_router.urls
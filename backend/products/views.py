@@ -3,10 +3,17 @@ from rest_framework import viewsets, permissions, status, response
 from rest_framework.generics import ListAPIView
 from common.authentication import OptionalAuthenticationMixin
 from common.security import PublicEndpointMixin
-from .models import Product
-from .serializers import ProductSerializer, HomeProductSerializer, AdminProductSerializer
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
+from . import detach, home_payload
+from .models import Product, ProductDetachJob
+from .serializers import (
+    ProductSerializer,
+    HomeProductSerializer,
+    AdminProductSerializer,
+    ProductDetachJobSerializer,
+)
 from policies.models import Policy
-from django.db.models import Count
 
 
 # 🔹 ViewSet general (ya existente)
@@ -41,24 +48,21 @@ class HomeProductsListView(PublicEndpointMixin, ListAPIView):
     """
     GET /api/products/home
     Devuelve una versión liviana para el carrusel del Home.
-    Incluye solo: id, name, plan_type, vehicle_type, franchise, coverages_lite.
+    Incluye solo: id, code, name, subtitle, tag, features, coverages_lite.
+    Se sirve precalculado desde el cache con ETag (products/home_payload.py).
     """
     serializer_class = HomeProductSerializer
 
     def get_queryset(self):
-        # Solo productos activos y marcados para mostrarse en el Home
-        qs = Product.objects.filter(is_active=True, published_home=True)
+        # Solo productos activos y marcados para mostrarse en el Home, orden por nombre
+        return home_payload.home_queryset()
 
-        # Campos mínimos para optimizar consulta
-        qs = qs.only("id", "name", "plan_type", "vehicle_type", "franchise")
-
-        # Orden por home_order si existe, si no por nombre
-        if hasattr(Product, "home_order"):
-            qs = qs.order_by("home_order", "id")
-        else:
-            qs = qs.order_by("name", "id")
-
-        return qs
+    def list(self, request, *args, **kwargs):
+        response = home_payload.render(request)
+        if response is None:
+            # Página inválida: que DRF responda el 404 de siempre.
+            return super().list(request, *args, **kwargs)
+        return response
 
 
 class ProductAdminViewSet(viewsets.ModelViewSet):
@@ -70,24 +74,52 @@ class ProductAdminViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAdminUser]
 
     def get_queryset(self):
-        return (
-            Product.objects.all()
-            .annotate(policy_count=Count("policies"))
-            .order_by("id")
-        )
+        # policy_count es una columna mantenida (products/policy_counts.py), sin JOIN a pólizas.
+        return Product.objects.all().order_by("id")
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Desasociar pólizas antes de eliminar el seguro
-        self._detach_policies(instance)
-        self.perform_destroy(instance)
-        return response.Response(status=status.HTTP_204_NO_CONTENT)
+        if not Policy.objects.filter(product=instance).exists():
+            self.perform_destroy(instance)
+            return response.Response(status=status.HTTP_204_NO_CONTENT)
+        # Con pólizas: se desactiva ya y se borra cuando el job termine de desasociarlas.
+        if instance.is_active:
+            instance.is_active = False
+            instance.save(update_fields=["is_active"])
+        job = detach.start(instance, delete_product=True)
+        return response.Response(ProductDetachJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
     def perform_update(self, serializer):
         instance = serializer.save()
         if not getattr(instance, "is_active", True):
             self._detach_policies(instance)
+        else:
+            # Reactivado antes de que el worker terminara: las pólizas restantes se quedan.
+            detach.cancel(instance)
         return instance
 
     def _detach_policies(self, instance):
-        Policy.objects.filter(product=instance).update(product=None)
+        # Por lotes en background (products/detach.py); progreso en .../detach-job.
+        if Policy.objects.filter(product=instance).exists():
+            return detach.start(instance)
+        return None
+
+    @action(detail=True, methods=["get"], url_path="detach-job")
+    def detach_job(self, request, pk=None):
+        """
+        Último trabajo de desasociación del producto (progreso en `detached`/`progress`).
+        """
+        job = detach.latest_for(self.get_object())
+        if job is None:
+            return response.Response(
+                {"detail": "El producto no tiene desasociaciones."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return response.Response(ProductDetachJobSerializer(job).data)
+
+    @action(detail=False, methods=["get"], url_path=r"detach-jobs/(?P<job_id>\d+)")
+    def detach_job_status(self, request, job_id=None):
+        """
+        Progreso por id del trabajo (sirve también cuando el producto ya se borró).
+        """
+        job = get_object_or_404(ProductDetachJob, pk=job_id)
+        return response.Response(ProductDetachJobSerializer(job).data)
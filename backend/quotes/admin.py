@@ -6,4 +6,4 @@ from .models import QuoteShare
 class QuoteShareAdmin(admin.ModelAdmin):
     list_display = ("token", "phone", "make", "model", "year", "created_at")
     search_fields = ("token", "phone", "make", "model", "version", "city")
-    readonly_fields = ("token", "created_at")
+    readonly_fields = ("token", "created_at", "photos_processed_at", "photos_claimed_until", "photos_error")
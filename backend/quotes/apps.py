@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class QuotesConfig(AppConfig):
+    name = "quotes"
+    verbose_name = "Cotizaciones"
+
+    def ready(self):
+        from . import signals  # noqa: F401 - invalida el índice de cotización
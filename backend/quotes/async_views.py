@@ -0,0 +1,31 @@
+import logging
+
+from django.http import JsonResponse
+from django.utils import timezone
+
+from common.async_views import check_throttles
+from .models import QuoteShare
+from .serializers import QuoteShareSerializer
+
+logger = logging.getLogger("quotes.views")
+
+
+async def quote_share_detail(request, token):
+    """
+    GET /api/quotes/share/<token> con el ORM async.
+    El 404 lo sigue resolviendo la vista DRF (mismo cuerpo de error).
+    """
+    from .views import QuoteShareDetailView
+
+    throttled = await check_throttles(QuoteShareDetailView, request, (), {"token": token})
+    if throttled:
+        return throttled
+    try:
+        obj = await QuoteShare.objects.aget(token=token)
+    except QuoteShare.DoesNotExist:
+        return None
+    if obj.expires_at and obj.expires_at <= timezone.now():
+        logger.info("quote_share_expired", extra={"token": token})
+        return JsonResponse({"detail": "La ficha de cotización expiró."}, status=410)
+    data = QuoteShareSerializer(obj, context={"request": request}).data
+    return JsonResponse(data)
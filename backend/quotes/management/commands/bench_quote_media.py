@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from common import derivatives
+from quotes.photos import SIDES
+
+
+def _synthetic_photo(width, height, seed):
+    # Gradiente + ruido: comprime parecido a una foto real (un color plano no sirve).
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 24 + seed)
+    image = Image.merge("RGB", (gradient, noise, gradient.rotate(90).resize((width, height))))
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=settings.QUOTE_PHOTO_JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide los bytes que transfiere una vista de ficha de cotización (4 fotos) con las "
+        "fotos originales contra cada variante del srcset, y el tiempo de generarlas en "
+        "serie contra el pool de common/derivatives.py. Usa un storage temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--width", type=int, default=settings.QUOTE_PHOTO_MAX_DIMENSION)
+        parser.add_argument("--height", type=int, default=settings.QUOTE_PHOTO_MAX_DIMENSION * 3 // 4)
+        parser.add_argument("--shares", type=int, default=3, help="Fichas sintéticas para promediar.")
+
+    def handle(self, *args, **options):
+        location = tempfile.mkdtemp(prefix="bench-quote-media-")
+        try:
+            storage = FileSystemStorage(location=location)
+            names = [
+                storage.save(
+                    f"quote-photos/bench{share}/{side}.jpg",
+                    ContentFile(_synthetic_photo(options["width"], options["height"], share * 4 + i)),
+                )
+                for share in range(max(1, options["shares"]))
+                for i, side in enumerate(SIDES)
+            ]
+            self._run(storage, names, max(1, options["shares"]))
+        finally:
+            shutil.rmtree(location, ignore_errors=True)
+
+    def _run(self, storage, names, shares):
+        variants = [(w, f) for w in settings.IMAGE_DERIVATIVE_WIDTHS for f in settings.IMAGE_DERIVATIVE_FORMATS]
+
+        start = time.perf_counter()
+        for name in names[: len(SIDES)]:
+            for width, fmt in variants:
+                with storage.open(name, "rb") as fh:
+                    derivatives.render(fh, width, fmt)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        derivatives.warm(names, storage=storage)
+        pooled = (time.perf_counter() - start) / shares
+
+        original = sum(storage.size(name) for name in names) / shares
+        self.stdout.write(f"Original: {original / 1024:.1f} KiB por vista ({len(SIDES)} fotos)")
+        for width, fmt in variants:
+            size = sum(storage.size(derivatives.derivative_name(name, width, fmt)) for name in names) / shares
+            self.stdout.write(
+                f"{fmt:>4} {width:>5}w: {size / 1024:8.1f} KiB por vista  ({size / original:6.1%} del original)"
+            )
+        self.stdout.write(
+            f"Generar {len(variants)} variantes x {len(SIDES)} fotos: serie {serial * 1000:.0f}ms  "
+            f"pool ({settings.IMAGE_DERIVATIVE_WORKERS} hilos) {pooled * 1000:.0f}ms por ficha"
+        )
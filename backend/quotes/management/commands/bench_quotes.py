@@ -0,0 +1,113 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from products.models import Product
+from quotes import pricing
+
+VEHICLE_TYPES = [code for code, _ in Product.VEHICLE_TYPES]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_quote(vtype, year):
+    # Lo que hacía QuoteView antes del índice: una consulta por cotización.
+    qs = Product.objects.filter(
+        vehicle_type=vtype,
+        min_year__lte=year,
+        max_year__gte=year,
+        is_active=True,
+        published_home=True,
+    )
+    factor = pricing.age_factor(year)
+    return [
+        {
+            "id": p.id,
+            "name": p.name,
+            "plan_type": p.plan_type,
+            "vehicle_type": p.vehicle_type,
+            "franchise": p.franchise,
+            "estimated_price": pricing.estimate_price(p.base_price, factor),
+        }
+        for p in qs
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cotizaciones por segundo: la consulta por cotización anterior contra el "
+        "índice en memoria de quotes/pricing.py, y verifica que ambos den los mismos planes. "
+        "Con --products > 0 se generan productos sintéticos dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=200, help="Productos sintéticos (0 = usar los existentes).")
+        parser.add_argument("--quotes", type=int, default=5000, help="Cotizaciones por variante.")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        current_year = timezone.now().year
+        total = max(1, options["quotes"])
+        requests = [(rng.choice(VEHICLE_TYPES), rng.randint(current_year - 30, current_year)) for _ in range(total)]
+        try:
+            with transaction.atomic():
+                if options["products"] > 0:
+                    self._populate(options["products"], rng, current_year)
+                pricing.invalidate()
+                self._compare(requests)
+                raise _Rollback
+        except _Rollback:
+            pass
+        pricing.invalidate()
+
+    def _populate(self, count, rng, current_year):
+        products = []
+        for i in range(count):
+            min_year = rng.randint(current_year - 35, current_year - 5)
+            products.append(
+                Product(
+                    code=f"BENCH-{i}",
+                    name=f"Bench {i}",
+                    vehicle_type=rng.choice(VEHICLE_TYPES),
+                    plan_type=rng.choice(["RC", "TC", "TR"]),
+                    min_year=min_year,
+                    max_year=rng.randint(min_year, current_year + 1),
+                    base_price=Decimal(rng.randint(1000, 90000)) / 100,
+                    coverages="-",
+                    is_active=rng.random() > 0.1,
+                    published_home=rng.random() > 0.1,
+                )
+            )
+        Product.objects.bulk_create(products)
+
+    def _compare(self, requests):
+        for vtype, year in requests[:200]:
+            if pricing.quote(vtype, year) != _legacy_quote(vtype, year):
+                self.stderr.write(self.style.ERROR(f"Diferencia para {vtype} {year}"))
+                return
+        products = Product.objects.filter(is_active=True, published_home=True).count()
+        self.stdout.write(f"{connection.vendor}: {products} productos cotizables, {len(requests)} cotizaciones")
+
+        legacy = self._rate(_legacy_quote, requests)
+        pricing.invalidate()
+        start = time.perf_counter()
+        pricing.get_index()
+        build_ms = (time.perf_counter() - start) * 1000
+        cold = self._rate(pricing.quote, requests)
+        warm = self._rate(pricing.quote, requests)
+        self.stdout.write(f"  consulta por cotización {legacy:12,.0f} cot/s")
+        self.stdout.write(f"  índice (armado {build_ms:.1f} ms) {cold:12,.0f} cot/s  x{cold / legacy:.1f}")
+        self.stdout.write(f"  índice memorizado       {warm:12,.0f} cot/s  x{warm / legacy:.1f}")
+
+    def _rate(self, quote, requests):
+        start = time.perf_counter()
+        for vtype, year in requests:
+            quote(vtype, year)
+        return len(requests) / (time.perf_counter() - start)
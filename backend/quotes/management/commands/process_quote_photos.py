@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quotes.photos import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encodea y achica las fotos de las fichas de cotización pendientes y genera "
+        "sus miniaturas. Sin --loop procesa lo disponible y termina (apto para cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20, help="Fichas por lote.")
+        parser.add_argument("--loop", action="store_true", help="Queda esperando fichas nuevas.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Segundos de espera sin pendientes.")
+        parser.add_argument("--max-batches", type=int, default=0, help="Corta tras N lotes (0 = sin límite).")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        total = 0
+        batches = 0
+        while True:
+            processed = process_pending(limit=batch_size)
+            total += processed
+            batches += 1
+            if options["max_batches"] and batches >= options["max_batches"]:
+                break
+            if processed < batch_size:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Fichas procesadas: {total}"))
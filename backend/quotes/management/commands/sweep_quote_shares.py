@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from quotes.retention import delete_share_media, find_orphans, sweep_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes las fichas de cotización vencidas junto con sus fotos e informa "
+        "la media huérfana (carpetas de quote-photos/ sin ficha). Apto para cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Fichas por lote.")
+        parser.add_argument("--max-batches", type=int, default=0, help="Corta tras N lotes (0 = sin límite).")
+        parser.add_argument("--workers", type=int, default=4, help="Borrados de media en paralelo.")
+        parser.add_argument("--skip-expired", action="store_true", help="Sólo revisa la media huérfana.")
+        parser.add_argument("--delete-orphans", action="store_true", help="Además de informarla, borra la media huérfana.")
+        parser.add_argument(
+            "--orphan-min-age-hours",
+            type=float,
+            default=24,
+            help="Ignora carpetas con archivos más nuevos que esto (subidas en curso).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["skip_expired"]:
+            totals = sweep_expired(
+                batch_size=max(1, options["batch_size"]),
+                max_batches=options["max_batches"],
+                workers=options["workers"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Fichas vencidas borradas: {totals['shares']}  archivos: {totals['files']}")
+            )
+
+        orphans = find_orphans(min_age=timedelta(hours=options["orphan_min_age_hours"]))
+        for token, names, size in orphans:
+            self.stdout.write(f"Huérfana: quote-photos/{token}/  archivos {len(names)}  {size} bytes")
+            if options["delete_orphans"]:
+                delete_share_media(token)
+        total_size = sum(size for _token, _names, size in orphans)
+        verb = "borradas" if options["delete_orphans"] else "encontradas"
+        self.stdout.write(f"Carpetas huérfanas {verb}: {len(orphans)}  ({total_size} bytes)")
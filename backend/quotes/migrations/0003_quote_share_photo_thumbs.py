@@ -0,0 +1,37 @@
+import quotes.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0002_quote_share_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photo_back_thumb',
+            field=models.ImageField(blank=True, upload_to=quotes.models.quote_thumb_upload_to),
+        ),
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photo_front_thumb',
+            field=models.ImageField(blank=True, upload_to=quotes.models.quote_thumb_upload_to),
+        ),
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photo_left_thumb',
+            field=models.ImageField(blank=True, upload_to=quotes.models.quote_thumb_upload_to),
+        ),
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photo_right_thumb',
+            field=models.ImageField(blank=True, upload_to=quotes.models.quote_thumb_upload_to),
+        ),
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photos_processed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0003_quote_share_photo_thumbs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quoteshare',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
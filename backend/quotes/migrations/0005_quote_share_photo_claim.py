@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0004_quote_share_expires_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photos_claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quoteshare',
+            name='photos_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
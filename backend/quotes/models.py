@@ -1,24 +1,24 @@
-import secrets
-import string
 from django.db import models
 
+from common import identifiers
+
 
 def _generate_token(length=10):
     """
     Genera un identificador corto (solo letras/números) para compartir la ficha.
-    Intenta evitar colisiones generando un token nuevo si ya existe.
+    ~51 bits: las colisiones las resuelve `save()` reintentando ante el unique.
     """
-    alphabet = string.ascii_lowercase + string.digits
-    while True:
-        token = "".join(secrets.choice(alphabet) for _ in range(length))
-        if not QuoteShare.objects.filter(token=token).exists():
-            return token
+    return identifiers.random_token(length)
 
 
 def quote_photo_upload_to(instance, filename):
     return f"quote-photos/{instance.token}/{filename}"
 
 
+def quote_thumb_upload_to(instance, filename):
+    return f"quote-photos/{instance.token}/thumbs/{filename}"
+
+
 class QuoteShare(models.Model):
     token = models.CharField(max_length=12, unique=True, editable=False)
 
@@ -41,9 +41,19 @@ class QuoteShare(models.Model):
     photo_back = models.ImageField(upload_to=quote_photo_upload_to)
     photo_right = models.ImageField(upload_to=quote_photo_upload_to)
     photo_left = models.ImageField(upload_to=quote_photo_upload_to)
+    # Las completa `process_quote_photos` (quotes/photos.py) después de crear la ficha.
+    photo_front_thumb = models.ImageField(upload_to=quote_thumb_upload_to, blank=True)
+    photo_back_thumb = models.ImageField(upload_to=quote_thumb_upload_to, blank=True)
+    photo_right_thumb = models.ImageField(upload_to=quote_thumb_upload_to, blank=True)
+    photo_left_thumb = models.ImageField(upload_to=quote_thumb_upload_to, blank=True)
+    photos_processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Lease del worker que la está procesando y el error si el proceso falló (queda marcada
+    # como procesada igual, para que una ficha rota no trabe la cola).
+    photos_claimed_until = models.DateTimeField(null=True, blank=True)
+    photos_error = models.CharField(max_length=255, blank=True, default="")
 
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -54,6 +64,13 @@ class QuoteShare(models.Model):
         return f"Ficha {self.token} - {self.make} {self.model} ({self.year})"
 
     def save(self, *args, **kwargs):
-        if not self.token:
-            self.token = _generate_token()
-        super().save(*args, **kwargs)
+        if self.token:
+            return super().save(*args, **kwargs)
+
+        def insert(token):
+            self.token = token
+            super(QuoteShare, self).save(*args, **kwargs)
+
+        # Si hubiera un reintento las fotos ya quedaron bajo el token anterior; con ~51
+        # bits no justifica moverlas.
+        identifiers.create_unique(insert, model=QuoteShare, field="token", generate=_generate_token)
@@ -0,0 +1,199 @@
+"""
+Fotos de las fichas de cotización: subida en streaming y post-proceso.
+
+Por multipart (`photos.front`, `photos.back`, ...) cada archivo se escribe por chunks
+a un archivo temporal (QuotePhotoUploadHandler) y nunca queda entero en memoria; al
+guardar, FileSystemStorage lo mueve y los storages remotos lo suben por partes. Si
+una foto supera QUOTE_PHOTO_MAX_BYTES se deja de escribir y el serializer la rechaza.
+
+Después, `process_pending` (comando `process_quote_photos`) re-encodea cada foto a
+JPEG dentro de QUOTE_PHOTO_MAX_DIMENSION, genera la miniatura de
+QUOTE_PHOTO_THUMB_DIMENSION que usa el panel de agentes y las variantes del `srcset`
+(common/derivatives.py).
+
+La ficha se toma con un lease (`photos_claimed_until`) en una transacción corta; Pillow
+y el storage corren sin locks y el resultado se guarda en otra transacción corta. Si el
+proceso de una ficha falla se loguea, se guarda `photos_error` y se la marca procesada
+para que no vuelva a bloquear la cola.
+"""
+
+import logging
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from common import derivatives
+from .models import QuoteShare
+
+logger = logging.getLogger(__name__)
+
+SIDES = ("front", "back", "right", "left")
+CLAIM_SECONDS = 600
+
+
+class QuotePhotoUploadHandler(TemporaryFileUploadHandler):
+    """
+    Escribe cada archivo a disco por chunks y corta la escritura al pasar el límite:
+    el archivo resultante queda vacío pero con su `size` real, para que la validación
+    devuelva el mismo error que con data URLs.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.oversized:
+            return None
+        if self.received > settings.QUOTE_PHOTO_MAX_BYTES:
+            self.oversized = True
+            self.file.close()  # borra el temporal
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.oversized:
+            return super().file_complete(file_size)
+        placeholder = SimpleUploadedFile(self.file_name, b"", content_type=self.content_type)
+        placeholder.size = self.received
+        return placeholder
+
+
+def _encode_jpeg(image):
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=settings.QUOTE_PHOTO_JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_photo(file):
+    """
+    Devuelve `(foto, miniatura)` como bytes JPEG a partir de un archivo de imagen.
+    """
+    max_dimension = settings.QUOTE_PHOTO_MAX_DIMENSION
+    thumb_dimension = settings.QUOTE_PHOTO_THUMB_DIMENSION
+    with Image.open(file) as source:
+        # En JPEG, draft decodifica directo a una escala reducida (mucho menos memoria).
+        source.draft("RGB", (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    photo = _encode_jpeg(image)
+    image.thumbnail((thumb_dimension, thumb_dimension), Image.Resampling.LANCZOS)
+    return photo, _encode_jpeg(image)
+
+
+def process_share(share):
+    """
+    Re-encodea las cuatro fotos de `share`, genera sus miniaturas y marca la ficha como
+    procesada. Una foto ilegible se deja como está (se loguea) para no reintentarla siempre.
+    Corre fuera de transacción: lo único que toca la fila es el UPDATE final. Si la ficha se borró
+    mientras tanto (p. ej. la barrió `sweep_quote_shares`), descarta lo generado.
+    """
+    storage = share.photo_front.storage
+    stale = []
+    written = []
+    try:
+        for side in SIDES:
+            photo = getattr(share, f"photo_{side}")
+            if not photo:
+                continue
+            try:
+                with photo.open("rb") as fh:
+                    photo_bytes, thumb_bytes = render_photo(fh)
+            except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+                logger.warning("quote_photo_unreadable", extra={"token": share.token, "side": side})
+                continue
+            original = photo.name
+            photo.save(f"{side}.jpg", ContentFile(photo_bytes), save=False)
+            if photo.name != original:
+                written.append(photo.name)
+                stale.append(original)
+                stale.extend(
+                    derivatives.derivative_name(original, width, fmt)
+                    for width in settings.IMAGE_DERIVATIVE_WIDTHS
+                    for fmt in settings.IMAGE_DERIVATIVE_FORMATS
+                )
+            thumb = getattr(share, f"photo_{side}_thumb")
+            if thumb:
+                stale.append(thumb.name)
+            thumb.save(f"{side}.jpg", ContentFile(thumb_bytes), save=False)
+            written.append(thumb.name)
+
+        fields = {f"photo_{side}": getattr(share, f"photo_{side}").name for side in SIDES}
+        fields.update({f"photo_{side}_thumb": getattr(share, f"photo_{side}_thumb").name for side in SIDES})
+        share.photos_processed_at = timezone.now()
+        updated = QuoteShare.objects.filter(pk=share.pk, photos_processed_at__isnull=True).update(
+            **fields, photos_processed_at=share.photos_processed_at, photos_claimed_until=None
+        )
+    except Exception:
+        _delete(storage, written)
+        raise
+    if not updated:
+        _delete(storage, written)
+        return None
+    # Los archivos viejos se borran recién cuando la ficha ya apunta a los nuevos.
+    _delete(storage, stale)
+    derivatives.warm(
+        [getattr(share, f"photo_{side}").name for side in SIDES if getattr(share, f"photo_{side}")],
+        storage=storage,
+    )
+    return share
+
+
+def _delete(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("quote_photo_delete_failed", extra={"name": name}, exc_info=True)
+
+
+def claim_share(*, now=None):
+    """Toma una ficha pendiente (o con el lease vencido) en una transacción corta."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        share = (
+            QuoteShare.objects.select_for_update(skip_locked=True)
+            .filter(photos_processed_at__isnull=True)
+            .filter(Q(photos_claimed_until__isnull=True) | Q(photos_claimed_until__lte=now))
+            .order_by("id")
+            .first()
+        )
+        if share is None:
+            return None
+        share.photos_claimed_until = now + timedelta(seconds=CLAIM_SECONDS)
+        share.save(update_fields=["photos_claimed_until"])
+    return share
+
+
+def process_pending(*, limit=None):
+    """
+    Procesa fichas pendientes de a una (con lease, así varios workers no toman la
+    misma). Una ficha que falla se marca con `photos_error` y se sigue con la próxima.
+    Devuelve cuántas procesó (incluidas las que fallaron).
+    """
+    processed = 0
+    while limit is None or processed < limit:
+        share = claim_share()
+        if share is None:
+            break
+        try:
+            process_share(share)
+        except Exception as exc:
+            logger.exception("quote_photos_failed", extra={"token": share.token})
+            QuoteShare.objects.filter(pk=share.pk, photos_processed_at__isnull=True).update(
+                photos_processed_at=timezone.now(),
+                photos_claimed_until=None,
+                photos_error=f"{type(exc).__name__}: {exc}"[:255],
+            )
+        processed += 1
+    return processed
@@ -0,0 +1,147 @@
+"""
+Motor de cotización en memoria para el formulario público de `/api/quotes/`.
+
+Cada proceso arma un índice de los productos activos y publicados, agrupados por
+`vehicle_type` y ordenados por `min_year` (bisect para el límite inferior, filtro por
+`max_year`), y memoriza la lista de planes por (tipo, año, factor): una cotización no
+toca la DB. El índice guarda la versión del cache compartido (`quote_pricing_version`)
+con la que se armó; guardar o borrar un Product rota la versión (quotes/signals.py) y
+cada worker lo reconstruye en su próxima cotización.
+Los `QuerySet.update()` sobre productos no disparan señales: llamar a `invalidate()`.
+"""
+
+import threading
+import uuid
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from products.models import Product
+
+VERSION_KEY = "quote_pricing_version"
+VERSION_TIMEOUT = 24 * 3600
+CENT = Decimal("0.01")
+PLAN_FIELDS = ("id", "name", "plan_type", "vehicle_type", "franchise")
+
+_lock = threading.Lock()
+_index = None
+
+
+def age_factor(year, current_year=None):
+    """
+    Recargo por antigüedad del vehículo.
+    """
+    if current_year is None:
+        current_year = timezone.now().year
+    age = max(0, current_year - year)
+    if age > 15:
+        return Decimal("1.15")
+    if age > 8:
+        return Decimal("1.08")
+    return Decimal("1.00")
+
+
+def estimate_price(base_price, factor):
+    price = (base_price or Decimal("0")) * factor
+    return str(price.quantize(CENT, rounding=ROUND_HALF_UP))
+
+
+class PricingIndex:
+    def __init__(self, products, version=None):
+        self.version = version
+        buckets = {}
+        for product in products:
+            buckets.setdefault(product.vehicle_type, []).append(
+                (
+                    product.min_year,
+                    product.max_year,
+                    product.id,
+                    product.base_price,
+                    {field: getattr(product, field) for field in PLAN_FIELDS},
+                )
+            )
+        self._buckets = {}
+        for vtype, entries in buckets.items():
+            entries.sort(key=lambda entry: (entry[0], entry[2]))
+            self._buckets[vtype] = ([entry[0] for entry in entries], entries)
+        self._plans = {}
+
+    @classmethod
+    def load(cls, version=None):
+        products = Product.objects.filter(is_active=True, published_home=True).only(
+            *PLAN_FIELDS, "min_year", "max_year", "base_price"
+        )
+        return cls(products, version)
+
+    def plans(self, vtype, year, factor):
+        key = (vtype, year, factor)
+        plans = self._plans.get(key)
+        if plans is None:
+            plans = self._plans[key] = self._compute(vtype, year, factor)
+        return plans
+
+    def _compute(self, vtype, year, factor):
+        if vtype not in self._buckets:
+            return ()
+        min_years, entries = self._buckets[vtype]
+        matches = [entry for entry in entries[: bisect_right(min_years, year)] if entry[1] >= year]
+        matches.sort(key=lambda entry: entry[2])
+        return tuple(
+            {**plan, "estimated_price": estimate_price(base_price, factor)}
+            for _, _, _, base_price, plan in matches
+        )
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=VERSION_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_index():
+    global _index
+    version = _current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = PricingIndex.load(version)
+        return _index
+
+
+def quote(vtype, year, *, current_year=None):
+    """
+    Planes compatibles con el tipo/año y su `estimated_price` (string con 2 decimales).
+    """
+    plans = get_index().plans(vtype, year, age_factor(year, current_year))
+    return [dict(plan) for plan in plans]
+
+
+def quote_many(vehicles, *, current_year=None):
+    """
+    Planes de cada `(vtype, year)` (iterador, en orden) con un mismo índice y tabla de
+    factores: un lote no ve dos versiones distintas del catálogo.
+    """
+    index = get_index()
+    if current_year is None:
+        current_year = timezone.now().year
+    factors = {}
+
+    def plans_for(vtype, year):
+        factor = factors.get(year)
+        if factor is None:
+            factor = factors[year] = age_factor(year, current_year)
+        return [dict(plan) for plan in index.plans(vtype, year, factor)]
+
+    return (plans_for(vtype, year) for vtype, year in vehicles)
+
+
+def invalidate():
+    global _index
+    _index = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=VERSION_TIMEOUT)
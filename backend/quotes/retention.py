@@ -0,0 +1,125 @@
+"""
+Limpieza de fichas de cotización vencidas y de su media.
+
+`sweep_expired` toma por lotes las fichas con `expires_at` pasado (índice sobre
+`expires_at`), borra su carpeta `quote-photos/<token>/` vía `default_storage` con
+concurrencia acotada (en S3 cada borrado es un request) y recién después borra las filas.
+Si falla el borrado de algún archivo la fila queda y se reintenta en la próxima corrida.
+
+`find_orphans` recorre `quote-photos/` y devuelve las carpetas sin ficha dueña (p. ej.
+un create que falló después de subir las fotos).
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import QuoteShare
+
+logger = logging.getLogger(__name__)
+
+MEDIA_ROOT_DIR = "quote-photos"
+
+
+def _walk(storage, path):
+    """Devuelve las rutas de todos los archivos bajo `path` (vacío si no existe)."""
+    try:
+        dirs, files = storage.listdir(path)
+    except FileNotFoundError:
+        return []
+    names = [f"{path}/{name}" for name in files]
+    for directory in dirs:
+        names.extend(_walk(storage, f"{path}/{directory}"))
+    return names
+
+
+def _prune_dirs(storage, path):
+    # En buckets las "carpetas" son prefijos; en disco quedan directorios vacíos.
+    try:
+        root = storage.path(path)
+    except NotImplementedError:
+        return
+    for current, _dirs, _files in os.walk(root, topdown=False):
+        try:
+            os.rmdir(current)
+        except OSError:
+            pass
+
+
+def delete_share_media(token, *, storage=None):
+    """Borra la carpeta de la ficha `token`. Devuelve cuántos archivos borró."""
+    storage = storage or default_storage
+    path = f"{MEDIA_ROOT_DIR}/{token}"
+    names = _walk(storage, path)
+    for name in names:
+        storage.delete(name)
+    _prune_dirs(storage, path)
+    return len(names)
+
+
+def sweep_expired(*, batch_size=200, max_batches=0, workers=4, now=None, storage=None):
+    """
+    Borra fichas vencidas y su media por lotes. Devuelve `{"shares": N, "files": M}`.
+    """
+    now = now or timezone.now()
+    storage = storage or default_storage
+    totals = {"shares": 0, "files": 0}
+    batches = 0
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while True:
+            rows = list(
+                QuoteShare.objects.filter(expires_at__lte=now)
+                .exclude(id__in=failed)
+                .order_by("expires_at", "id")
+                .values_list("id", "token")[:batch_size]
+            )
+            if not rows:
+                break
+            futures = {share_id: pool.submit(delete_share_media, token, storage=storage) for share_id, token in rows}
+            done = []
+            for share_id, future in futures.items():
+                try:
+                    totals["files"] += future.result()
+                except Exception:  # noqa: BLE001 - un archivo no debe frenar el lote
+                    logger.exception("quote_share_media_delete_failed", extra={"share_id": share_id})
+                    failed.add(share_id)
+                else:
+                    done.append(share_id)
+            count, _by_model = QuoteShare.objects.filter(id__in=done).delete()
+            totals["shares"] += count
+            batches += 1
+            if max_batches and batches >= max_batches:
+                break
+    logger.info("quote_shares_swept", extra={**totals, "batches": batches, "failed": len(failed)})
+    return totals
+
+
+def find_orphans(*, min_age=timedelta(hours=24), storage=None):
+    """
+    Carpetas de `quote-photos/` cuyo token no tiene ficha. Devuelve una lista de
+    `(token, archivos, bytes)`. Se ignoran las que tienen archivos más nuevos que
+    `min_age`: las fotos se suben antes de commitear la fila.
+    """
+    storage = storage or default_storage
+    try:
+        tokens, _files = storage.listdir(MEDIA_ROOT_DIR)
+    except FileNotFoundError:
+        return []
+    known = set()
+    for start in range(0, len(tokens), 500):
+        chunk = tokens[start:start + 500]
+        known.update(QuoteShare.objects.filter(token__in=chunk).values_list("token", flat=True))
+
+    cutoff = timezone.now() - min_age
+    orphans = []
+    for token in sorted(set(tokens) - known):
+        names = _walk(storage, f"{MEDIA_ROOT_DIR}/{token}")
+        if any(storage.get_modified_time(name) > cutoff for name in names):
+            continue
+        orphans.append((token, names, sum(storage.size(name) for name in names)))
+    return orphans
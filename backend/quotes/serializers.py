@@ -1,9 +1,15 @@
+import hashlib
+
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
 from django.core.files.base import ContentFile
+from django.utils.datastructures import MultiValueDict
 import base64
 import re
 
-from .models import QuoteShare, _generate_token
+from common import derivatives
+from .models import QuoteShare
 
 class QuoteInputSerializer(serializers.Serializer):
     vtype = serializers.ChoiceField(choices=['AUTO','MOTO','COM'])
@@ -13,12 +19,40 @@ class QuoteInputSerializer(serializers.Serializer):
     use = serializers.CharField(required=False, allow_blank=True)
 
 
+class QuoteBatchVehicleSerializer(QuoteInputSerializer):
+    # Identificador opcional del cliente para cruzar la respuesta (p. ej. id del partner).
+    ref = serializers.CharField(required=False, allow_blank=True, max_length=64)
+
+
+class QuoteBatchSerializer(serializers.Serializer):
+    vehicles = QuoteBatchVehicleSerializer(many=True, allow_empty=False)
+
+    def validate_vehicles(self, value):
+        limit = settings.QUOTE_BATCH_MAX_VEHICLES
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Máximo {limit} vehículos por request.")
+        return value
+
+
 class DataURLImageField(serializers.ImageField):
+    """
+    Acepta una data URL en base64 (JSON) o un archivo subido por multipart.
+    """
     data_url_pattern = re.compile(r"^data:(image/\w+);base64,(.+)$")
     allowed_mimes = {"image/jpeg", "image/png", "image/jpg"}
-    max_bytes = 5 * 1024 * 1024  # 5 MB por imagen
+    # Lo que Pillow detecta en el contenido, para data URLs y multipart por igual.
+    allowed_formats = {"JPEG", "PNG"}
+
+    @property
+    def max_bytes(self):
+        return settings.QUOTE_PHOTO_MAX_BYTES
+
+    def _limit_error(self):
+        return serializers.ValidationError(f"La imagen supera el límite de {self.max_bytes // (1024 * 1024)}MB.")
 
     def to_internal_value(self, data):
+        if not isinstance(data, str) and getattr(data, "size", 0) > self.max_bytes:
+            raise self._limit_error()
         if isinstance(data, str):
             match = self.data_url_pattern.match(data)
             if not match:
@@ -32,13 +66,25 @@ class DataURLImageField(serializers.ImageField):
             except (base64.binascii.Error, ValueError):
                 raise serializers.ValidationError("No se pudo decodificar la imagen.")
             if len(decoded) > self.max_bytes:
-                raise serializers.ValidationError("La imagen supera el límite de 5MB.")
+                raise self._limit_error()
             data = ContentFile(decoded, name=f"upload.{ext}")
-        return super().to_internal_value(data)
+        image_file = super().to_internal_value(data)
+        if getattr(getattr(image_file, "image", None), "format", None) not in self.allowed_formats:
+            raise serializers.ValidationError("Formato no permitido. Usá JPG o PNG.")
+        return image_file
+
+
+class QuotePhotosField(serializers.DictField):
+    child = DataURLImageField()
+
+    def get_value(self, dictionary):
+        value = super().get_value(dictionary)
+        # Multipart: DictField volvería a parsear el MultiValueDict sin prefijo y lo dejaría vacío.
+        return value.dict() if isinstance(value, MultiValueDict) else value
 
 
 class QuoteShareCreateSerializer(serializers.ModelSerializer):
-    photos = serializers.DictField(child=DataURLImageField(), write_only=True)
+    photos = QuotePhotosField(write_only=True)
 
     class Meta:
         model = QuoteShare
@@ -69,7 +115,7 @@ class QuoteShareCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         photos = validated_data.pop("photos", {})
-        obj = QuoteShare(token=_generate_token(), **validated_data)
+        obj = QuoteShare(**validated_data)
         obj.photo_front = photos.get("front")
         obj.photo_back = photos.get("back")
         obj.photo_right = photos.get("right")
@@ -80,6 +126,8 @@ class QuoteShareCreateSerializer(serializers.ModelSerializer):
 
 class QuoteShareSerializer(serializers.ModelSerializer):
     photos = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = QuoteShare
@@ -100,23 +148,56 @@ class QuoteShareSerializer(serializers.ModelSerializer):
             "gnc_amount",
             "expires_at",
             "photos",
+            "thumbnails",
+            "srcset",
             "created_at",
         ]
 
-    def get_photos(self, obj):
+    def _absolute(self, url):
         request = self.context.get("request")
+        if request:
+            return request.build_absolute_uri(url)
+        return url
 
-        def abs_url(file_field):
-            if not file_field:
-                return None
-            url = file_field.url
-            if request:
-                return request.build_absolute_uri(url)
-            return url
+    def _abs_url(self, file_field):
+        if not file_field:
+            return None
+        return self._absolute(file_field.url)
 
+    def get_photos(self, obj):
         return {
-            "front": abs_url(obj.photo_front),
-            "back": abs_url(obj.photo_back),
-            "right": abs_url(obj.photo_right),
-            "left": abs_url(obj.photo_left),
+            "front": self._abs_url(obj.photo_front),
+            "back": self._abs_url(obj.photo_back),
+            "right": self._abs_url(obj.photo_right),
+            "left": self._abs_url(obj.photo_left),
         }
+
+    def get_thumbnails(self, obj):
+        # None hasta que process_quote_photos procese la ficha (el panel usa `photos`).
+        return {
+            "front": self._abs_url(obj.photo_front_thumb),
+            "back": self._abs_url(obj.photo_back_thumb),
+            "right": self._abs_url(obj.photo_right_thumb),
+            "left": self._abs_url(obj.photo_left_thumb),
+        }
+
+    def get_srcset(self, obj):
+        # {"front": {"webp": "<url> 320w, ...", "jpeg": ...}, ...}; las variantes se
+        # generan al procesar las fotos o en el primer request a la URL.
+        result = {}
+        for side in ("front", "back", "right", "left"):
+            photo = getattr(obj, f"photo_{side}")
+            if not photo:
+                result[side] = None
+                continue
+            version = hashlib.sha1(photo.name.encode()).hexdigest()[:8]
+
+            def url_for(width, fmt, side=side, version=version):
+                path = reverse(
+                    "quote-share-photo",
+                    kwargs={"token": obj.token, "side": side, "width": width, "fmt": fmt},
+                )
+                return self._absolute(f"{path}?v={version}")
+
+            result[side] = derivatives.srcset(url_for)
+        return result
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import Product
+
+from . import pricing
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_pricing_index(sender, instance, **kwargs):
+    pricing.invalidate()
+    # Otra vez al commitear: un worker pudo reconstruir con los datos previos en el medio.
+    transaction.on_commit(pricing.invalidate)
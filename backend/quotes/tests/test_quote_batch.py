@@ -0,0 +1,93 @@
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common import throttling
+from products.models import Product
+
+URL = "/api/quotes/batch"
+
+
+@override_settings(QUOTE_BATCH_MAX_VEHICLES=10, QUOTE_BATCH_STREAM_THRESHOLD=5)
+class QuoteBatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = timezone.now().year
+        self.auto = Product.objects.create(
+            code="AUTO-RC",
+            name="Auto RC",
+            vehicle_type="AUTO",
+            plan_type="RC",
+            min_year=1990,
+            max_year=2100,
+            base_price=Decimal("100.00"),
+            coverages="-",
+        )
+        self.moto = Product.objects.create(
+            code="MOTO-RC",
+            name="Moto RC",
+            vehicle_type="MOTO",
+            plan_type="RC",
+            min_year=2010,
+            max_year=2100,
+            base_price=Decimal("50.00"),
+            coverages="-",
+        )
+
+    def _single(self, vtype, year):
+        return self.client.post("/api/quotes/", {"vtype": vtype, "year": year}, format="json").data["plans"]
+
+    def test_small_batch_matches_single_quotes(self):
+        vehicles = [
+            {"vtype": "AUTO", "year": self.year - 20, "ref": "a"},
+            {"vtype": "MOTO", "year": self.year},
+            {"vtype": "MOTO", "year": 2000},
+        ]
+        res = self.client.post(URL, {"vehicles": vehicles}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data["results"]
+        self.assertEqual([r["ref"] for r in results], ["a", "1", "2"])
+        self.assertEqual(results[0]["plans"], self._single("AUTO", self.year - 20))
+        self.assertEqual(results[0]["plans"][0]["estimated_price"], "115.00")
+        self.assertEqual(results[1]["plans"], self._single("MOTO", self.year))
+        self.assertEqual(results[2]["plans"], [])
+
+    def test_large_batch_is_streamed_without_queries(self):
+        self.client.post(URL, {"vehicles": [{"vtype": "AUTO", "year": self.year}]}, format="json")
+        vehicles = [{"vtype": "AUTO" if i % 2 else "MOTO", "year": self.year - i} for i in range(8)]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(URL, {"vehicles": vehicles}, format="json")
+            body = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(len(body["results"]), 8)
+        self.assertEqual(body["results"][1]["plans"][0]["id"], self.auto.id)
+        self.assertEqual(body["results"][1]["plans"][0]["estimated_price"], "100.00")
+
+    def test_rejects_empty_oversized_or_invalid_batches(self):
+        self.assertEqual(self.client.post(URL, {"vehicles": []}, format="json").status_code, 400)
+        too_many = [{"vtype": "AUTO", "year": self.year}] * 11
+        self.assertEqual(self.client.post(URL, {"vehicles": too_many}, format="json").status_code, 400)
+        res = self.client.post(URL, {"vehicles": [{"vtype": "BUS", "year": self.year}]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("vehicles", res.data)
+
+    def test_throttle_budget_is_counted_per_vehicle(self):
+        rates = {**throttling.ScopedRateThrottle.THROTTLE_RATES, "quotes_batch": "5/hour"}
+        batch = {"vehicles": [{"vtype": "AUTO", "year": self.year}] * 3}
+        pair = {"vehicles": [{"vtype": "AUTO", "year": self.year}] * 2}
+        with patch.object(throttling.ScopedRateThrottle, "THROTTLE_RATES", rates):
+            self.assertEqual(self.client.post(URL, batch, format="json").status_code, 200)
+            rejected = self.client.post(URL, batch, format="json")
+            self.assertEqual(rejected.status_code, 429)
+            self.assertIn("Retry-After", rejected)
+            self.assertEqual(self.client.post(URL, pair, format="json").status_code, 200)
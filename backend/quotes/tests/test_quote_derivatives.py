@@ -0,0 +1,118 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from common import derivatives
+from common.throttling import ScopedRateThrottle
+from quotes.models import QuoteShare
+from quotes.photos import SIDES, process_pending
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (10, 120, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[160, 320], IMAGE_DERIVATIVE_FORMATS=["webp", "jpeg"])
+class QuoteShareDerivativeTests(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.share = QuoteShare(
+            phone="1", make="VW", model="Gol", version="1.6", year=2020, city="LP",
+            has_garage=True, is_zero_km=False, usage="privado", has_gnc=False,
+        )
+        self.share.save()
+        for side in SIDES:
+            getattr(self.share, f"photo_{side}").save(f"{side}.jpg", ContentFile(_jpeg(640, 480)), save=False)
+        self.share.save()
+
+    def _srcset(self):
+        return self.client.get(f"/api/quotes/share/{self.share.token}").data["srcset"]
+
+    def _derivatives_dir(self):
+        return os.path.join(self.media, "quote-photos", self.share.token, "derivatives")
+
+    def test_srcset_lists_every_width_per_format(self):
+        srcset = self._srcset()
+        self.assertEqual(set(srcset), set(SIDES))
+        webp = srcset["front"]["webp"].split(", ")
+        self.assertEqual(len(webp), 2)
+        self.assertTrue(webp[0].endswith(" 160w"))
+        self.assertIn(f"/api/quotes/share/{self.share.token}/photos/front/320.webp?v=", webp[1])
+        self.assertTrue(srcset["back"]["jpeg"].split(", ")[1].startswith("http://testserver/"))
+        # Sin I/O al serializar: nada generado todavía.
+        self.assertFalse(os.path.exists(self._derivatives_dir()))
+
+    def test_first_request_generates_and_caches_variant(self):
+        url = self._srcset()["front"]["webp"].split(", ")[0].rsplit(" ", 1)[0]
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "image/webp")
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertIn("max-age=31536000", res["Cache-Control"])
+        with Image.open(io.BytesIO(b"".join(res.streaming_content))) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (160, 120)))
+        self.assertEqual(os.listdir(self._derivatives_dir()), ["front.jpg.160w.webp"])
+
+        again = self.client.get(url)
+        b"".join(again.streaming_content)
+        self.assertEqual(os.listdir(self._derivatives_dir()), ["front.jpg.160w.webp"])
+
+    def test_expiring_share_is_cached_privately_until_expiry(self):
+        self.share.expires_at = timezone.now() + timedelta(hours=1)
+        self.share.save(update_fields=["expires_at"])
+        res = self.client.get(f"/api/quotes/share/{self.share.token}/photos/front/160.jpeg")
+        b"".join(res.streaming_content)
+        cache_control = res["Cache-Control"]
+        self.assertIn("private", cache_control)
+        self.assertNotIn("immutable", cache_control)
+        self.assertNotIn("public", cache_control)
+        max_age = int(cache_control.split("max-age=")[1].split(",")[0])
+        self.assertTrue(3500 < max_age <= 3600)
+
+    def test_variants_have_their_own_throttle_scope(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        base = f"/api/quotes/share/{self.share.token}/photos/front"
+        with patch.object(ScopedRateThrottle, "THROTTLE_RATES", {"quote_photos": "2/hour"}):
+            for _ in range(2):
+                b"".join(self.client.get(f"{base}/160.jpeg").streaming_content)
+            self.assertEqual(self.client.get(f"{base}/160.jpeg").status_code, 429)
+
+    def test_rejects_unknown_variants_and_expired_shares(self):
+        base = f"/api/quotes/share/{self.share.token}/photos"
+        self.assertEqual(self.client.get(f"{base}/front/999.webp").status_code, 404)
+        self.assertEqual(self.client.get(f"{base}/front/160.gif").status_code, 404)
+        self.assertEqual(self.client.get(f"{base}/roof/160.webp").status_code, 404)
+        self.share.expires_at = timezone.now() - timedelta(minutes=1)
+        self.share.save(update_fields=["expires_at"])
+        self.assertEqual(self.client.get(f"{base}/front/160.webp").status_code, 410)
+
+    def test_processing_warms_variants_and_drops_stale_ones(self):
+        before = self._srcset()["front"]
+        old_front = self.share.photo_front.name
+        stale = derivatives.ensure(old_front, 160, "jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(process_pending(), 1)
+        share = QuoteShare.objects.get(pk=self.share.pk)
+        files = set(os.listdir(self._derivatives_dir()))
+        self.assertEqual(len(files), len(SIDES) * 4)
+        self.assertIn(os.path.basename(derivatives.derivative_name(share.photo_front.name, 320, "webp")), files)
+        self.assertNotIn(os.path.basename(stale), files)
+        # La URL del srcset cambia con la foto re-encodeada.
+        self.assertNotEqual(self._srcset()["front"], before)
@@ -0,0 +1,134 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from quotes import photos as quote_photos
+from quotes.models import QuoteShare
+from quotes.photos import SIDES, process_pending
+
+FIELDS = {
+    "phone": "123456789",
+    "make": "VW",
+    "model": "Gol",
+    "version": "1.6",
+    "year": 2020,
+    "city": "La Plata",
+    "has_garage": "true",
+    "is_zero_km": "false",
+    "usage": "privado",
+    "has_gnc": "false",
+}
+
+
+def _png(width, height, color=(200, 10, 10)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@override_settings(QUOTE_PHOTO_MAX_DIMENSION=400, QUOTE_PHOTO_THUMB_DIMENSION=100, QUOTE_PHOTO_MAX_BYTES=200_000)
+class QuotePhotoPipelineTests(APITestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def _upload(self, **overrides):
+        photos = {
+            f"photos.{side}": SimpleUploadedFile(f"{side}.png", _png(800, 600), content_type="image/png")
+            for side in SIDES
+        }
+        photos.update(overrides)
+        return self.client.post("/api/quotes/share", {**FIELDS, **photos}, format="multipart")
+
+    def test_multipart_upload_is_streamed_to_storage(self):
+        response = self._upload()
+        self.assertEqual(response.status_code, 201, response.data)
+        share = QuoteShare.objects.get(token=response.data["id"])
+        self.assertIsNone(share.photos_processed_at)
+        with share.photo_front.open("rb") as fh, Image.open(fh) as image:
+            self.assertEqual(image.size, (800, 600))
+
+    def test_oversized_multipart_photo_is_rejected(self):
+        noise = Image.frombytes("RGB", (400, 400), bytes(range(256)) * 1875)
+        buffer = io.BytesIO()
+        noise.save(buffer, "BMP")
+        self.assertGreater(len(buffer.getvalue()), 200_000)
+        big = SimpleUploadedFile("front.bmp", buffer.getvalue(), content_type="image/bmp")
+        response = self._upload(**{"photos.front": big})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("límite", str(response.data))
+        self.assertFalse(QuoteShare.objects.exists())
+
+    def test_multipart_photo_must_be_jpeg_or_png(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (80, 60)).save(buffer, "GIF")
+        gif = SimpleUploadedFile("front.png", buffer.getvalue(), content_type="image/png")
+        response = self._upload(**{"photos.front": gif})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JPG o PNG", str(response.data))
+        self.assertFalse(QuoteShare.objects.exists())
+
+    def test_processing_downsizes_and_builds_thumbnails(self):
+        token = self._upload().data["id"]
+        out = io.StringIO()
+        call_command("process_quote_photos", stdout=out)
+        self.assertIn("Fichas procesadas: 1", out.getvalue())
+
+        share = QuoteShare.objects.get(token=token)
+        self.assertIsNotNone(share.photos_processed_at)
+        for side in SIDES:
+            with getattr(share, f"photo_{side}").open("rb") as fh, Image.open(fh) as image:
+                self.assertEqual((image.format, image.size), ("JPEG", (400, 300)))
+            with getattr(share, f"photo_{side}_thumb").open("rb") as fh, Image.open(fh) as image:
+                self.assertEqual(image.size, (100, 75))
+        self.assertEqual(process_pending(), 0)
+
+        detail = self.client.get(f"/api/quotes/share/{token}").data
+        self.assertTrue(detail["thumbnails"]["front"].endswith("/thumbs/front.jpg"))
+        self.assertTrue(detail["photos"]["front"].endswith("/front.jpg"))
+
+    def test_failing_share_is_marked_and_does_not_block_the_queue(self):
+        broken = self._upload().data["id"]
+        ok = self._upload().data["id"]
+        real_render = quote_photos.render_photo
+        calls = []
+
+        def render(fh):
+            calls.append(fh)
+            if len(calls) == 1:
+                raise RuntimeError("storage caído")
+            return real_render(fh)
+
+        with patch.object(quote_photos, "render_photo", side_effect=render):
+            self.assertEqual(process_pending(), 2)
+        failed = QuoteShare.objects.get(token=broken)
+        self.assertIsNotNone(failed.photos_processed_at)
+        self.assertEqual(failed.photos_error, "RuntimeError: storage caído")
+        done = QuoteShare.objects.get(token=ok)
+        self.assertEqual((done.photos_error, done.photo_front_thumb.name.endswith("front.jpg")), ("", True))
+        self.assertEqual(process_pending(), 0)
+
+    def test_claimed_share_is_skipped_until_lease_expires(self):
+        token = self._upload().data["id"]
+        claimed = quote_photos.claim_share()
+        self.assertEqual(claimed.token, token)
+        self.assertIsNone(quote_photos.claim_share())
+        later = timezone.now() + timedelta(seconds=quote_photos.CLAIM_SECONDS + 1)
+        self.assertEqual(quote_photos.claim_share(now=later).token, token)
+
+    def test_thumbnails_are_null_until_processed(self):
+        token = self._upload().data["id"]
+        detail = self.client.get(f"/api/quotes/share/{token}").data
+        self.assertEqual(detail["thumbnails"], {side: None for side in SIDES})
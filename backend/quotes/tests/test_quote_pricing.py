@@ -1,14 +1,19 @@
 from decimal import Decimal, ROUND_HALF_UP
 
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from products.models import Product
+from quotes import pricing
 
 
 class QuotePricingTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.year = timezone.now().year - 16  # asegura factor 1.15 (edad mayor a 15 años)
         Product.objects.create(
             code="DECIMAL",
@@ -34,3 +39,69 @@ class QuotePricingTests(APITestCase):
         self.assertEqual(len(quoted), 1)
         expected = (Decimal("0.10") * Decimal("1.15")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
         self.assertEqual(quoted[0]["estimated_price"], str(expected))
+
+
+def _product(code, vtype="AUTO", min_year=2000, max_year=2100, base_price="100.00", **extra):
+    return Product.objects.create(
+        code=code,
+        name=code.title(),
+        vehicle_type=vtype,
+        plan_type="RC",
+        min_year=min_year,
+        max_year=max_year,
+        base_price=Decimal(base_price),
+        coverages="-",
+        **extra,
+    )
+
+
+class PricingIndexTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.current_year = timezone.now().year
+
+    def _quote(self, vtype, year):
+        res = self.client.post("/api/quotes/", {"vtype": vtype, "year": year}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["plans"]
+
+    def test_quotes_do_not_hit_the_database_once_built(self):
+        _product("UNO")
+        self._quote("AUTO", 2015)
+        with CaptureQueriesContext(connection) as ctx:
+            plans = self._quote("AUTO", 2016)
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual([p["name"] for p in plans], ["Uno"])
+
+    def test_matches_year_ranges_and_flags(self):
+        a = _product("A", min_year=2000, max_year=2010, base_price="10.05")
+        b = _product("B", min_year=2005, max_year=2100, base_price="20.00")
+        _product("C", min_year=2005, max_year=2100, is_active=False)
+        _product("D", min_year=2005, max_year=2100, published_home=False)
+        _product("E", vtype="MOTO", min_year=2005, max_year=2100)
+        self.assertEqual([p["id"] for p in self._quote("AUTO", 2005)], [a.id, b.id])
+        self.assertEqual([p["id"] for p in self._quote("AUTO", 2011)], [b.id])
+        self.assertEqual(self._quote("AUTO", 1999), [])
+        self.assertEqual(self._quote("COM", 2011), [])
+
+        year = self.current_year - 10  # factor 1.08
+        plans = pricing.quote("AUTO", year, current_year=self.current_year)
+        legacy = (Decimal("20.00") * Decimal("1.08")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        self.assertEqual(plans[-1]["estimated_price"], str(legacy))
+
+    def test_save_and_delete_invalidate_the_index(self):
+        product = _product("UNO", base_price="100.00")
+        self.assertEqual(self._quote("AUTO", self.current_year)[0]["estimated_price"], "100.00")
+        product.base_price = Decimal("150.00")
+        product.save()
+        self.assertEqual(self._quote("AUTO", self.current_year)[0]["estimated_price"], "150.00")
+        product.delete()
+        self.assertEqual(self._quote("AUTO", self.current_year), [])
+
+    def test_version_change_from_another_worker_rebuilds(self):
+        _product("UNO")
+        pricing.get_index()
+        Product.objects.update(base_price=Decimal("1.00"))
+        self.assertNotEqual(self._quote("AUTO", self.current_year)[0]["estimated_price"], "1.00")
+        cache.set(pricing.VERSION_KEY, "rotada-por-otro-worker")
+        self.assertEqual(self._quote("AUTO", self.current_year)[0]["estimated_price"], "1.00")
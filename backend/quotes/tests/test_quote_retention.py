@@ -0,0 +1,105 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quotes import retention
+from quotes.models import QuoteShare
+
+SIDES = ("front", "back", "right", "left")
+
+
+def _share(expires_at=None):
+    share = QuoteShare(
+        phone="123",
+        make="VW",
+        model="Gol",
+        version="1.6",
+        year=2020,
+        city="La Plata",
+        has_garage=True,
+        is_zero_km=False,
+        usage="privado",
+        has_gnc=False,
+        expires_at=expires_at,
+    )
+    share.save()
+    for side in SIDES:
+        getattr(share, f"photo_{side}").save(f"{side}.jpg", ContentFile(b"jpeg"), save=False)
+    share.photo_front_thumb.save("front.jpg", ContentFile(b"thumb"), save=False)
+    share.save()
+    return share
+
+
+class QuoteShareRetentionTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        now = timezone.now()
+        self.expired = [_share(now - timedelta(days=i + 1)) for i in range(3)]
+        self.live = _share(now + timedelta(days=1))
+        self.forever = _share()
+
+    def _dir(self, token):
+        return os.path.join(self.media, "quote-photos", token)
+
+    def test_sweep_deletes_expired_rows_and_media_in_batches(self):
+        totals = retention.sweep_expired(batch_size=2, workers=2)
+        self.assertEqual(totals, {"shares": 3, "files": 15})
+        self.assertEqual(set(QuoteShare.objects.all()), {self.live, self.forever})
+        for share in self.expired:
+            self.assertFalse(os.path.exists(self._dir(share.token)))
+        self.assertEqual(len(os.listdir(self._dir(self.live.token))), 5)
+
+    def test_max_batches_stops_early(self):
+        totals = retention.sweep_expired(batch_size=1, max_batches=2)
+        self.assertEqual(totals["shares"], 2)
+        # Se borran primero las que vencieron antes.
+        self.assertEqual(list(QuoteShare.objects.filter(expires_at__lte=timezone.now())), [self.expired[0]])
+
+    def test_failed_media_delete_keeps_the_row(self):
+        class FlakyStorage(FileSystemStorage):
+            def delete(self, name):
+                if target in name:
+                    raise OSError("boom")
+                return super().delete(name)
+
+        target = self.expired[1].token
+        totals = retention.sweep_expired(storage=FlakyStorage(location=self.media))
+        self.assertEqual(totals["shares"], 2)
+        self.assertTrue(QuoteShare.objects.filter(token=target).exists())
+
+    def test_orphans_are_reported_after_grace_period(self):
+        orphan = self.expired[0].token
+        QuoteShare.objects.filter(token=orphan).delete()
+        self.assertEqual(retention.find_orphans(), [])
+
+        old = time.time() - 2 * 86400
+        for root, _dirs, files in os.walk(self._dir(orphan)):
+            for name in files:
+                os.utime(os.path.join(root, name), (old, old))
+        [(token, names, size)] = retention.find_orphans()
+        self.assertEqual((token, len(names), size), (orphan, 5, 21))
+
+    def test_command_sweeps_and_deletes_orphans(self):
+        os.makedirs(self._dir("ghost"))
+        with open(os.path.join(self._dir("ghost"), "front.jpg"), "wb") as fh:
+            fh.write(b"x")
+        out = io.StringIO()
+        call_command("sweep_quote_shares", "--delete-orphans", "--orphan-min-age-hours=0", stdout=out)
+        output = out.getvalue()
+        self.assertIn("Fichas vencidas borradas: 3  archivos: 15", output)
+        self.assertIn("Huérfana: quote-photos/ghost/", output)
+        self.assertFalse(os.path.exists(self._dir("ghost")))
+        self.assertEqual(QuoteShare.objects.count(), 2)
@@ -1,8 +1,18 @@
 from django.urls import path
-from .views import QuoteView, QuoteShareCreateView, QuoteShareDetailView
+from common.async_views import async_read_view
+from .async_views import quote_share_detail
+from .views import QuoteBatchView, QuoteView, QuoteShareCreateView, QuoteShareDetailView, QuoteSharePhotoView
+
+share_detail_view = async_read_view(quote_share_detail, QuoteShareDetailView.as_view())
 
 urlpatterns = [
     path("", QuoteView.as_view(), name="quotes"),
+    path("batch", QuoteBatchView.as_view(), name="quotes-batch"),
     path("share", QuoteShareCreateView.as_view(), name="quote-share-create"),
-    path("share/<str:token>", QuoteShareDetailView.as_view(), name="quote-share-detail"),
+    path("share/<str:token>", share_detail_view, name="quote-share-detail"),
+    path(
+        "share/<str:token>/photos/<str:side>/<int:width>.<str:fmt>",
+        QuoteSharePhotoView.as_view(),
+        name="quote-share-photo",
+    ),
 ]
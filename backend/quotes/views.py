@@ -1,16 +1,28 @@
+import json
 import logging
-from decimal import Decimal, ROUND_HALF_UP
 
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, throttling
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
+from common import derivatives
 from common.security import PublicEndpointMixin
-from .serializers import QuoteInputSerializer, QuoteShareCreateSerializer, QuoteShareSerializer
+from common.throttling import ScopedRateThrottle
+from .serializers import (
+    QuoteBatchSerializer,
+    QuoteInputSerializer,
+    QuoteShareCreateSerializer,
+    QuoteShareSerializer,
+)
+from . import pricing
+from .photos import SIDES, QuotePhotoUploadHandler
 from .models import QuoteShare
-from products.models import Product
 
 
 logger = logging.getLogger(__name__)
@@ -28,47 +40,63 @@ class QuoteView(PublicEndpointMixin, APIView):
         vtype = s.validated_data['vtype']
         year = s.validated_data['year']
 
-        # Filtra productos compatibles con el tipo/año y que estén vigentes y publicados
-        qs = Product.objects.filter(
-            vehicle_type=vtype,
-            min_year__lte=year,
-            max_year__gte=year,
-            is_active=True,
-            published_home=True,
+        # Índice en memoria de productos vigentes y publicados (quotes/pricing.py): sin DB
+        result = pricing.quote(vtype, year)
+
+        return Response({'plans': result}, status=status.HTTP_200_OK)
+
+
+class QuoteBatchView(PublicEndpointMixin, APIView):
+    """
+    Cotiza varios vehículos en un request: `{"vehicles": [{"vtype", "year", "ref"?}, ...]}`
+    -> `{"results": [{"ref", "vtype", "year", "plans"}, ...]}` en el mismo orden.
+    Usa el mismo índice en memoria que QuoteView; el scope `quotes_batch` descuenta un
+    cupo por vehículo y los lotes grandes se devuelven en streaming.
+    """
+
+    throttle_scope = "quotes_batch"
+    public_write_allowed = True  # POST validado, mismo uso que el formulario público
+
+    def get_throttle_cost(self, request):
+        vehicles = request.data.get("vehicles") if isinstance(request.data, dict) else None
+        if not isinstance(vehicles, list):
+            return 1
+        return min(len(vehicles), settings.QUOTE_BATCH_MAX_VEHICLES)
+
+    def post(self, request):
+        s = QuoteBatchSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        vehicles = s.validated_data["vehicles"]
+        plans = pricing.quote_many((v["vtype"], v["year"]) for v in vehicles)
+        results = (
+            {"ref": v.get("ref", str(i)), "vtype": v["vtype"], "year": v["year"], "plans": vehicle_plans}
+            for i, (v, vehicle_plans) in enumerate(zip(vehicles, plans))
         )
+        if len(vehicles) < settings.QUOTE_BATCH_STREAM_THRESHOLD:
+            return Response({"results": list(results)}, status=status.HTTP_200_OK)
+        return StreamingHttpResponse(_stream_results(results), content_type="application/json")
 
-        # Calcula el factor por antigüedad del vehículo usando Decimal para evitar errores de float
-        current_year = timezone.now().year
-        age = max(0, current_year - year)
-        if age > 15:
-            factor = Decimal("1.15")
-        elif age > 8:
-            factor = Decimal("1.08")
-        else:
-            factor = Decimal("1.00")
-
-        # Arma la respuesta con precios estimados
-        result = []
-        for p in qs:
-            price = (p.base_price or Decimal("0")) * factor
-            estimated_price = price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            result.append(
-                {
-                    'id': p.id,
-                    'name': p.name,
-                    'plan_type': p.plan_type,
-                    'vehicle_type': p.vehicle_type,
-                    'franchise': p.franchise,
-                    'estimated_price': str(estimated_price),
-                }
-            )
 
-        return Response({'plans': result}, status=status.HTTP_200_OK)
+def _stream_results(results):
+    yield '{"results":['
+    for i, item in enumerate(results):
+        yield ("," if i else "") + json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False)
+    yield "]}"
 
 
 class QuoteShareCreateView(PublicEndpointMixin, APIView):
+    """
+    POST /api/quotes/share con las fotos como data URLs (JSON) o como archivos
+    multipart (`photos.front`, ...), que se escriben a disco por chunks.
+    """
     throttle_scope = "quotes"
     public_write_allowed = True  # Public POST crea token compartido
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Antes de que se lea el body: ningún archivo entero en memoria.
+        request.upload_handlers = [QuotePhotoUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
 
     def post(self, request):
         serializer = QuoteShareCreateSerializer(data=request.data)
@@ -89,3 +117,28 @@ class QuoteShareDetailView(PublicEndpointMixin, APIView):
             )
         data = QuoteShareSerializer(obj, context={"request": request}).data
         return Response(data, status=status.HTTP_200_OK)
+
+
+class QuoteSharePhotoView(PublicEndpointMixin, APIView):
+    """
+    GET /api/quotes/share/<token>/photos/<side>/<width>.<fmt>: variante redimensionada
+    de una foto (se genera si falta). El cache no pasa del vencimiento de la ficha.
+    """
+    # Scope propio: el anónimo por hora cortaría la carga del srcset (4 fotos x anchos x
+    # formatos), pero cada variante faltante es un render de Pillow.
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "quote_photos"
+
+    def get(self, request, token, side, width, fmt):
+        if side not in SIDES or not derivatives.is_supported(width, fmt):
+            raise Http404
+        obj = get_object_or_404(QuoteShare, token=token)
+        if obj.expires_at and obj.expires_at <= timezone.now():
+            return Response(
+                {"detail": "La ficha de cotización expiró."},
+                status=status.HTTP_410_GONE,
+            )
+        photo = getattr(obj, f"photo_{side}")
+        if not photo:
+            raise Http404
+        return derivatives.serve(photo.name, width, fmt, storage=photo.storage, expires_at=obj.expires_at)
@@ -1,4 +1,6 @@
 import os
 from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seguros.settings')
+# Settings ajusta el manejo de conexiones a la DB según la interfaz (ver DB_POOLING_MODE).
+os.environ.setdefault('DJANGO_SERVER_INTERFACE', 'asgi')
 application = get_asgi_application()
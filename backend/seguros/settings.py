@@ -54,6 +54,69 @@ def build_cache_settings(redis_url, debug):
     )
 
 
+DB_POOLING_MODES = ("none", "persistent", "external")
+
+
+def build_connection_settings(mode, *, conn_max_age, health_checks, server_interface):
+    """
+    Translate DB_POOLING_MODE into the per-connection keys of DATABASES.
+
+    - none: one connection per request (CONN_MAX_AGE=0).
+    - persistent: Django keeps the connection per thread for `conn_max_age` seconds.
+    - external: PgBouncer/pgpool in transaction mode; Django closes after each request
+      and server-side cursors are disabled because they don't survive the pooler.
+
+    Under ASGI the threads that run sync code are not reused reliably, so persistent
+    connections would pile up; they are downgraded to `none` (use `external` instead).
+    Returns (effective_mode, options).
+    """
+    normalized = (mode or "").strip().lower()
+    if normalized not in DB_POOLING_MODES:
+        raise ImproperlyConfigured(
+            f"DB_POOLING_MODE must be one of {', '.join(DB_POOLING_MODES)} (got {mode!r})."
+        )
+    if normalized == "persistent" and server_interface == "asgi":
+        normalized = "none"
+    options = {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}
+    if normalized == "persistent":
+        options = {
+            "CONN_MAX_AGE": max(int(conn_max_age), 0),
+            "CONN_HEALTH_CHECKS": health_checks,
+        }
+    elif normalized == "external":
+        options["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return normalized, options
+
+
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2_sha256": "accounts.hashers.PBKDF2PasswordHasher",
+    "argon2": "accounts.hashers.Argon2PasswordHasher",
+    "scrypt": "accounts.hashers.ScryptPasswordHasher",
+    "bcrypt_sha256": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+}
+
+
+def build_password_hashers(preferred):
+    """
+    PASSWORD_HASHERS con `preferred` primero (el que se usa para hashear y al que se
+    migra en el próximo login) y el resto detrás para seguir verificando hashes viejos.
+    argon2 y bcrypt requieren argon2-cffi / bcrypt instalados.
+    """
+    normalized = (preferred or "").strip().lower()
+    if normalized not in PASSWORD_HASHER_CHOICES:
+        raise ImproperlyConfigured(
+            f"PASSWORD_HASHER must be one of {', '.join(PASSWORD_HASHER_CHOICES)} (got {preferred!r})."
+        )
+    first = PASSWORD_HASHER_CHOICES[normalized]
+    rest = [path for path in PASSWORD_HASHER_CHOICES.values() if path != first]
+    return [first, *rest, "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]
+
+
+def _optional_int(value):
+    value = (value or "").strip()
+    return int(value) if value else None
+
+
 # === CORE ===
 DEPLOYMENT_ENV = (
     os.getenv("DJANGO_ENV")
@@ -64,6 +127,11 @@ DEPLOYMENT_ENV = (
 )
 DEPLOYMENT_ENV = DEPLOYMENT_ENV.strip().lower()
 RUNNING_TESTS = "test" in " ".join(sys.argv)
+# seguros/asgi.py lo define antes de cargar settings; WSGI/manage.py quedan en "wsgi".
+SERVER_INTERFACE = (os.getenv("DJANGO_SERVER_INTERFACE") or "wsgi").strip().lower()
+# GET públicos servidos con vistas async (common/async_views.py). Bajo WSGI cada vista
+# async corre en su propio event loop, así que por defecto sólo se activan bajo ASGI.
+ASYNC_READ_VIEWS = _bool(os.getenv("ASYNC_READ_VIEWS"), SERVER_INTERFACE == "asgi")
 DEBUG = _bool(os.getenv("DJANGO_DEBUG") or os.getenv("DEBUG"), False)
 
 if DEBUG and DEPLOYMENT_ENV in ("prod", "production"):
@@ -127,6 +195,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.hashers.PasswordTimingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -214,6 +283,41 @@ else:
         }
     }
 
+# Conexiones: persistentes por defecto con un motor real, una por request con SQLite.
+DB_POOLING_MODE = os.getenv("DB_POOLING_MODE") or ("persistent" if DB_ENGINE else "none")
+DB_CONNECTION_MODE, db_connection_options = build_connection_settings(
+    DB_POOLING_MODE,
+    conn_max_age=os.getenv("DB_CONN_MAX_AGE", "60"),
+    health_checks=_bool(os.getenv("DB_CONN_HEALTH_CHECKS"), True),
+    server_interface=SERVER_INTERFACE,
+)
+DATABASES["default"].update(db_connection_options)
+
+# Réplica de solo lectura opcional. Hereda la config de default y pisa lo que venga
+# por env; en local alcanza con DB_REPLICA_NAME apuntando a otro archivo SQLite.
+DB_REPLICA_NAME = (os.getenv("DB_REPLICA_NAME") or "").strip()
+DB_REPLICA_HOST = (os.getenv("DB_REPLICA_HOST") or "").strip()
+DB_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "10"))
+replica_routes_env = os.getenv("DB_REPLICA_ROUTE_NAMES")
+if replica_routes_env is not None:
+    DB_REPLICA_ROUTE_NAMES = [r.strip() for r in replica_routes_env.split(",") if r.strip()]
+
+if DB_REPLICA_NAME or DB_REPLICA_HOST:
+    replica_db = dict(DATABASES["default"])
+    replica_overrides = {
+        "NAME": DB_REPLICA_NAME,
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.getenv("DB_REPLICA_PORT"),
+        "USER": os.getenv("DB_REPLICA_USER"),
+        "PASSWORD": os.getenv("DB_REPLICA_PASSWORD"),
+    }
+    replica_db.update({k: v for k, v in replica_overrides.items() if v})
+    # En tests la réplica espeja default para no crear una segunda base.
+    replica_db["TEST"] = {"MIRROR": "default"}
+    DATABASES["replica"] = replica_db
+    DATABASE_ROUTERS = ["common.db_routing.PrimaryReplicaRouter"]
+    MIDDLEWARE.append("common.db_routing.ReplicaRoutingMiddleware")
+
 
 # === CACHE ===
 CACHES = build_cache_settings(REDIS_URL, DEBUG)
@@ -226,11 +330,23 @@ OTP_RATE_LIMIT_SEND_COUNT = int(os.getenv("OTP_RATE_LIMIT_SEND_COUNT", "5"))
 OTP_RATE_LIMIT_SEND_WINDOW = int(os.getenv("OTP_RATE_LIMIT_SEND_WINDOW", "600"))
 OTP_RATE_LIMIT_VERIFY_COUNT = int(os.getenv("OTP_RATE_LIMIT_VERIFY_COUNT", "10"))
 OTP_RATE_LIMIT_VERIFY_WINDOW = int(os.getenv("OTP_RATE_LIMIT_VERIFY_WINDOW", "600"))
+# El cupo por IP es el del usuario multiplicado por este factor (NAT/oficinas compartidas).
+OTP_RATE_LIMIT_IP_FACTOR = int(os.getenv("OTP_RATE_LIMIT_IP_FACTOR", "3"))
 
 
 # === AUTH ===
 AUTH_USER_MODEL = "accounts.User"
 
+# === PASSWORD HASHING ===
+# Costos vacíos = default de Django. Al cambiarlos, cada usuario se re-hashea con los
+# parámetros nuevos en su próximo login exitoso.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2_sha256")
+PASSWORD_HASHERS = build_password_hashers(PASSWORD_HASHER)
+PASSWORD_PBKDF2_ITERATIONS = _optional_int(os.getenv("PASSWORD_PBKDF2_ITERATIONS"))
+PASSWORD_ARGON2_TIME_COST = _optional_int(os.getenv("PASSWORD_ARGON2_TIME_COST"))
+PASSWORD_ARGON2_MEMORY_COST = _optional_int(os.getenv("PASSWORD_ARGON2_MEMORY_COST"))
+PASSWORD_SCRYPT_WORK_FACTOR = _optional_int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR"))
+
 
 # === DRF / JWT ===
 REST_FRAMEWORK = {
@@ -247,21 +363,52 @@ REST_FRAMEWORK = {
     "MAX_PAGE_SIZE": int(os.getenv("API_MAX_PAGE_SIZE", "500")),
     # Limitamos bursts básicos y un scope específico para /quotes/*
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "common.throttling.AnonRateThrottle",
+        "common.throttling.UserRateThrottle",
+        "common.throttling.ScopedRateThrottle",
     ),
     "DEFAULT_THROTTLE_RATES": {
         "anon": os.getenv("API_THROTTLE_ANON", "60/hour"),
         "user": os.getenv("API_THROTTLE_USER", "120/hour"),
         "quotes": os.getenv("API_THROTTLE_QUOTES", "10/hour"),
+        # /api/quotes/batch: cada vehículo del lote consume uno.
+        "quotes_batch": os.getenv("API_THROTTLE_QUOTES_BATCH", "200/hour"),
         "login": os.getenv("API_THROTTLE_LOGIN", "20/hour"),
         "reset": os.getenv("API_THROTTLE_RESET", "10/hour"),
         "register": os.getenv("API_THROTTLE_REGISTER", "30/hour"),
         "claim": os.getenv("API_THROTTLE_CLAIM", "15/hour"),
+        # Variantes de fotos de fichas (quotes): un srcset completo son decenas de requests.
+        "quote_photos": os.getenv("API_THROTTLE_QUOTE_PHOTOS", "600/hour"),
     },
 }
 
+# Payload precalculado de /api/products/home: vida en el cache (se recalcula al guardar
+# productos) y max-age del Cache-Control que ve el navegador/CDN.
+HOME_PRODUCTS_CACHE_SECONDS = int(os.getenv("HOME_PRODUCTS_CACHE_SECONDS", "3600"))
+HOME_PRODUCTS_MAX_AGE = int(os.getenv("HOME_PRODUCTS_MAX_AGE", "60"))
+# Pólizas por transacción al desasociarlas de un producto desactivado/borrado (products/detach.py).
+PRODUCT_DETACH_BATCH_SIZE = int(os.getenv("PRODUCT_DETACH_BATCH_SIZE", "1000"))
+# Fotos de fichas de cotización (quotes/photos.py): tamaño máximo por foto al subirla y
+# re-encode/miniaturas que hace `process_quote_photos`.
+QUOTE_PHOTO_MAX_BYTES = int(os.getenv("QUOTE_PHOTO_MAX_MB", "5")) * 1024 * 1024
+QUOTE_PHOTO_MAX_DIMENSION = int(os.getenv("QUOTE_PHOTO_MAX_DIMENSION", "1600"))
+QUOTE_PHOTO_THUMB_DIMENSION = int(os.getenv("QUOTE_PHOTO_THUMB_DIMENSION", "320"))
+QUOTE_PHOTO_JPEG_QUALITY = int(os.getenv("QUOTE_PHOTO_JPEG_QUALITY", "82"))
+# Derivados de imágenes para `srcset` (common/derivatives.py): anchos y formatos que se
+# generan, calidad, hilos del pool de Pillow y max-age (las URLs son inmutables).
+IMAGE_DERIVATIVE_WIDTHS = [
+    int(w) for w in os.getenv("IMAGE_DERIVATIVE_WIDTHS", "320,640,1280").split(",") if w.strip()
+]
+IMAGE_DERIVATIVE_FORMATS = [
+    f.strip() for f in os.getenv("IMAGE_DERIVATIVE_FORMATS", "webp,jpeg").split(",") if f.strip()
+]
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_QUALITY", "78"))
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", "4"))
+IMAGE_DERIVATIVE_MAX_AGE = int(os.getenv("IMAGE_DERIVATIVE_MAX_AGE", str(365 * 24 * 3600)))
+# Cotización por lote: máximo de vehículos por request y desde cuántos se responde en streaming.
+QUOTE_BATCH_MAX_VEHICLES = int(os.getenv("QUOTE_BATCH_MAX_VEHICLES", "100"))
+QUOTE_BATCH_STREAM_THRESHOLD = int(os.getenv("QUOTE_BATCH_STREAM_THRESHOLD", "25"))
+
 # En producción, solo JSON (sin UI browsable).
 if not DEBUG:
     REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
@@ -281,7 +428,19 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ALGORITHM": os.getenv("JWT_ALGORITHM", "HS256"),
     "SIGNING_KEY": os.getenv("JWT_SIGNING_KEY", SECRET_KEY),
+    "TOKEN_REFRESH_SERIALIZER": "accounts.tokens.TokenRefreshSerializer",
 }
+# Segundos que se cachea el usuario resuelto desde el access token (0 = siempre a la DB).
+# Se invalida al guardar/borrar el usuario (accounts/signals.py).
+JWT_USER_CACHE_SECONDS = int(os.getenv("JWT_USER_CACHE_SECONDS", "30"))
+# Chequeo de refresh tokens revocados contra el cache (accounts/tokens.py); la DB se
+# consulta sólo cuando el conjunto no está sincronizado (cada N segundos se recarga).
+JWT_REVOCATION_CACHE = _bool(os.getenv("JWT_REVOCATION_CACHE"), True)
+JWT_REVOCATION_SYNC_SECONDS = int(os.getenv("JWT_REVOCATION_SYNC_SECONDS", "3600"))
+# Claves de firma de Google para validar id_token (accounts/google_certs.py): vigencia
+# según su Cache-Control, renovadas en background este margen antes de vencer.
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_REFRESH_MARGIN_SECONDS = int(os.getenv("GOOGLE_CERTS_REFRESH_MARGIN_SECONDS", "600"))
 
 
 # === INTERNACIONALIZACIÓN ===
@@ -317,6 +476,16 @@ RECEIPT_TEMPLATE_PDF = os.getenv(
 )
 RECEIPT_DEBUG_GRID = _bool(os.getenv("RECEIPT_DEBUG_GRID"), False)
 
+# === HEALTHCHECK (/healthz/ready) ===
+HEALTHZ_READY_CACHE_SECONDS = int(os.getenv("HEALTHZ_READY_CACHE_SECONDS", "5"))
+# Presupuesto de latencia por probe (ms); pasado el presupuesto el estado es "degraded".
+HEALTHZ_BUDGETS_MS = {
+    "database": int(os.getenv("HEALTHZ_BUDGET_DB_MS", "100")),
+    "cache": int(os.getenv("HEALTHZ_BUDGET_CACHE_MS", "50")),
+    "media_storage": int(os.getenv("HEALTHZ_BUDGET_MEDIA_MS", "250")),
+    "receipt_template": int(os.getenv("HEALTHZ_BUDGET_TEMPLATE_MS", "20")),
+}
+
 # === EMAIL ===
 EMAIL_BACKEND = os.getenv(
     "DJANGO_EMAIL_BACKEND",
@@ -342,6 +511,16 @@ if (
     )
 
 
+# === NOTIFICACIONES (outbox) ===
+# Los requests sólo encolan; `manage.py send_notifications` entrega por lotes.
+WHATSAPP_WEBHOOK_URL = os.getenv("WHATSAPP_WEBHOOK_URL", "").strip()
+WHATSAPP_TIMEOUT_SECONDS = float(os.getenv("WHATSAPP_TIMEOUT_SECONDS", "5"))
+NOTIFICATIONS_BATCH_SIZE = int(os.getenv("NOTIFICATIONS_BATCH_SIZE", "50"))
+NOTIFICATIONS_MAX_ATTEMPTS = int(os.getenv("NOTIFICATIONS_MAX_ATTEMPTS", "5"))
+NOTIFICATIONS_RETRY_BASE_SECONDS = int(os.getenv("NOTIFICATIONS_RETRY_BASE_SECONDS", "30"))
+# Tiempo que un worker reserva un lote antes de que otro pueda tomarlo.
+NOTIFICATIONS_LEASE_SECONDS = int(os.getenv("NOTIFICATIONS_LEASE_SECONDS", "120"))
+
 # === LOGGING BÁSICO ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOGGING = {
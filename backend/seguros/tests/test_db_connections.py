@@ -0,0 +1,44 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+
+from seguros.settings import build_connection_settings
+
+
+class BuildConnectionSettingsTests(SimpleTestCase):
+    def test_persistent_mode_keeps_connections_with_health_checks(self):
+        mode, options = build_connection_settings(
+            "persistent", conn_max_age="120", health_checks=True, server_interface="wsgi"
+        )
+        self.assertEqual(mode, "persistent")
+        self.assertEqual(options, {"CONN_MAX_AGE": 120, "CONN_HEALTH_CHECKS": True})
+
+    def test_persistent_mode_is_downgraded_under_asgi(self):
+        mode, options = build_connection_settings(
+            "persistent", conn_max_age="120", health_checks=True, server_interface="asgi"
+        )
+        self.assertEqual(mode, "none")
+        self.assertEqual(options["CONN_MAX_AGE"], 0)
+
+    def test_external_pooler_disables_server_side_cursors(self):
+        mode, options = build_connection_settings(
+            "external", conn_max_age="120", health_checks=True, server_interface="asgi"
+        )
+        self.assertEqual(mode, "external")
+        self.assertEqual(options["CONN_MAX_AGE"], 0)
+        self.assertTrue(options["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            build_connection_settings(
+                "pgpool", conn_max_age="0", health_checks=False, server_interface="wsgi"
+            )
+
+
+class HealthcheckConnectionReportTests(TestCase):
+    def test_healthz_reports_effective_connection_mode(self):
+        res = self.client.get("/healthz/")
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(body["status"], "ok")
+        self.assertIn(body["db_connections"]["mode"], ("none", "persistent", "external"))
+        self.assertEqual(body["db_connections"]["server_interface"], "wsgi")
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from common import health
+
+
+class ReadinessEndpointTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, DEBUG=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        health.reset_readiness_cache()
+        self.addCleanup(health.reset_readiness_cache)
+
+    def test_all_probes_ok(self):
+        res = self.client.get("/healthz/ready")
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(body["status"], "ok")
+        self.assertFalse(body["cached"])
+        self.assertEqual(
+            set(body["probes"]), {"database", "cache", "media_storage", "receipt_template"}
+        )
+        for probe in body["probes"].values():
+            self.assertEqual(probe["status"], "ok")
+            self.assertIn("latency_ms", probe)
+        self.assertEqual(res["Cache-Control"], "no-store")
+
+    def test_results_are_reused_for_a_few_seconds(self):
+        with patch.object(health, "probe_database", wraps=health.probe_database) as probe:
+            with patch.dict(health.PROBES, {"database": probe}):
+                self.client.get("/healthz/ready")
+                second = self.client.get("/healthz/ready/").json()
+        self.assertEqual(probe.call_count, 1)
+        self.assertTrue(second["cached"])
+
+    @override_settings(HEALTHZ_BUDGETS_MS={"database": -1})
+    def test_probe_over_budget_reports_degraded(self):
+        body = self.client.get("/healthz/ready").json()
+        self.assertEqual(body["probes"]["database"]["status"], "degraded")
+        self.assertEqual(body["status"], "degraded")
+
+    def test_failing_probe_returns_503(self):
+        def broken():
+            raise OSError("disk full")
+
+        with patch.dict(health.PROBES, {"media_storage": broken}):
+            res = self.client.get("/healthz/ready")
+        self.assertEqual(res.status_code, 503)
+        body = res.json()
+        self.assertEqual(body["status"], "fail")
+        self.assertEqual(body["probes"]["media_storage"]["error"], "OSError")
+
+    def test_locmem_cache_is_degraded_outside_debug(self):
+        with override_settings(DEBUG=False):
+            body = self.client.get("/healthz/ready").json()
+        self.assertEqual(body["probes"]["cache"]["status"], "degraded")
+        self.assertFalse(body["probes"]["cache"]["shared"])
+
+    def test_missing_receipt_template_is_degraded(self):
+        with patch("payments.utils.TEMPLATE_PDF_REL", "static/receipts/missing.pdf"):
+            body = self.client.get("/healthz/ready").json()
+        self.assertEqual(body["probes"]["receipt_template"]["status"], "degraded")
+        self.assertEqual(body["status"], "degraded")
@@ -49,3 +49,17 @@ class SettingsSecurityTests(SimpleTestCase):
             settings.DATABASES["default"]["ENGINE"],
             "django.db.backends.sqlite3",
         )
+
+    def test_replica_name_enables_router_and_mirrors_in_tests(self):
+        env = self._common_env(production=False)
+        env["DJANGO_SECRET_KEY"] = "dev-secret"
+        env["DB_REPLICA_NAME"] = "/tmp/replica.sqlite3"
+        env.pop("DB_ENGINE", None)
+        with patch.dict(os.environ, env, clear=False):
+            settings = _reload_settings()
+        replica = settings.DATABASES["replica"]
+        self.assertEqual(replica["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(replica["NAME"], "/tmp/replica.sqlite3")
+        self.assertEqual(replica["TEST"], {"MIRROR": "default"})
+        self.assertEqual(settings.DATABASE_ROUTERS, ["common.db_routing.PrimaryReplicaRouter"])
+        self.assertIn("common.db_routing.ReplicaRoutingMiddleware", settings.MIDDLEWARE)
@@ -9,15 +9,32 @@ from accounts.auth_views import EmailLoginView, PasswordResetRequestView, Passwo
 from accounts.views import deprecated_lookup
 from rest_framework_simplejwt.views import TokenRefreshView
 from .legacy_views import legacy_announcements_list, legacy_announcements_detail
+from common.checks import connection_pooling_report
+from common.health import STATUS_FAIL, readiness_report
 
 
 # === Healthcheck ===
-def healthcheck(request):
+async def healthcheck(request):
     """
     Endpoint simple para verificar el estado del servidor.
     Útil para monitoreo o comprobaciones automáticas.
+    Informa además el modo de conexiones a la DB efectivo (no consulta la base).
+    Es async: no toca la DB ni el cache, así que bajo ASGI no ocupa un thread.
     """
-    return JsonResponse({"status": "ok"}, status=200)
+    return JsonResponse({"status": "ok", "db_connections": connection_pooling_report()}, status=200)
+
+
+def readiness(request):
+    """
+    Readiness profunda: DB, cache, storage de media y plantilla PDF de recibos.
+    200 con status ok/degraded (alguna probe lenta o dependencia no ideal), 503 si
+    alguna falla. El resultado se reutiliza unos segundos (HEALTHZ_READY_CACHE_SECONDS).
+    """
+    payload, cached = readiness_report()
+    status = 503 if payload["status"] == STATUS_FAIL else 200
+    response = JsonResponse({**payload, "cached": cached}, status=status)
+    response["Cache-Control"] = "no-store"
+    return response
 
 
 
@@ -34,6 +51,8 @@ urlpatterns = [
 
     # Healthcheck
     path("healthz/", healthcheck, name="healthcheck"),
+    path("healthz/ready", readiness, name="healthcheck-ready"),
+    path("healthz/ready/", readiness, name="healthcheck-ready-slash"),  # alias for trailing slash compatibility
 
     # API
     path("api/common/", include("common.urls")),